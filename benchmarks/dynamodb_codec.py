@@ -0,0 +1,121 @@
+"""
+Measures the CPU time per item of decoding DynamoDB items into entities with the Table resource's TypeDeserializer
+and with aws.dynamodb_codec, and of encoding them with TypeSerializer and the codec. No request is sent, only the
+conversions are timed.
+
+    PYTHONPATH=src python benchmarks/dynamodb_codec.py [iterations]
+"""
+import sys
+import time
+from typing import Any, Callable
+
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+from aws.dynamodb_codec import deserialize_item, serialize_item
+from aws.dynamodb_repository import DynamoDBRepository
+
+GAME_ID = "0f8fad5bd9cb469fa16570867728950e"
+PLAYER_IDS = [f"{GAME_ID}_player_{i:032x}" for i in range(10)]
+
+ITEMS: dict[str, tuple[dict[str, Any], Callable[[dict[str, Any]], Any]]] = {
+    "game": (
+        {
+            "pk": GAME_ID,
+            "sk": "game",
+            "status": "InProgress",
+            "state": "RoundVoting",
+            "config": {
+                "quest_team_size": {"1": "3", "2": "4", "3": "4", "4": "5", "5": "5"},
+                "roles": ["Merlin", "Percival", "Servant", "Servant", "Morgana", "Assassin", "Minion"],
+                "known_roles": {"Merlin": ["Morgana", "Assassin", "Minion"], "Percival": ["Merlin", "Morgana"]},
+                "assassination_attempts": 1,
+            },
+            "player_ids": PLAYER_IDS,
+            "assassination_attempts": 1,
+            "result": None,
+            "version": 12,
+        },
+        DynamoDBRepository._to_game,
+    ),
+    "player": (
+        {
+            "pk": GAME_ID,
+            "sk": PLAYER_IDS[0].split("_", 1)[1],
+            "name": "name",
+            "secret": "secret",
+            "role": "Merlin",
+            "known_player_ids": PLAYER_IDS[:3],
+        },
+        lambda item: DynamoDBRepository._to_player(GAME_ID, item),
+    ),
+    "round": (
+        {
+            "pk": GAME_ID,
+            "sk": "round_2_3",
+            "quest_number": 2,
+            "round_number": 3,
+            "leader_id": PLAYER_IDS[0],
+            "team_member_ids": PLAYER_IDS[:4],
+            "result": "Pass",
+            "votes": {player_id: "Pass" if i < 6 else "Fail" for i, player_id in enumerate(PLAYER_IDS)},
+            "votes_cast": 10,
+            "votes_pass": 6,
+            "votes_fail": 4,
+        },
+        lambda item: DynamoDBRepository._to_round(GAME_ID, item),
+    ),
+    "quest": (
+        {
+            "pk": GAME_ID,
+            "sk": "quest_2",
+            "quest_number": 2,
+            "result": None,
+            "team_member_ids": PLAYER_IDS[:4],
+            "votes": {player_id: "Pass" for player_id in PLAYER_IDS[:2]},
+            "votes_cast": 2,
+            "votes_pass": 2,
+            "votes_fail": 0,
+        },
+        lambda item: DynamoDBRepository._to_quest(GAME_ID, item),
+    ),
+    "event": (
+        {
+            "pk": GAME_ID,
+            "sk": "event_01HZY8Q0D3M8J5X5V2B7K9C4TN",
+            "type": "TeamProposalSubmitted",
+            "recipients": [],
+            "payload": {"quest_number": 2, "round_number": 3, "team_member_ids": PLAYER_IDS[:4]},
+            "timestamp": "2024-01-01T00:00:00.000000",
+        },
+        DynamoDBRepository._to_event,
+    ),
+}
+
+
+def time_per_item(function: Callable[[], Any], iterations: int) -> float:
+    start = time.process_time()
+    for _ in range(iterations):
+        function()
+    return (time.process_time() - start) / iterations * 1e6
+
+
+def main(iterations: int) -> None:
+    serializer = TypeSerializer()
+    deserializer = TypeDeserializer()
+    print(f"{'item':<12}{'resource decode':>18}{'codec decode':>16}{'resource encode':>18}{'codec encode':>16}  (us/item)")
+    for name, (item, to_entity) in ITEMS.items():
+        raw_item = serialize_item(item)
+        assert to_entity(deserialize_item(raw_item)) == to_entity(
+            {k: deserializer.deserialize(v) for k, v in raw_item.items()}
+        )
+        resource_decode = time_per_item(
+            lambda: to_entity({k: deserializer.deserialize(v) for k, v in raw_item.items()}), iterations
+        )
+        codec_decode = time_per_item(lambda: to_entity(deserialize_item(raw_item)), iterations)
+        resource_encode = time_per_item(lambda: {k: serializer.serialize(v) for k, v in item.items()}, iterations)
+        codec_encode = time_per_item(lambda: serialize_item(item), iterations)
+        print(f"{name:<12}{resource_decode:>18.2f}{codec_decode:>16.2f}{resource_encode:>18.2f}{codec_encode:>16.2f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,75 @@
+"""
+Measures the CPU time per broadcast of encoding an event for every connection, as WebSocketCommService did before,
+against encoding it once with json and with orjson, then of a whole WebSocketCommService.broadcast with the posts
+replaced by no-ops. process_time counts the CPU of the executor threads too.
+
+    PYTHONPATH=src python benchmarks/websocket_broadcast.py [iterations]
+"""
+import json
+import sys
+import time
+from typing import Any, Callable
+from unittest.mock import patch
+
+from aws.websocket_comm_service import WebSocketCommService, get_json_encoder, shutdown_executor
+from game_core.constants.event_type import EventType
+from game_core.entities.event import Event
+
+GAME_ID = "0f8fad5bd9cb469fa16570867728950e"
+PLAYER_IDS = [f"{GAME_ID}_player_{i:032x}" for i in range(10)]
+EVENT = Event(
+    id=f"{GAME_ID}_event_01HZY8Q0D3M8J5X5V2B7K9C4TN",
+    game_id=GAME_ID,
+    type=EventType.GameStarted,
+    recipients=[],
+    payload={
+        "player_ids": PLAYER_IDS,
+        "known_players": [{"id": player_id, "name": f"name_{i}"} for i, player_id in enumerate(PLAYER_IDS[:4])],
+        "quest_team_size": {"1": 3, "2": 4, "3": 4, "4": 5, "5": 5},
+    },
+    timestamp="2024-01-01T00:00:00.000000",
+)
+
+
+class NoOpApiGateway:
+    def post_to_connection(self, ConnectionId: str, Data: bytes) -> None:
+        pass
+
+
+class ConnectionsRepository:
+    def __init__(self, connection_ids: list[str]):
+        self._connection_ids = connection_ids
+
+    def get_player_connection_ids(self, game_id: str) -> dict[str, str]:
+        return dict(zip(PLAYER_IDS, self._connection_ids))
+
+
+def time_per_broadcast(function: Callable[[], Any], iterations: int) -> float:
+    start = time.process_time()
+    for _ in range(iterations):
+        function()
+    return (time.process_time() - start) / iterations * 1e6
+
+
+def main(iterations: int) -> None:
+    connection_ids = [f"connection_id_{i}" for i in range(len(PLAYER_IDS))]
+    encoders = {name: get_json_encoder(name) for name in ["json", "orjson"]}
+    print(f"{len(connection_ids)} connections, us/broadcast")
+    per_connection = time_per_broadcast(
+        lambda: [json.dumps(EVENT.to_dict()) for _ in connection_ids], iterations
+    )
+    print(f"{'encode per connection (json)':<36}{per_connection:>10.2f}")
+    for name, encoder in encoders.items():
+        once = time_per_broadcast(lambda: encoder(EVENT.to_dict()), iterations)
+        print(f"{f'encode once ({name})':<36}{once:>10.2f}")
+    with patch("aws.websocket_comm_service.get_api_gateway_client", return_value=NoOpApiGateway()):
+        for name in encoders:
+            comm_service = WebSocketCommService("endpoint_url", ConnectionsRepository(connection_ids), name)
+            comm_service.broadcast(EVENT)
+            broadcast = time_per_broadcast(lambda: comm_service.broadcast(EVENT), iterations)
+            print(f"{f'broadcast ({name})':<36}{broadcast:>10.2f}")
+    shutdown_executor()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,40 @@
+import os
+from functools import lru_cache
+from typing import Any, Optional
+
+import boto3
+from botocore.config import Config
+
+# Clients and resources are created once per container and reused by warm invocations,
+# so connections are kept alive across calls instead of paying a new TLS handshake each time.
+BOTO_CONFIG = Config(
+    tcp_keepalive=True,
+    max_pool_connections=int(os.getenv("BOTO_MAX_POOL_CONNECTIONS", "32")),
+    connect_timeout=float(os.getenv("BOTO_CONNECT_TIMEOUT", "2")),
+    read_timeout=float(os.getenv("BOTO_READ_TIMEOUT", "5")),
+    retries={
+        "mode": "adaptive",
+        "max_attempts": int(os.getenv("BOTO_MAX_ATTEMPTS", "5")),
+    },
+)
+
+
+@lru_cache(maxsize=None)
+def get_dynamodb_resource(region: str, endpoint_url: Optional[str] = None) -> Any:
+    return boto3.resource(
+        "dynamodb", region_name=region, endpoint_url=endpoint_url, config=BOTO_CONFIG
+    )
+
+
+@lru_cache(maxsize=None)
+def get_dynamodb_client(region: str, endpoint_url: Optional[str] = None) -> Any:
+    return boto3.client(
+        "dynamodb", region_name=region, endpoint_url=endpoint_url, config=BOTO_CONFIG
+    )
+
+
+@lru_cache(maxsize=None)
+def get_api_gateway_client(endpoint_url: str) -> Any:
+    return boto3.client(
+        "apigatewaymanagementapi", endpoint_url=endpoint_url, config=BOTO_CONFIG
+    )
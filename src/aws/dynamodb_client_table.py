@@ -0,0 +1,67 @@
+from typing import Any, Optional
+
+from aws.dynamodb_codec import deserialize_item, serialize_item
+
+
+class DynamoDBClientTable:
+    """
+    The part of the boto3 Table resource used by DynamoDBRepository, on the low-level client. Items and values are
+    passed as plain Python values and converted by aws.dynamodb_codec rather than by the resource layer.
+    """
+
+    def __init__(self, client: Any, name: str):
+        self._client = client
+        self.name = name
+
+    def get_item(self, Key: dict[str, Any], **kwargs) -> dict[str, Any]:
+        response = self._client.get_item(TableName=self.name, Key=serialize_item(Key), **kwargs)
+        if "Item" in response:
+            response["Item"] = deserialize_item(response["Item"])
+        return response
+
+    def put_item(self, Item: dict[str, Any], **kwargs) -> dict[str, Any]:
+        return self._client.put_item(TableName=self.name, Item=serialize_item(Item), **kwargs)
+
+    def update_item(
+        self, Key: dict[str, Any], ExpressionAttributeValues: Optional[dict[str, Any]] = None, **kwargs
+    ) -> dict[str, Any]:
+        if ExpressionAttributeValues:
+            kwargs["ExpressionAttributeValues"] = serialize_item(ExpressionAttributeValues)
+        return self._client.update_item(TableName=self.name, Key=serialize_item(Key), **kwargs)
+
+    def delete_item(
+        self, Key: dict[str, Any], ExpressionAttributeValues: Optional[dict[str, Any]] = None, **kwargs
+    ) -> dict[str, Any]:
+        if ExpressionAttributeValues:
+            kwargs["ExpressionAttributeValues"] = serialize_item(ExpressionAttributeValues)
+        return self._client.delete_item(TableName=self.name, Key=serialize_item(Key), **kwargs)
+
+    def query(
+        self,
+        ExpressionAttributeValues: Optional[dict[str, Any]] = None,
+        ExclusiveStartKey: Optional[dict[str, Any]] = None,
+        **kwargs,
+    ) -> dict[str, Any]:
+        if ExpressionAttributeValues:
+            kwargs["ExpressionAttributeValues"] = serialize_item(ExpressionAttributeValues)
+        if ExclusiveStartKey:
+            kwargs["ExclusiveStartKey"] = serialize_item(ExclusiveStartKey)
+        response = self._client.query(TableName=self.name, **kwargs)
+        response["Items"] = [deserialize_item(item) for item in response["Items"]]
+        if "LastEvaluatedKey" in response:
+            response["LastEvaluatedKey"] = deserialize_item(response["LastEvaluatedKey"])
+        return response
+
+    def transact_write_items(self, TransactItems: list[dict[str, Any]]) -> dict[str, Any]:
+        """
+        Takes the Put and Update items of the Table resource's client, with TableName set
+        """
+        transact_items = []
+        for transact_item in TransactItems:
+            (operation, kwargs), = transact_item.items()
+            kwargs = dict(kwargs)
+            for name in ("Item", "Key", "ExpressionAttributeValues"):
+                if name in kwargs:
+                    kwargs[name] = serialize_item(kwargs[name])
+            transact_items.append({operation: kwargs})
+        return self._client.transact_write_items(TransactItems=transact_items)
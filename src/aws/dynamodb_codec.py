@@ -0,0 +1,157 @@
+"""
+Encodes items to and decodes items from the attribute values of the low-level DynamoDB client, in place of boto3's
+TypeSerializer and TypeDeserializer. Every number stored by DynamoDBRepository is an integer, so numbers are decoded
+to int rather than Decimal, and the attributes of each item type are decoded by the type they are known to have.
+"""
+
+from decimal import Decimal
+from typing import Any, Callable
+
+NULL = {"NULL": True}
+
+
+def serialize(value: Any) -> dict[str, Any]:
+    value_type = type(value)
+    if value_type is str:
+        return {"S": value}
+    if value is None:
+        return NULL
+    if value_type is bool:
+        return {"BOOL": value}
+    if value_type is int or value_type is Decimal:
+        return {"N": str(value)}
+    if value_type is list or value_type is tuple:
+        return {"L": [serialize(v) for v in value]}
+    if value_type is dict:
+        return {"M": {k: serialize(v) for k, v in value.items()}}
+    raise TypeError(f"Unsupported type {value_type.__name__} for DynamoDB")
+
+
+def deserialize(attribute_value: dict[str, Any]) -> Any:
+    (value_type, value), = attribute_value.items()
+    if value_type == "S":
+        return value
+    if value_type == "N":
+        return _to_number(value)
+    if value_type == "NULL":
+        return None
+    if value_type == "BOOL":
+        return value
+    if value_type == "L":
+        return [deserialize(v) for v in value]
+    if value_type == "M":
+        return {k: deserialize(v) for k, v in value.items()}
+    if value_type == "SS":
+        return set(value)
+    if value_type == "NS":
+        return {_to_number(v) for v in value}
+    raise TypeError(f"Unsupported DynamoDB type {value_type}")
+
+
+def serialize_item(item: dict[str, Any]) -> dict[str, dict[str, Any]]:
+    return {name: serialize(value) for name, value in item.items()}
+
+
+def deserialize_item(item: dict[str, dict[str, Any]]) -> dict[str, Any]:
+    sk = item.get("sk")
+    schema = _get_schema(sk["S"]) if sk else KEY_SCHEMA
+    return {name: schema.get(name, deserialize)(value) for name, value in item.items()}
+
+
+def _to_number(value: str) -> int | Decimal:
+    try:
+        return int(value)
+    except ValueError:
+        return Decimal(value)
+
+
+def _to_string(attribute_value: dict[str, Any]) -> str | None:
+    return attribute_value.get("S")
+
+
+def _to_int(attribute_value: dict[str, Any]) -> int | None:
+    value = attribute_value.get("N")
+    return None if value is None else int(value)
+
+
+def _to_string_list(attribute_value: dict[str, Any]) -> list[str] | None:
+    values = attribute_value.get("L")
+    return None if values is None else [v["S"] for v in values]
+
+
+def _to_string_map(attribute_value: dict[str, Any]) -> dict[str, str] | None:
+    values = attribute_value.get("M")
+    return None if values is None else {k: v["S"] for k, v in values.items()}
+
+
+Schema = dict[str, Callable[[dict[str, Any]], Any]]
+
+KEY_SCHEMA: Schema = {"pk": _to_string, "sk": _to_string}
+VOTE_SCHEMA: Schema = {"votes": _to_string_map, "votes_cast": _to_int, "votes_pass": _to_int, "votes_fail": _to_int}
+GAME_SCHEMA: Schema = {
+    **KEY_SCHEMA,
+    "status": _to_string,
+    "state": _to_string,
+    "player_ids": _to_string_list,
+    "assassination_attempts": _to_int,
+    "result": _to_string,
+    "version": _to_int,
+    "current_quest_number": _to_int,
+    "current_round_number": _to_int,
+    "leader_index": _to_int,
+}
+EVENT_SCHEMA: Schema = {
+    **KEY_SCHEMA,
+    "type": _to_string,
+    "recipients": _to_string_list,
+    "timestamp": _to_string,
+}
+CONNECTION_SCHEMA: Schema = {**KEY_SCHEMA, "game_id": _to_string, "player_id": _to_string}
+# sort key prefix -> schema, the attributes missing from a schema are decoded by their DynamoDB type
+SCHEMAS: dict[str, Schema] = {
+    "player_": {
+        **KEY_SCHEMA,
+        "name": _to_string,
+        "secret": _to_string,
+        "role": _to_string,
+        "known_player_ids": _to_string_list,
+    },
+    "quest_": {
+        **KEY_SCHEMA,
+        **VOTE_SCHEMA,
+        "quest_number": _to_int,
+        "result": _to_string,
+        "team_member_ids": _to_string_list,
+    },
+    "round_": {
+        **KEY_SCHEMA,
+        **VOTE_SCHEMA,
+        "quest_number": _to_int,
+        "round_number": _to_int,
+        "leader_id": _to_string,
+        "team_member_ids": _to_string_list,
+        "result": _to_string,
+    },
+    "vote_round_": {
+        **KEY_SCHEMA,
+        "player_id": _to_string,
+        "quest_number": _to_int,
+        "round_number": _to_int,
+        "result": _to_string,
+    },
+    "vote_quest_": {**KEY_SCHEMA, "player_id": _to_string, "quest_number": _to_int, "result": _to_string},
+    "event_": EVENT_SCHEMA,
+    "private_event_": EVENT_SCHEMA,
+    "connection_id_": {**KEY_SCHEMA, "connection_id": _to_string},
+}
+
+
+def _get_schema(sk: str) -> Schema:
+    if sk == "game":
+        return GAME_SCHEMA
+    if sk == "connection":
+        return CONNECTION_SCHEMA
+    for prefix, schema in SCHEMAS.items():
+        if sk.startswith(prefix):
+            return schema
+    return KEY_SCHEMA
@@ -1,7 +1,11 @@
+import heapq
+import itertools
+import os
 import uuid
-from typing import Any, Optional
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
 
-import boto3
+from botocore.exceptions import ClientError
 
 from game_core.constants.event_type import EventType
 from game_core.constants.game_status import GameStatus
@@ -10,22 +14,51 @@ from game_core.constants.state_name import StateName
 from game_core.constants.vote_result import VoteResult
 from game_core.entities.event import Event
 from game_core.entities.game import Game, GameConfig
+from game_core.entities.game_snapshot import GameSnapshot
 from game_core.entities.player import Player
 from game_core.entities.quest import Quest
 from game_core.entities.quest_vote import QuestVote
 from game_core.entities.round import Round
 from game_core.entities.round_vote import RoundVote
+from game_core.exceptions import ConcurrentModificationError, DuplicateVoteError
+from aws.clients import get_dynamodb_client, get_dynamodb_resource
+from aws.dynamodb_client_table import DynamoDBClientTable
+from aws.ulid import get_timestamp, min_ulid, new_ulid
 from game_core.repository import Repository
 
+MAX_TRANSACTION_ITEMS = 100
+
 
 class DynamoDBRepository(Repository):
 
-    def __init__(self, table: str, region: str, endpoint_url: Optional[str] = None):
-        self._table = table
-        self._dynamodb = boto3.resource(
-            "dynamodb", region_name=region, endpoint_url=endpoint_url
-        )
-        self._table = self._dynamodb.Table(table)
+    def __init__(
+        self,
+        table: str,
+        region: str,
+        endpoint_url: Optional[str] = None,
+        low_level_client: Optional[bool] = None,
+        since_window_ms: Optional[int] = None,
+    ):
+        """
+        :param low_level_client: use the low-level client and the item codec of aws.dynamodb_codec instead of the
+        Table resource, defaults to the DYNAMODB_LOW_LEVEL_CLIENT environment variable
+        :param since_window_ms: how far before the since cursor events are read again, the largest clock skew between
+        the processes writing events, defaults to the EVENTS_SINCE_WINDOW_MS environment variable or 1000
+        """
+        if since_window_ms is None:
+            since_window_ms = int(os.getenv("EVENTS_SINCE_WINDOW_MS", "1000"))
+        self._since_window_ms = since_window_ms
+        if low_level_client is None:
+            low_level_client = os.getenv("DYNAMODB_LOW_LEVEL_CLIENT", "false").lower() == "true"
+        if low_level_client:
+            self._table = DynamoDBClientTable(get_dynamodb_client(region, endpoint_url), table)
+            self._transact_write_items = self._table.transact_write_items
+        else:
+            dynamodb = get_dynamodb_resource(region, endpoint_url)
+            self._table = dynamodb.Table(table)
+            self._transact_write_items = dynamodb.meta.client.transact_write_items
+        # (pk, sk) -> write buffered by the current unit of work, None when writes are sent straight away
+        self._pending_writes: Optional[dict[tuple[str, str], dict[str, Any]]] = None
 
     def put_game(self) -> Game:
         game_id = uuid.uuid4().hex
@@ -36,8 +69,9 @@ class DynamoDBRepository(Repository):
             "state": StateName.GameSetup.value,
             "config": None,
             "player_ids": [],
+            "version": 0,
         }
-        self._table.put_item(Item=item)
+        self._put_item(item)
         return Game(
             game_id,
             GameStatus.NotStarted,
@@ -49,41 +83,50 @@ class DynamoDBRepository(Repository):
         )
 
     def get_game(self, game_id: str) -> Game:
-        response = self._table.get_item(Key={"pk": game_id, "sk": "game"})
-        if "Item" not in response:
+        item = self._get_item({"pk": game_id, "sk": "game"})
+        if not item:
             raise ValueError(f"Game {game_id} not found")
-        item = response["Item"]
-
-        game_config = GameConfig(
-            quest_team_size={int(k): int(v) for k, v in item["config"]["quest_team_size"].items()},
-            roles=item["config"]["roles"],
-            known_roles=item["config"]["known_roles"],
-            assassination_attempts=item["config"]["assassination_attempts"],
-        ) if item["config"] else None
-        return Game(
-            id=item["pk"],
-            status=GameStatus(item["status"]),
-            state=StateName(item["state"]),
-            config=game_config,
-            player_ids=item.get("player_ids"),
-            assassination_attempts=item.get("assassination_attempts"),
-            result=item.get("result"),
-        )
+        return self._to_game(item)
+
+    def get_game_snapshot(self, game_id: str) -> GameSnapshot:
+        """
+        Reads the items of the game around its events, which sort between connection_id_ and game, and between
+        player_ and quest_, with a key condition each, so the event log is not read
+        """
+        key_conditions = [
+            ("sk < :event_start", {":event_start": "event_"}),
+            (
+                "sk BETWEEN :event_end AND :private_event_start",
+                {":event_end": "event_~", ":private_event_start": "private_event_"},
+            ),
+            ("sk > :private_event_end", {":private_event_end": "private_event_~"}),
+        ]
+        items = []
+        for key_condition, values in key_conditions:
+            query_kwargs = {
+                "KeyConditionExpression": f"pk = :pk AND {key_condition}",
+                "ExpressionAttributeValues": {":pk": game_id, **values},
+            }
+            items.extend(self._paginate(query_kwargs))
+        game_items = [item for item in items if item["sk"] == "game"]
+        if not game_items:
+            raise ValueError(f"Game {game_id} not found")
+        snapshot = GameSnapshot(game=self._to_game(game_items[0]))
+        for item in items:
+            sk = item["sk"]
+            if sk.startswith("player_"):
+                snapshot.players.append(self._to_player(game_id, item))
+            elif sk.startswith("quest_"):
+                snapshot.quests.append(self._to_quest(game_id, item))
+                snapshot.quest_votes.extend(self._to_quest_votes(game_id, item))
+            elif sk.startswith("round_"):
+                snapshot.rounds.append(self._to_round(game_id, item))
+                snapshot.round_votes.extend(self._to_round_votes(game_id, item))
+            elif sk.startswith("connection_id_"):
+                snapshot.connection_ids[sk.removeprefix("connection_id_")] = item["connection_id"]
+        return snapshot
 
     def update_game(self, game: Game) -> Game:
-        key = {
-            "pk": game.id,
-            "sk": "game",
-        }
-        update_expression = "SET #status = :status, #state = :state, #config = :config, #player_ids = :player_ids, #assassination_attempts = :assassination_attempts, #result = :result"
-        expression_attribute_names = {
-            "#status": "status",
-            "#state": "state",
-            "#config": "config",
-            "#player_ids": "player_ids",
-            "#assassination_attempts": "assassination_attempts",
-            "#result": "result",
-        }
         config = None
         if game.config:
             config = {
@@ -92,20 +135,26 @@ class DynamoDBRepository(Repository):
                 "known_roles": game.config.known_roles,
                 "assassination_attempts": game.config.assassination_attempts,
             }
-        expression_attribute_values = {
-            ":status": game.status.value,
-            ":state": game.state.value,
-            ":config": config,
-            ":player_ids": game.player_ids,
-            ":assassination_attempts": game.assassination_attempts,
-            ":result": game.result,
-        }
-        self._table.update_item(
-            Key=key,
-            UpdateExpression=update_expression,
-            ExpressionAttributeNames=expression_attribute_names,
-            ExpressionAttributeValues=expression_attribute_values,
+        self._update_item(
+            {"pk": game.id, "sk": "game"},
+            {
+                "status": game.status.value,
+                "state": game.state.value,
+                "config": config,
+                "player_ids": game.player_ids,
+                "assassination_attempts": game.assassination_attempts,
+                "result": game.result,
+                "version": game.version + 1,
+                "current_quest_number": game.current_quest_number,
+                "current_round_number": game.current_round_number,
+                "leader_index": game.leader_index,
+            },
+            # games created before versioning have no version attribute
+            condition="#version = :expected_version OR attribute_not_exists(#version)",
+            condition_values={":expected_version": game.version},
+            condition_error=ConcurrentModificationError(f"Game {game.id} was modified since version {game.version}"),
         )
+        game.version += 1
         return game
 
     def put_event(
@@ -116,18 +165,25 @@ class DynamoDBRepository(Repository):
         payload: dict[str, Any],
         timestamp: str,
     ) -> Event:
-        event_id = uuid.uuid4().hex
+        """
+        Public events are stored once under event_<id>. A private event is stored once per recipient under
+        private_event_<recipient>_<id>, so each player reads only their own private events. The event is given the id
+        get_events gives it, for a private event the one of its first recipient's item, see
+        WebSocketCommService which gives each recipient the id of their own item.
+        """
+        event_id = new_ulid()
         item = {
             "pk": game_id,
-            "sk": f"event_{event_id}",
             "type": event_type.value,
             "recipients": recipients,
             "payload": payload,
             "timestamp": timestamp,
         }
-        self._table.put_item(Item=item)
+        sks = [f"private_event_{recipient}_{event_id}" for recipient in recipients] or [f"event_{event_id}"]
+        for sk in sks:
+            self._put_item({**item, "sk": sk})
         return Event(
-            id=event_id,
+            id=f"{game_id}_{sks[0]}",
             game_id=game_id,
             type=event_type,
             recipients=recipients,
@@ -135,45 +191,58 @@ class DynamoDBRepository(Repository):
             timestamp=timestamp,
         )
 
-    def get_events(self, game_id: str, player_id: str) -> list[Event]:
-        response = self._table.query(
-            KeyConditionExpression="pk = :pk and begins_with(sk, :sk)",
-            ExpressionAttributeValues={
-                ":pk": game_id,
-                ":sk": "event_",
-            },
+    def get_events(self, game_id: str, player_id: str, since: Optional[str] = None) -> list[Event]:
+        return list(self.iter_events(game_id, player_id, since=since))
+
+    def iter_events(
+        self,
+        game_id: str,
+        player_id: str,
+        limit: Optional[int] = None,
+        page_size: Optional[int] = None,
+        since: Optional[str] = None,
+    ) -> Iterator[Event]:
+        """
+        Iterates over the events visible to the player in the order they were created, merging the public events
+        with the player's private events
+        :param since: id of the last event the player has seen. The event ids come from the clocks of the processes
+        that created the events, so an event created by a process whose clock is behind may get an older id than an
+        event the player has seen. Events up to since_window_ms older than it are hence returned again, apart from
+        the since event itself, and the client drops the events it has seen by their ids.
+        """
+        event_id = since.rsplit("_", 1)[-1] if since else None
+        # the largest id before the window, the events are read from the one after it
+        after_id = event_id and min_ulid(max(get_timestamp(event_id) - self._since_window_ms, 0))
+        private_prefix = f"private_event_{player_id}_"
+        public_items = self._iter_query_items(
+            game_id,
+            "event_",
+            page_size=page_size or limit,
+            after_sk=after_id and f"event_{after_id}",
+        )
+        private_items = self._iter_query_items(
+            game_id,
+            private_prefix,
+            page_size=page_size or limit,
+            after_sk=after_id and f"{private_prefix}{after_id}",
         )
-        events = []
-        for item in response["Items"]:
-            recipients = item.get("recipients", [])
-            if recipients == [] or player_id in recipients:
-                events.append(
-                    Event(
-                        id=f"{item["pk"]}_{item["sk"]}",
-                        game_id=item["pk"],
-                        type=EventType(item["type"]),
-                        recipients=item["recipients"],
-                        payload=item["payload"],
-                        timestamp=item["timestamp"],
-                    )
-                )
-        return events
+        # events stored before private events had their own items are filtered here
+        public_items = (
+            item
+            for item in public_items
+            if item.get("recipients", []) == [] or player_id in item["recipients"]
+        )
+        items = heapq.merge(public_items, private_items, key=lambda item: item["sk"].rsplit("_", 1)[-1])
+        items = (item for item in items if item["sk"].rsplit("_", 1)[-1] != event_id)
+        return itertools.islice((self._to_event(item) for item in items), limit)
 
     def get_player(self, player_id: str) -> Player:
         # player_id = gameId_player_playerId
         game_id, sk = player_id.split("_", 1)
-        response = self._table.get_item(Key={"pk": game_id, "sk": sk})
-        if "Item" not in response:
+        item = self._get_item({"pk": game_id, "sk": sk})
+        if not item:
             raise ValueError(f"Player {player_id} not found")
-        item = response["Item"]
-        return Player(
-            id=player_id,
-            game_id=game_id,
-            name=item["name"],
-            secret=item["secret"],
-            role=Role(item["role"]) if item.get("role") else None,
-            known_player_ids=item.get("known_player_ids", []),
-        )
+        return self._to_player(game_id, item)
 
     def put_player(self, player_id: str, game_id: str, name: str, secret: str) -> Player:
         item = {
@@ -184,7 +253,7 @@ class DynamoDBRepository(Repository):
             "role": None,
             "known_player_ids": [],
         }
-        self._table.put_item(Item=item)
+        self._put_item(item)
         return Player(
             id=f"{game_id}_player_{player_id}",
             game_id=game_id,
@@ -195,60 +264,25 @@ class DynamoDBRepository(Repository):
         )
 
     def update_player(self, player: Player) -> Player:
-        key = {
-            "pk": player.game_id,
-            "sk": player.id.split("_", 1)[1],
-        }
-        update_expression = "SET #name=:name, #secret=:secret, #role=:role, #known_player_ids=:known_player_ids"
-        expression_attribute_names = {
-            "#name": "name",
-            "#secret": "secret",
-            "#role": "role",
-            "#known_player_ids": "known_player_ids",
-        }
-        expression_attribute_values = {
-            ":name": player.name,
-            ":secret": player.secret,
-            ":role": player.role.value if player.role else None,
-            ":known_player_ids": player.known_player_ids,
-        }
-
-        res = self._table.update_item(
-            Key=key,
-            UpdateExpression=update_expression,
-            ExpressionAttributeNames=expression_attribute_names,
-            ExpressionAttributeValues=expression_attribute_values,
-            ReturnValues="UPDATED_NEW"
-        )
-        attributes = res["Attributes"]
-        return Player(
-            id=player.id,
-            game_id=player.game_id,
-            name=attributes["name"],
-            secret=attributes["secret"],
-            role=Role(attributes["role"]) if attributes.get("role") else None,
-            known_player_ids=attributes.get("known_player_ids", []),
+        self._update_item(
+            {"pk": player.game_id, "sk": player.id.split("_", 1)[1]},
+            {
+                "name": player.name,
+                "secret": player.secret,
+                "role": player.role.value if player.role else None,
+                "known_player_ids": player.known_player_ids,
+            },
         )
+        return player
 
     def get_players(self, game_id: str) -> list[Player]:
-        key_condition_expression = "pk = :pk AND begins_with(sk, :sk_prefix)"
-        expression_attribute_values = {":pk": game_id, ":sk_prefix": "player_"}
-        response = self._table.query(
-            KeyConditionExpression=key_condition_expression,
-            ExpressionAttributeValues=expression_attribute_values
-        )
-        items = response["Items"]
-        return [
-            Player(
-                id=f"{game_id}_{item['sk']}",
-                game_id=game_id,
-                name=item["name"],
-                secret=item["secret"],
-                role=Role(item["role"]) if item.get("role") else None,
-                known_player_ids=item.get("known_player_ids", []),
-            )
-            for item in items
-        ]
+        return list(self.iter_players(game_id))
+
+    def iter_players(
+        self, game_id: str, limit: Optional[int] = None, page_size: Optional[int] = None
+    ) -> Iterator[Player]:
+        items = self._iter_query_items(game_id, "player_", limit, page_size)
+        return (self._to_player(game_id, item) for item in items)
 
     def put_quest(self, game_id: str, quest_number: int) -> Quest:
         pk = game_id
@@ -259,8 +293,12 @@ class DynamoDBRepository(Repository):
             "quest_number": quest_number,
             "result": None,
             "team_member_ids": [],
+            "votes": {},
+            "votes_cast": 0,
+            "votes_pass": 0,
+            "votes_fail": 0,
         }
-        self._table.put_item(Item=item)
+        self._put_item(item)
         return Quest(
             id=f"{pk}_{sk}",
             game_id=game_id,
@@ -270,128 +308,68 @@ class DynamoDBRepository(Repository):
         )
 
     def get_quests(self, game_id: str) -> list[Quest]:
-        key_condition_expression = "pk = :pk AND begins_with(sk, :sk_prefix)"
-        expression_attribute_values = {":pk": game_id, ":sk_prefix": "quest_"}
-        response = self._table.query(
-            KeyConditionExpression=key_condition_expression,
-            ExpressionAttributeValues=expression_attribute_values
-        )
-        items = response["Items"]
-        return [
-            Quest(
-                id=f"{game_id}_{item['sk']}",
-                game_id=game_id,
-                quest_number=int(item["quest_number"]),
-                result=VoteResult(item["result"]) if item.get("result") else None,
-                team_member_ids=item["team_member_ids"],
-            )
-            for item in items
-        ]
+        return list(self.iter_quests(game_id))
 
-    def update_quest(self, quest: Quest) -> Quest:
-        key = {
-            "pk": quest.game_id,
-            "sk": quest.id.split("_", 1)[1],
-        }
-        update_expression = "SET #quest_number=:quest_number, #result=:result, #team_member_ids=:team_member_ids"
-        expression_attribute_names = {
-            "#quest_number": "quest_number",
-            "#result": "result",
-            "#team_member_ids": "team_member_ids",
-        }
-        expression_attribute_values = {
-            ":quest_number": quest.quest_number,
-            ":result": quest.result and quest.result.value,
-            ":team_member_ids": quest.team_member_ids,
-        }
+    def iter_quests(
+        self, game_id: str, limit: Optional[int] = None, page_size: Optional[int] = None
+    ) -> Iterator[Quest]:
+        items = self._iter_query_items(game_id, "quest_", limit, page_size)
+        return (self._to_quest(game_id, item) for item in items)
 
-        res = self._table.update_item(
-            Key=key,
-            UpdateExpression=update_expression,
-            ExpressionAttributeNames=expression_attribute_names,
-            ExpressionAttributeValues=expression_attribute_values,
-            ReturnValues="UPDATED_NEW"
-        )
-        attributes = res["Attributes"]
-        return Quest(
-            id=quest.id,
-            game_id=quest.game_id,
-            quest_number=attributes["quest_number"],
-            result=VoteResult(attributes["result"]) if attributes.get("result") else None,
-            team_member_ids=attributes["team_member_ids"],
+    def update_quest(self, quest: Quest) -> Quest:
+        self._update_item(
+            {"pk": quest.game_id, "sk": quest.id.split("_", 1)[1]},
+            {
+                "quest_number": quest.quest_number,
+                "result": quest.result and quest.result.value,
+                "team_member_ids": quest.team_member_ids,
+            },
         )
+        return quest
 
     def get_quest(self, game_id: str, quest_number: int) -> Quest:
-        response = self._table.get_item(Key={"pk": game_id, "sk": f"quest_{quest_number}"})
-        if "Item" not in response:
+        item = self._get_item({"pk": game_id, "sk": f"quest_{quest_number}"})
+        if not item:
             raise ValueError(f"Quest {game_id}_{quest_number} not found")
-        item = response["Item"]
-        return Quest(
-            id=f"{game_id}_quest_{quest_number}",
-            game_id=game_id,
-            quest_number=quest_number,
-            result=VoteResult(item["result"]) if item.get("result") else None,
-            team_member_ids=item["team_member_ids"],
-        )
+        return self._to_quest(game_id, item)
 
     def put_quest_vote(
             self, game_id: str, quest_number: int, player_id: str, is_approved: bool
     ) -> QuestVote:
-        item = {
-            "pk": game_id,
-            "sk": f"vote_quest_{quest_number}_{player_id}",
-            "player_id": player_id,
-            "quest_number": quest_number,
-            "result": (VoteResult.Pass.value if is_approved else VoteResult.Fail.value),
-        }
-        self._table.put_item(Item=item)
+        """
+        The vote is stored in the votes map of the quest item, keyed by player id
+        """
+        vote_result = VoteResult.Pass if is_approved else VoteResult.Fail
+        key = {"pk": game_id, "sk": f"quest_{quest_number}"}
+        with self.unit_of_work():
+            self._put_map_entry(
+                key,
+                "votes",
+                player_id,
+                vote_result.value,
+                if_exists_error=DuplicateVoteError(f"Player {player_id} already voted for quest {quest_number}"),
+            )
+            self._increment_item(key, self._vote_increments(vote_result))
         return QuestVote(
             id=f"{game_id}_vote_quest_{quest_number}_{player_id}",
             game_id=game_id,
             player_id=player_id,
             quest_number=quest_number,
-            result=(VoteResult.Pass if is_approved else VoteResult.Fail),
+            result=vote_result,
         )
 
     def get_quest_votes(self, game_id: str, quest_number: int) -> list[QuestVote]:
-        key_condition_expression = "pk = :pk AND begins_with(sk, :sk_prefix)"
-        expression_attribute_values = {":pk": game_id, ":sk_prefix": f"vote_quest_{quest_number}_"}
-        response = self._table.query(
-            KeyConditionExpression=key_condition_expression,
-            ExpressionAttributeValues=expression_attribute_values
-        )
-        items = response["Items"]
-        return [
-            QuestVote(
-                id=f"{game_id}_{item['sk']}",
-                game_id=game_id,
-                player_id=item["player_id"],
-                quest_number=int(item["quest_number"]),
-                result=VoteResult(item["result"]),
-            )
-            for item in items
-        ]
+        item = self._get_item({"pk": game_id, "sk": f"quest_{quest_number}"})
+        return self._to_quest_votes(game_id, item) if item else []
 
     def get_rounds(self, game_id: str) -> list[Round]:
-        key_condition_expression = "pk = :pk AND begins_with(sk, :sk_prefix)"
-        expression_attribute_values = {":pk": game_id, ":sk_prefix": "round_"}
-        response = self._table.query(
-            KeyConditionExpression=key_condition_expression,
-            ExpressionAttributeValues=expression_attribute_values
-        )
-        items = response["Items"]
-        return [
-            Round(
-                id=f"{game_id}_{item['sk']}",
-                game_id=game_id,
-                quest_number=int(item["quest_number"]),
-                round_number=int(item["round_number"]),
-                leader_id=item["leader_id"],
-                team_member_ids=item["team_member_ids"],
-                result=(VoteResult(item["result"]) if item.get("result") else None),
-            )
-            for item in items
-        ]
+        return list(self.iter_rounds(game_id))
+
+    def iter_rounds(
+        self, game_id: str, limit: Optional[int] = None, page_size: Optional[int] = None
+    ) -> Iterator[Round]:
+        items = self._iter_query_items(game_id, "round_", limit, page_size)
+        return (self._to_round(game_id, item) for item in items)
 
     def put_round(
         self, game_id: str, quest_number: int, round_number: int, leader_id: str
@@ -403,8 +381,12 @@ class DynamoDBRepository(Repository):
             "round_number": round_number,
             "leader_id": leader_id,
             "team_member_ids": [],
+            "votes": {},
+            "votes_cast": 0,
+            "votes_pass": 0,
+            "votes_fail": 0,
         }
-        self._table.put_item(Item=item)
+        self._put_item(item)
         return Round(
             id=f"{game_id}_round_{quest_number}_{round_number}",
             game_id=game_id,
@@ -415,58 +397,23 @@ class DynamoDBRepository(Repository):
         )
 
     def get_round(self, game_id: str, quest_number: int, round_number: int) -> Round:
-        response = self._table.get_item(Key={"pk": game_id, "sk": f"round_{quest_number}_{round_number}"})
-        if "Item" not in response:
+        item = self._get_item({"pk": game_id, "sk": f"round_{quest_number}_{round_number}"})
+        if not item:
             raise ValueError(f"Round {game_id}_{quest_number}_{round_number} not found")
-        item = response["Item"]
-        return Round(
-            id=f"{game_id}_round_{quest_number}_{round_number}",
-            game_id=game_id,
-            quest_number=quest_number,
-            round_number=round_number,
-            leader_id=item["leader_id"],
-            team_member_ids=item["team_member_ids"],
-            result=(VoteResult(item["result"]) if item.get("result") else None)
-        )
+        return self._to_round(game_id, item)
 
     def update_round(self, game_round: Round) -> Round:
-        key = {
-            "pk": game_round.game_id,
-            "sk": game_round.id.split("_", 1)[1],
-        }
-        update_expression = "SET #quest_number=:quest_number, #round_number=:round_number, #leader_id=:leader_id, #team_member_ids=:team_member_ids, #result=:result"
-        expression_attribute_names = {
-            "#quest_number": "quest_number",
-            "#round_number": "round_number",
-            "#leader_id": "leader_id",
-            "#team_member_ids": "team_member_ids",
-            "#result": "result",
-        }
-        expression_attribute_values = {
-            ":quest_number": game_round.quest_number,
-            ":round_number": game_round.round_number,
-            ":leader_id": game_round.leader_id,
-            ":team_member_ids": game_round.team_member_ids,
-            ":result": game_round.result and game_round.result.value,
-        }
-
-        res = self._table.update_item(
-            Key=key,
-            UpdateExpression=update_expression,
-            ExpressionAttributeNames=expression_attribute_names,
-            ExpressionAttributeValues=expression_attribute_values,
-            ReturnValues="UPDATED_NEW"
-        )
-        attributes = res["Attributes"]
-        return Round(
-            id=game_round.id,
-            game_id=game_round.game_id,
-            quest_number=attributes["quest_number"],
-            round_number=attributes["round_number"],
-            leader_id=attributes["leader_id"],
-            team_member_ids=attributes["team_member_ids"],
-            result=VoteResult(attributes["result"]) if attributes.get("result") else None,
+        self._update_item(
+            {"pk": game_round.game_id, "sk": game_round.id.split("_", 1)[1]},
+            {
+                "quest_number": game_round.quest_number,
+                "round_number": game_round.round_number,
+                "leader_id": game_round.leader_id,
+                "team_member_ids": game_round.team_member_ids,
+                "result": game_round.result and game_round.result.value,
+            },
         )
+        return game_round
 
     def put_round_vote(
         self,
@@ -476,15 +423,21 @@ class DynamoDBRepository(Repository):
         player_id: str,
         vote_result: VoteResult,
     ) -> RoundVote:
-        item = {
-            "pk": game_id,
-            "sk": f"vote_round_{quest_number}_{round_number}_{player_id}",
-            "player_id": player_id,
-            "quest_number": quest_number,
-            "round_number": round_number,
-            "result": vote_result.value,
-        }
-        self._table.put_item(Item=item)
+        """
+        The vote is stored in the votes map of the round item, keyed by player id
+        """
+        key = {"pk": game_id, "sk": f"round_{quest_number}_{round_number}"}
+        with self.unit_of_work():
+            self._put_map_entry(
+                key,
+                "votes",
+                player_id,
+                vote_result.value,
+                if_exists_error=DuplicateVoteError(
+                    f"Player {player_id} already voted for quest {quest_number} round {round_number}"
+                ),
+            )
+            self._increment_item(key, self._vote_increments(vote_result))
         return RoundVote(
             id=f"{game_id}_vote_round_{quest_number}_{round_number}_{player_id}",
             game_id=game_id,
@@ -494,52 +447,473 @@ class DynamoDBRepository(Repository):
             result=vote_result,
         )
 
-    def get_round_votes(
-        self, game_id: str, quest_number: int, round_number: int
-    ) -> list[RoundVote]:
-        key_condition_expression = "pk = :pk AND begins_with(sk, :sk_prefix)"
-        expression_attribute_values = {":pk": game_id, ":sk_prefix": f"vote_round_{quest_number}_{round_number}_"}
-        response = self._table.query(
-            KeyConditionExpression=key_condition_expression,
-            ExpressionAttributeValues=expression_attribute_values
-        )
-        items = response["Items"]
-        return [
-            RoundVote(
-                id=f"{game_id}_{item['sk']}",
-                game_id=game_id,
-                quest_number=int(item["quest_number"]),
-                round_number=int(item["round_number"]),
-                player_id=item["player_id"],
-                result=VoteResult(item["result"]),
-            )
-            for item in items
-        ]
+    def get_round_votes(self, game_id: str, quest_number: int, round_number: int) -> list[RoundVote]:
+        item = self._get_item({"pk": game_id, "sk": f"round_{quest_number}_{round_number}"})
+        return self._to_round_votes(game_id, item) if item else []
 
     def put_connection_id(self, game_id: str, player_id: str, connection_id: str) -> None:
+        """
+        Stores the connection of the player, and the game and player of the connection under the connection's own
+        partition, as a $disconnect event only carries the connection id. Both are written in one transaction, so a
+        stored connection can always be cleaned up on disconnect.
+        """
+        connection = {
+            "pk": f"connection_{connection_id}",
+            "sk": "connection",
+            "game_id": game_id,
+            "player_id": player_id,
+        }
         item = {
             "pk": game_id,
             "sk": f"connection_id_{player_id}",
             "connection_id": connection_id,
         }
-        self._table.put_item(Item=item)
+        with self.unit_of_work():
+            self._put_item(connection)
+            self._put_item(item)
+
+    def get_connection(self, connection_id: str) -> Optional[tuple[str, str]]:
+        """
+        :return: the game id and the player id of the connection, None if it is not stored
+        """
+        item = self._get_item({"pk": f"connection_{connection_id}", "sk": "connection"})
+        return (item["game_id"], item["player_id"]) if item else None
+
+    def delete_connection_id(self, game_id: str, player_id: str, connection_id: str) -> None:
+        """
+        Deletes the connection of the player, unless the player has connected again with another connection since
+        """
+        self._delete_item(
+            {"pk": game_id, "sk": f"connection_id_{player_id}"},
+            condition="connection_id = :connection_id",
+            condition_values={":connection_id": connection_id},
+        )
+        self._delete_item({"pk": f"connection_{connection_id}", "sk": "connection"})
 
     def get_connection_id(self, game_id: str, player_id: str) -> str:
         key = {
             "pk": game_id,
             "sk": f"connection_id_{player_id}",
         }
-        response = self._table.get_item(Key=key)
-        if "Item" not in response:
+        item = self._get_item(key)
+        if not item:
             raise ValueError(f"Connection ID {game_id}_{player_id} not found")
-        return response["Item"]["connection_id"]
+        return item["connection_id"]
+
+    def get_player_connection_ids(self, game_id: str) -> dict[str, str]:
+        """
+        :return: the connection id of each connected player of the game, by player id
+        """
+        items = self._iter_query_items(game_id, "connection_id_")
+        return {item["sk"].removeprefix("connection_id_"): item["connection_id"] for item in items}
 
     def get_connection_ids(self, game_id: str) -> list[str]:
-        key_condition_expression = "pk = :pk AND begins_with(sk, :sk_prefix)"
-        expression_attribute_values = {":pk": game_id, ":sk_prefix": "connection_id_"}
-        response = self._table.query(
-            KeyConditionExpression=key_condition_expression,
-            ExpressionAttributeValues=expression_attribute_values
+        return list(self.iter_connection_ids(game_id))
+
+    def iter_connection_ids(
+        self, game_id: str, limit: Optional[int] = None, page_size: Optional[int] = None
+    ) -> Iterator[str]:
+        items = self._iter_query_items(game_id, "connection_id_", limit, page_size)
+        return (item["connection_id"] for item in items)
+
+    @contextmanager
+    def unit_of_work(self) -> Iterator[None]:
+        """
+        Buffers the puts and updates made inside the block and flushes them with TransactWriteItems when the block
+        exits without error. Reads inside the block see the buffered writes.
+        """
+        if self._pending_writes is not None:
+            yield
+            return
+        self._pending_writes = {}
+        try:
+            yield
+            pending_writes = self._pending_writes
+            self._pending_writes = None
+            self._flush(pending_writes)
+        finally:
+            self._pending_writes = None
+
+    def _flush(self, pending_writes: dict[tuple[str, str], dict[str, Any]]) -> None:
+        # conditional writes go first, so a failed condition cancels the first transaction before anything is written
+        writes = sorted(pending_writes.items(), key=lambda key_write: not self._is_conditional(key_write[1]))
+        if len(writes) == 1:
+            (pk, sk), write = writes[0]
+            try:
+                if write["is_put"]:
+                    self._table.put_item(**self._put_kwargs(write))
+                else:
+                    self._table.update_item(**self._update_kwargs({"pk": pk, "sk": sk}, write))
+            except ClientError as e:
+                self._raise_condition_error(e, [write])
+                raise
+            return
+
+        for i in range(0, len(writes), MAX_TRANSACTION_ITEMS):
+            chunk = writes[i:i + MAX_TRANSACTION_ITEMS]
+            transact_items = []
+            for (pk, sk), write in chunk:
+                if write["is_put"]:
+                    transact_items.append({"Put": {"TableName": self._table.name, **self._put_kwargs(write)}})
+                else:
+                    update_kwargs = self._update_kwargs({"pk": pk, "sk": sk}, write)
+                    transact_items.append({"Update": {"TableName": self._table.name, **update_kwargs}})
+            try:
+                self._transact_write_items(TransactItems=transact_items)
+            except ClientError as e:
+                self._raise_condition_error(e, [write for _, write in chunk])
+                raise
+
+    @staticmethod
+    def _raise_condition_error(error: ClientError, writes: list[dict[str, Any]]) -> None:
+        """
+        Raises the error registered with the write whose condition failed, if any
+        """
+        code = error.response["Error"]["Code"]
+        if code == "ConditionalCheckFailedException":
+            reasons = [{"Code": "ConditionalCheckFailed"}]
+        elif code == "TransactionCanceledException":
+            reasons = error.response.get("CancellationReasons", [])
+        else:
+            return
+        for write, reason in zip(writes, reasons):
+            if reason.get("Code") == "ConditionalCheckFailed" and write.get("condition_error"):
+                raise write["condition_error"] from error
+
+    @staticmethod
+    def _is_conditional(write: dict[str, Any]) -> bool:
+        return bool(write.get("condition") or write.get("map_entries"))
+
+    def _put_item(self, item: dict[str, Any], if_not_exists_error: Optional[Exception] = None) -> None:
+        """
+        :param if_not_exists_error: when given, the item is only put if no item has its key, otherwise this error
+        is raised
+        """
+        key = (item["pk"], item["sk"])
+        write = {"is_put": True, "attributes": dict(item)}
+        if if_not_exists_error:
+            write["condition"] = "attribute_not_exists(sk)"
+            write["condition_error"] = if_not_exists_error
+        if self._pending_writes is None:
+            self._flush({key: write})
+            return
+        if if_not_exists_error and key in self._pending_writes:
+            raise if_not_exists_error
+        self._pending_writes[key] = write
+
+    @staticmethod
+    def _put_kwargs(write: dict[str, Any]) -> dict[str, Any]:
+        put_kwargs = {"Item": write["attributes"]}
+        if write.get("condition"):
+            put_kwargs["ConditionExpression"] = write["condition"]
+        return put_kwargs
+
+    def _update_item(
+        self,
+        key: dict[str, str],
+        attributes: dict[str, Any],
+        condition: Optional[str] = None,
+        condition_values: Optional[dict[str, Any]] = None,
+        condition_error: Optional[Exception] = None,
+    ) -> None:
+        """
+        :param condition: condition expression the stored item must meet, otherwise condition_error is raised.
+        Within a unit of work the first condition given for an item is kept, as it was checked against the stored
+        item rather than the buffered one.
+        """
+        pending_write = self._get_pending_write(key)
+        pending_write["attributes"].update(attributes)
+        if condition and not pending_write["is_put"] and not pending_write.get("condition"):
+            pending_write["condition"] = condition
+            pending_write["condition_values"] = condition_values or {}
+            pending_write["condition_error"] = condition_error
+        if self._pending_writes is None:
+            self._flush({(key["pk"], key["sk"]): pending_write})
+
+    def _increment_item(self, key: dict[str, str], increments: dict[str, int]) -> None:
+        """
+        Adds to numeric attributes with an ADD update expression, so concurrent increments are not lost
+        """
+        pending_write = self._get_pending_write(key)
+        # a buffered put already holds the whole item, so the increments are applied to it
+        counters = pending_write["attributes"] if pending_write["is_put"] else pending_write["increments"]
+        for name, delta in increments.items():
+            counters[name] = counters.get(name, 0) + delta
+        if self._pending_writes is None:
+            self._flush({(key["pk"], key["sk"]): pending_write})
+
+    def _put_map_entry(
+        self, key: dict[str, str], map_name: str, entry_key: str, value: Any, if_exists_error: Exception
+    ) -> None:
+        """
+        Sets an entry of a map attribute through its document path, on condition the map has no entry with the key
+        yet. The map attribute must already exist on the item.
+        :param if_exists_error: raised if the map already has an entry with the key
+        """
+        pending_write = self._get_pending_write(key)
+        if pending_write["is_put"]:
+            entries = pending_write["attributes"][map_name] = dict(pending_write["attributes"].get(map_name) or {})
+        else:
+            entries = pending_write["map_entries"].setdefault(map_name, {})
+            pending_write.setdefault("condition_error", if_exists_error)
+        if entry_key in entries:
+            raise if_exists_error
+        entries[entry_key] = value
+        if self._pending_writes is None:
+            self._flush({(key["pk"], key["sk"]): pending_write})
+
+    def _delete_item(
+        self, key: dict[str, str], condition: Optional[str] = None, condition_values: Optional[dict[str, Any]] = None
+    ) -> None:
+        """
+        Deletes the item straight away, deletes are not buffered by the unit of work
+        :param condition: condition expression the stored item must meet to be deleted, otherwise it is kept
+        """
+        if self._pending_writes is not None:
+            raise ValueError("Items cannot be deleted inside a unit of work")
+        delete_kwargs: dict[str, Any] = {"Key": key}
+        if condition:
+            delete_kwargs["ConditionExpression"] = condition
+            delete_kwargs["ExpressionAttributeValues"] = condition_values or {}
+        try:
+            self._table.delete_item(**delete_kwargs)
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+
+    def _get_pending_write(self, key: dict[str, str]) -> dict[str, Any]:
+        """
+        Returns the write buffered for the item, creating an empty update if there is none. Outside a unit of work
+        the returned write is not buffered and has to be flushed by the caller.
+        """
+        empty_update = {"is_put": False, "attributes": {}, "increments": {}, "map_entries": {}}
+        if self._pending_writes is None:
+            return empty_update
+        return self._pending_writes.setdefault((key["pk"], key["sk"]), empty_update)
+
+    @staticmethod
+    def _vote_increments(vote_result: VoteResult) -> dict[str, int]:
+        if vote_result == VoteResult.Pass:
+            return {"votes_cast": 1, "votes_pass": 1}
+        return {"votes_cast": 1, "votes_fail": 1}
+
+    @staticmethod
+    def _update_kwargs(key: dict[str, str], write: dict[str, Any]) -> dict[str, Any]:
+        attributes = write["attributes"]
+        increments = write["increments"]
+        values = {**attributes, **increments}
+        names = {f"#{name}": name for name in values}
+        values = {f":{name}": value for name, value in values.items()}
+        set_actions = [f"#{name} = :{name}" for name in attributes]
+        conditions = [f"({write['condition']})"] if write.get("condition") else []
+        for map_name, entries in write["map_entries"].items():
+            names[f"#{map_name}"] = map_name
+            # entry keys such as player ids are not valid in expressions, so they are named by position
+            for i, (entry_key, value) in enumerate(entries.items()):
+                path = f"#{map_name}.#{map_name}_{i}"
+                names[f"#{map_name}_{i}"] = entry_key
+                values[f":{map_name}_{i}"] = value
+                set_actions.append(f"{path} = :{map_name}_{i}")
+                conditions.append(f"attribute_not_exists({path})")
+        clauses = []
+        if set_actions:
+            clauses.append("SET " + ", ".join(set_actions))
+        if increments:
+            clauses.append("ADD " + ", ".join(f"#{name} :{name}" for name in increments))
+        update_kwargs = {
+            "Key": key,
+            "UpdateExpression": " ".join(clauses),
+            "ExpressionAttributeNames": names,
+            "ExpressionAttributeValues": values,
+        }
+        if conditions:
+            update_kwargs["ConditionExpression"] = " AND ".join(conditions)
+        if write.get("condition"):
+            update_kwargs["ExpressionAttributeValues"].update(write["condition_values"])
+        return update_kwargs
+
+    def _get_item(self, key: dict[str, str]) -> Optional[dict[str, Any]]:
+        pending_write = self._pending_writes and self._pending_writes.get((key["pk"], key["sk"]))
+        if pending_write and pending_write["is_put"]:
+            return dict(pending_write["attributes"])
+        item = self._table.get_item(Key=key).get("Item")
+        if pending_write:
+            item = self._apply_pending_write(item or dict(key), pending_write)
+        return item
+
+    def _iter_query_items(
+        self,
+        pk: str,
+        sk_prefix: str,
+        limit: Optional[int] = None,
+        page_size: Optional[int] = None,
+        after_sk: Optional[str] = None,
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Lazily iterates over the items of the partition whose sort key starts with the prefix, following
+        LastEvaluatedKey from page to page
+        :param limit: stops after this many items
+        :param page_size: the number of items read per request, defaults to limit
+        :param after_sk: only items with a greater sort key are returned
+        """
+        if after_sk:
+            query_kwargs = {
+                "KeyConditionExpression": "pk = :pk AND sk BETWEEN :after_sk AND :sk_upper_bound",
+                "ExpressionAttributeValues": {
+                    ":pk": pk,
+                    ":after_sk": after_sk,
+                    ":sk_upper_bound": f"{sk_prefix}~",
+                },
+            }
+        else:
+            query_kwargs = {
+                "KeyConditionExpression": "pk = :pk AND begins_with(sk, :sk_prefix)",
+                "ExpressionAttributeValues": {":pk": pk, ":sk_prefix": sk_prefix},
+            }
+        if page_size or limit:
+            query_kwargs["Limit"] = page_size or limit
+        items = self._paginate(query_kwargs)
+        if self._pending_writes:
+            items = iter(self._apply_pending_writes(pk, sk_prefix, list(items)))
+        if after_sk:
+            # BETWEEN is inclusive, and buffered writes are not range-filtered
+            items = itertools.dropwhile(lambda item: item["sk"] <= after_sk, items)
+        return itertools.islice(items, limit)
+
+    def _paginate(self, query_kwargs: dict[str, Any]) -> Iterator[dict[str, Any]]:
+        query_kwargs = dict(query_kwargs)
+        while True:
+            response = self._table.query(**query_kwargs)
+            yield from response["Items"]
+            if "LastEvaluatedKey" not in response:
+                return
+            query_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    def _apply_pending_writes(
+        self, pk: str, sk_prefix: str, items: list[dict[str, Any]]
+    ) -> list[dict[str, Any]]:
+        items_by_sk = {item["sk"]: item for item in items}
+        for (pending_pk, sk), write in self._pending_writes.items():
+            if pending_pk != pk or not sk.startswith(sk_prefix):
+                continue
+            if write["is_put"]:
+                items_by_sk[sk] = dict(write["attributes"])
+            else:
+                items_by_sk[sk] = self._apply_pending_write(items_by_sk.get(sk, {"pk": pk, "sk": sk}), write)
+        return [items_by_sk[sk] for sk in sorted(items_by_sk)]
+
+    @staticmethod
+    def _apply_pending_write(item: dict[str, Any], write: dict[str, Any]) -> dict[str, Any]:
+        item = {**item, **write["attributes"]}
+        for name, delta in write["increments"].items():
+            item[name] = item.get(name, 0) + delta
+        for map_name, entries in write["map_entries"].items():
+            item[map_name] = {**item.get(map_name, {}), **entries}
+        return item
+
+    @staticmethod
+    def _to_game(item: dict[str, Any]) -> Game:
+        config = item.get("config")
+        game_config = GameConfig(
+            quest_team_size={int(k): int(v) for k, v in config["quest_team_size"].items()},
+            roles=config["roles"],
+            known_roles=config["known_roles"],
+            assassination_attempts=config["assassination_attempts"],
+        ) if config else None
+        return Game(
+            id=item["pk"],
+            status=GameStatus(item["status"]),
+            state=StateName(item["state"]),
+            config=game_config,
+            player_ids=item.get("player_ids"),
+            assassination_attempts=item.get("assassination_attempts"),
+            result=item.get("result"),
+            version=int(item.get("version", 0)),
+            current_quest_number=_to_optional_int(item.get("current_quest_number")),
+            current_round_number=_to_optional_int(item.get("current_round_number")),
+            leader_index=_to_optional_int(item.get("leader_index")),
+        )
+
+    @staticmethod
+    def _to_event(item: dict[str, Any]) -> Event:
+        return Event(
+            id=f"{item["pk"]}_{item["sk"]}",
+            game_id=item["pk"],
+            type=EventType(item["type"]),
+            recipients=item["recipients"],
+            payload=item["payload"],
+            timestamp=item["timestamp"],
+        )
+
+    @staticmethod
+    def _to_player(game_id: str, item: dict[str, Any]) -> Player:
+        return Player(
+            id=f"{game_id}_{item['sk']}",
+            game_id=game_id,
+            name=item["name"],
+            secret=item["secret"],
+            role=Role(item["role"]) if item.get("role") else None,
+            known_player_ids=item.get("known_player_ids", []),
+        )
+
+    @staticmethod
+    def _to_quest(game_id: str, item: dict[str, Any]) -> Quest:
+        return Quest(
+            id=f"{game_id}_{item['sk']}",
+            game_id=game_id,
+            quest_number=int(item["quest_number"]),
+            result=VoteResult(item["result"]) if item.get("result") else None,
+            team_member_ids=item["team_member_ids"],
+            votes_cast=int(item.get("votes_cast", 0)),
+            votes_pass=int(item.get("votes_pass", 0)),
+            votes_fail=int(item.get("votes_fail", 0)),
+        )
+
+    @staticmethod
+    def _to_quest_votes(game_id: str, item: dict[str, Any]) -> list[QuestVote]:
+        quest_number = int(item["quest_number"])
+        return [
+            QuestVote(
+                id=f"{game_id}_vote_quest_{quest_number}_{player_id}",
+                game_id=game_id,
+                player_id=player_id,
+                quest_number=quest_number,
+                result=VoteResult(result),
+            )
+            for player_id, result in sorted(item.get("votes", {}).items())
+        ]
+
+    @staticmethod
+    def _to_round(game_id: str, item: dict[str, Any]) -> Round:
+        return Round(
+            id=f"{game_id}_{item['sk']}",
+            game_id=game_id,
+            quest_number=int(item["quest_number"]),
+            round_number=int(item["round_number"]),
+            leader_id=item["leader_id"],
+            team_member_ids=item["team_member_ids"],
+            result=(VoteResult(item["result"]) if item.get("result") else None),
+            votes_cast=int(item.get("votes_cast", 0)),
+            votes_pass=int(item.get("votes_pass", 0)),
+            votes_fail=int(item.get("votes_fail", 0)),
         )
-        items = response["Items"]
-        return [item["connection_id"] for item in items]
+
+    @staticmethod
+    def _to_round_votes(game_id: str, item: dict[str, Any]) -> list[RoundVote]:
+        quest_number = int(item["quest_number"])
+        round_number = int(item["round_number"])
+        return [
+            RoundVote(
+                id=f"{game_id}_vote_round_{quest_number}_{round_number}_{player_id}",
+                game_id=game_id,
+                quest_number=quest_number,
+                round_number=round_number,
+                player_id=player_id,
+                result=VoteResult(result),
+            )
+            for player_id, result in sorted(item.get("votes", {}).items())
+        ]
+
+
+def _to_optional_int(value: Any) -> Optional[int]:
+    return None if value is None else int(value)
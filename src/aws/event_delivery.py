@@ -0,0 +1,19 @@
+import os
+
+from aws.dynamodb_repository import DynamoDBRepository
+from aws.websocket_comm_service import WebSocketCommService
+from game_core.comm_service import CommService
+from game_core.outbox import OutboxCommService
+
+
+def create_comm_service(websocket_endpoint: str, repository: DynamoDBRepository) -> CommService:
+    """
+    Creates the comm service of an invocation, for the delivery mode of the EVENT_DELIVERY environment variable
+    :param websocket_endpoint: the endpoint the events are posted to, when delivered inline
+    :param repository: where the connection ids are read from, when delivered inline
+    :return:
+    """
+    if os.getenv("EVENT_DELIVERY") == "outbox":
+        # the events are delivered from the table's stream by aws.lambdas.deliver_events
+        return OutboxCommService()
+    return WebSocketCommService(websocket_endpoint, repository)
@@ -0,0 +1,45 @@
+"""
+Reads the events stored by DynamoDBRepository from the records of the table's DynamoDB stream, for delivery by
+game_core.outbox.DeliveryWorker. Public events are stored once, under event_<id>, and are broadcast. Private events
+are stored once per recipient, under private_event_<recipient>_<id>, and each item is sent to its recipient.
+"""
+from typing import Any
+
+from aws.dynamodb_codec import deserialize_item
+from game_core.constants.event_type import EventType
+from game_core.entities.event import Event
+from game_core.outbox import Message
+
+ULID_LENGTH = 26
+
+
+def to_messages(records: list[dict[str, Any]]) -> list[Message]:
+    """
+    :param records: the records of a stream event, the stream must include new images
+    :return: the messages of the inserted events, by game and in the order the events were created
+    """
+    messages = []
+    for record in records:
+        if record.get("eventName") != "INSERT":
+            continue
+        item = deserialize_item(record["dynamodb"]["NewImage"])
+        sk = item["sk"]
+        if sk.startswith("event_"):
+            messages.append((None, _to_event(item)))
+        elif sk.startswith("private_event_"):
+            recipient = sk.removeprefix("private_event_")[:-ULID_LENGTH - 1]
+            messages.append((recipient, _to_event(item)))
+    # the ULIDs ending the ids sort by creation time, whatever the order of the records of a transaction
+    return sorted(messages, key=lambda message: (message[1].game_id, message[1].id[-ULID_LENGTH:]))
+
+
+def _to_event(item: dict[str, Any]) -> Event:
+    # the id DynamoDBRepository.get_events gives the event, so a client can drop the events it has polled already
+    return Event(
+        id=f"{item['pk']}_{item['sk']}",
+        game_id=item["pk"],
+        type=EventType(item["type"]),
+        recipients=item["recipients"],
+        payload=item["payload"],
+        timestamp=item["timestamp"],
+    )
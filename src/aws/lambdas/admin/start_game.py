@@ -4,7 +4,7 @@ import os
 import uuid
 
 from aws.dynamodb_repository import DynamoDBRepository
-from aws.websocket_comm_service import WebSocketCommService
+from aws.event_delivery import create_comm_service
 from game_core.constants.action_type import ActionType
 from game_core.entities.action import Action
 from game_core.state_machine import StateMachine
@@ -21,7 +21,7 @@ def lambda_handler(event, context):
         region = os.environ['AWS_REGION']
         websocket_endpoint = os.environ['WEBSOCKET_ENDPOINT']
         repository = DynamoDBRepository(table_name, region)
-        comm_service = WebSocketCommService(websocket_endpoint, repository)
+        comm_service = create_comm_service(websocket_endpoint, repository)
         game_id = event.get("pathParameters", {}).get("game_id")
         body = json.loads(event.get("body", {}))
         if "player_ids" not in body:
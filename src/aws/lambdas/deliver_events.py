@@ -0,0 +1,28 @@
+import logging
+import os
+
+from game_core.outbox import DeliveryWorker
+from aws.dynamodb_repository import DynamoDBRepository
+from aws.event_stream import to_messages
+from aws.websocket_comm_service import WebSocketCommService
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+
+def lambda_handler(event, context):
+    """
+    Delivers the events inserted in the table, read from its stream. Errors are raised, so the stream retries the
+    batch.
+    """
+    table_name = os.environ['DYNAMODB_TABLE']
+    region = os.environ['AWS_REGION']
+    websocket_endpoint = os.environ['WEBSOCKET_ENDPOINT']
+    messages = to_messages(event.get("Records", []))
+    logger.info(f"Delivering {len(messages)} messages")
+    if not messages:
+        return
+
+    repository = DynamoDBRepository(table_name, region)
+    comm_service = WebSocketCommService(websocket_endpoint, repository, raise_undelivered=True)
+    DeliveryWorker(comm_service).deliver(messages)
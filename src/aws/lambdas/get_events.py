@@ -3,6 +3,7 @@ import logging
 import os
 
 from aws.dynamodb_repository import DynamoDBRepository
+from aws.ulid import is_ulid
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
@@ -32,7 +33,27 @@ def lambda_handler(event, context):
                 "statusCode": 401,
                 "body": json.dumps({"error": "Invalid player secret"}),
             }
-        events = repository.get_events(game_id, player_id)
+        query_string_params = event.get("queryStringParameters") or {}
+        limit = query_string_params.get("limit")
+        if limit:
+            if not limit.isdigit() or int(limit) < 1:
+                logger.error(f"Invalid limit {limit}")
+                return {
+                    "statusCode": 400,
+                    "body": json.dumps({"error": "limit must be a positive integer"}),
+                }
+            limit = int(limit)
+        else:
+            limit = None
+        since = query_string_params.get("since")
+        # the id of an event, ending with its ULID
+        if since and not is_ulid(since.rsplit("_", 1)[-1]):
+            logger.error(f"Invalid since {since}")
+            return {
+                "statusCode": 400,
+                "body": json.dumps({"error": "since must be the id of an event"}),
+            }
+        events = repository.iter_events(game_id, player_id, limit=limit, since=since)
         events = [event.to_dict() for event in events]
         return {
             "statusCode": 200,
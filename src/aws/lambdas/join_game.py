@@ -7,7 +7,7 @@ from game_core.constants.action_type import ActionType
 from game_core.entities.action import Action
 from game_core.state_machine import StateMachine
 from aws.dynamodb_repository import DynamoDBRepository
-from aws.websocket_comm_service import WebSocketCommService
+from aws.event_delivery import create_comm_service
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
@@ -38,7 +38,7 @@ def lambda_handler(event, context):
             }
 
         repository = DynamoDBRepository(table_name, region)
-        comm_service = WebSocketCommService(websocket_endpoint, repository)
+        comm_service = create_comm_service(websocket_endpoint, repository)
         game_state_machine = StateMachine(comm_service, repository, game_id)
         player_id = uuid.uuid4().hex
         join_game_action = Action(
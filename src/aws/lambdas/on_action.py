@@ -2,17 +2,25 @@ import json
 import logging
 import os
 import uuid
+from functools import lru_cache
 
 from game_core.constants.action_type import ActionType
 from game_core.entities.action import Action
-from game_core.state_machine import StateMachine
+from game_core.exceptions import DuplicateVoteError
+from game_core.state_machine_registry import StateMachineRegistry
 from aws.dynamodb_repository import DynamoDBRepository
-from aws.websocket_comm_service import WebSocketCommService
+from aws.event_delivery import create_comm_service
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
 
+@lru_cache(maxsize=None)
+def get_state_machine_registry(table_name: str, region: str) -> StateMachineRegistry:
+    # kept by warm containers, which share the games with other containers, so each game is reloaded per action
+    return StateMachineRegistry(DynamoDBRepository(table_name, region), exclusive=False)
+
+
 def lambda_handler(event, context):
     logger.info("Received event", event)
     try:
@@ -25,9 +33,8 @@ def lambda_handler(event, context):
         action_type = message.get("action_type")
         payload = message.get("payload", {})
 
-        repository = DynamoDBRepository(table_name, region)
-        comm_service = WebSocketCommService(websocket_endpoint, repository)
-        game_state_machine = StateMachine(comm_service, repository, game_id)
+        registry = get_state_machine_registry(table_name, region)
+        comm_service = create_comm_service(websocket_endpoint, DynamoDBRepository(table_name, region))
         action = Action(
             id=uuid.uuid4().hex,
             game_id=game_id,
@@ -35,10 +42,16 @@ def lambda_handler(event, context):
             type=ActionType(action_type),
             payload=payload,
         )
-        game_state_machine.handle_action(action)
+        registry.handle_action(action, comm_service)
         return {
             "statusCode": 200,
         }
+    except DuplicateVoteError as e:
+        logger.info(e)
+        return {
+            "statusCode": 409,
+            "body": json.dumps({"error": str(e)}),
+        }
     except Exception as e:
         logger.error(e)
         return {
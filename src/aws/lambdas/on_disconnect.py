@@ -0,0 +1,46 @@
+import json
+import logging
+import os
+
+from aws.dynamodb_repository import DynamoDBRepository
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+
+def lambda_handler(event, context):
+    logger.info(f"Received event {event}")
+
+    try:
+        table_name = os.environ['DYNAMODB_TABLE']
+        region = os.environ['AWS_REGION']
+        connection_id = event.get("requestContext", {}).get("connectionId")
+        if not connection_id:
+            logger.error("Missing connection id")
+            return {
+                "statusCode": 400,
+                "body": json.dumps({"error": "Missing connection id"}),
+            }
+
+        repository = DynamoDBRepository(table_name, region)
+        connection = repository.get_connection(connection_id)
+        if not connection:
+            # stored before connections were recorded by id, or already deleted as gone
+            logger.info(f"Connection id {connection_id} not found")
+            return {
+                "statusCode": 200,
+                "body": "Disconnected",
+            }
+        game_id, player_id = connection
+        repository.delete_connection_id(game_id, player_id, connection_id)
+        logger.info(f"Connection id {connection_id} deleted for game {game_id} and player {player_id}")
+        return {
+            "statusCode": 200,
+            "body": "Disconnected",
+        }
+    except Exception as e:
+        logger.error(e)
+        return {
+            "statusCode": 500,
+            "body": json.dumps({"error": str(e)}),
+        }
@@ -0,0 +1,150 @@
+"""
+Rewrites the games stored with one item per vote (vote_round_<quest>_<round>_<player>, vote_quest_<quest>_<player>)
+to the layout DynamoDBRepository reads, where the votes are a map on the round or quest item and the vote counters
+match the map. Games already migrated keep their maps, and the vote items written since are merged into them, so the
+migration can be run again after an interruption.
+
+DynamoDBRepository cannot vote on a round or quest item without a votes map, while the code before it writes rounds
+and quests without one and reads the vote items only. Deploy it in this order:
+1. stop taking actions, e.g. by disabling the routes of the on_action and join_game functions;
+2. run the migration;
+3. deploy the code storing the votes as maps;
+4. take actions again.
+If actions were taken between the migration and the deploy, run the migration again before taking actions.
+
+    PYTHONPATH=src python -m aws.migrate_vote_maps --table Avalon --region us-east-1 [--game-id GAME_ID ...]
+"""
+import argparse
+import logging
+from collections import defaultdict
+from typing import Any, Iterator, Optional
+
+from boto3.dynamodb.conditions import Attr, Key
+from botocore.exceptions import ClientError
+
+from aws.clients import get_dynamodb_resource
+from game_core.constants.vote_result import VoteResult
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+
+def migrate_game(table: Any, game_id: str) -> int:
+    """
+    Moves the vote items of the game to the votes maps of their rounds and quests, then deletes them. The items of a
+    round or quest migrated already are merged into its map.
+    :return: the number of vote items deleted
+    """
+    items = list(_query(table, KeyConditionExpression=Key("pk").eq(game_id)))
+    # sort key of the round or quest -> player id -> vote result
+    votes: dict[str, dict[str, str]] = defaultdict(dict)
+    vote_keys = []
+    for item in items:
+        sk = item["sk"]
+        if sk.startswith("vote_round_"):
+            votes[f"round_{item['quest_number']}_{item['round_number']}"][item["player_id"]] = item["result"]
+        elif sk.startswith("vote_quest_"):
+            votes[f"quest_{item['quest_number']}"][item["player_id"]] = item["result"]
+        else:
+            continue
+        vote_keys.append({"pk": game_id, "sk": sk})
+
+    for item in items:
+        sk = item["sk"]
+        if not sk.startswith("round_") and not sk.startswith("quest_"):
+            continue
+        if not _put_votes(table, game_id, sk, votes.get(sk, {})):
+            for player_id, result in votes.get(sk, {}).items():
+                _merge_vote(table, game_id, sk, player_id, result)
+
+    with table.batch_writer() as batch:
+        for key in vote_keys:
+            batch.delete_item(Key=key)
+    return len(vote_keys)
+
+
+def migrate_table(table: Any, game_ids: Optional[list[str]] = None) -> None:
+    for game_id in game_ids or _iter_game_ids(table):
+        deleted = migrate_game(table, game_id)
+        logger.info(f"Migrated game {game_id}, {deleted} vote items deleted")
+
+
+def _put_votes(table: Any, game_id: str, sk: str, votes: dict[str, str]) -> bool:
+    """
+    :return: whether the votes map was set, it is not if the item has one already
+    """
+    passed = sum(1 for result in votes.values() if result == VoteResult.Pass.value)
+    try:
+        table.update_item(
+            Key={"pk": game_id, "sk": sk},
+            UpdateExpression="SET votes = :votes, votes_cast = :cast, votes_pass = :pass, votes_fail = :fail",
+            ConditionExpression=Attr("votes").not_exists(),
+            ExpressionAttributeValues={
+                ":votes": votes,
+                ":cast": len(votes),
+                ":pass": passed,
+                ":fail": len(votes) - passed,
+            },
+        )
+    except ClientError as e:
+        # the item was migrated by an earlier run and may have new votes since
+        if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+            raise
+        return False
+    return True
+
+
+def _merge_vote(table: Any, game_id: str, sk: str, player_id: str, result: str) -> None:
+    """
+    Adds the vote of a vote item written after the item was migrated to its votes map, unless the map has it already
+    """
+    counter = "votes_pass" if result == VoteResult.Pass.value else "votes_fail"
+    try:
+        table.update_item(
+            Key={"pk": game_id, "sk": sk},
+            UpdateExpression=f"SET votes.#player_id = :result ADD votes_cast :one, {counter} :one",
+            ConditionExpression="attribute_not_exists(votes.#player_id)",
+            ExpressionAttributeNames={"#player_id": player_id},
+            ExpressionAttributeValues={":result": result, ":one": 1},
+        )
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+            raise
+
+
+def _iter_game_ids(table: Any) -> Iterator[str]:
+    items = _scan(table, FilterExpression=Attr("sk").eq("game"), ProjectionExpression="pk")
+    return (item["pk"] for item in items)
+
+
+def _query(table: Any, **kwargs) -> Iterator[dict[str, Any]]:
+    return _paginate(table.query, kwargs)
+
+
+def _scan(table: Any, **kwargs) -> Iterator[dict[str, Any]]:
+    return _paginate(table.scan, kwargs)
+
+
+def _paginate(operation: Any, kwargs: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    while True:
+        response = operation(**kwargs)
+        yield from response["Items"]
+        if "LastEvaluatedKey" not in response:
+            return
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Moves the votes of stored games to the votes maps")
+    parser.add_argument("--table", required=True)
+    parser.add_argument("--region", required=True)
+    parser.add_argument("--endpoint-url")
+    parser.add_argument("--game-id", action="append", dest="game_ids", help="migrate only this game, repeatable")
+    args = parser.parse_args()
+    logging.basicConfig()
+    table = get_dynamodb_resource(args.region, args.endpoint_url).Table(args.table)
+    migrate_table(table, args.game_ids)
+
+
+if __name__ == "__main__":
+    main()
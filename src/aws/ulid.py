@@ -0,0 +1,58 @@
+import os
+import threading
+import time
+
+CROCKFORD_BASE32 = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+_lock = threading.Lock()
+_last_timestamp = 0
+_last_randomness = 0
+
+
+def new_ulid() -> str:
+    """
+    Generates a ULID, a 26 characters id made of a 48 bits millisecond timestamp and 80 random bits, so ids sort
+    lexicographically by creation time. Ids generated within the same millisecond by this process keep increasing,
+    but ids generated by processes whose clocks are apart are only ordered up to that clock skew.
+    :return: the ULID encoded in Crockford's base32
+    """
+    global _last_timestamp, _last_randomness
+    with _lock:
+        timestamp = time.time_ns() // 1_000_000
+        if timestamp <= _last_timestamp:
+            timestamp = _last_timestamp
+            randomness = _last_randomness + 1
+        else:
+            randomness = int.from_bytes(os.urandom(10), "big")
+        _last_timestamp = timestamp
+        _last_randomness = randomness
+
+    return _encode((timestamp << 80) | (randomness & ((1 << 80) - 1)))
+
+
+def is_ulid(value: str) -> bool:
+    """
+    :return: whether the value is a ULID, 26 Crockford's base32 characters of at most 128 bits
+    """
+    return len(value) == 26 and value[0] <= "7" and all(c in CROCKFORD_BASE32 for c in value)
+
+
+def get_timestamp(ulid: str) -> int:
+    """
+    :return: the millisecond timestamp of the ULID
+    """
+    timestamp = 0
+    for c in ulid[:10]:
+        timestamp = (timestamp << 5) | CROCKFORD_BASE32.index(c)
+    return timestamp
+
+
+def min_ulid(timestamp: int) -> str:
+    """
+    :return: the smallest ULID of the millisecond timestamp
+    """
+    return _encode(timestamp << 80)
+
+
+def _encode(value: int) -> str:
+    return "".join(CROCKFORD_BASE32[(value >> shift) & 0x1F] for shift in range(125, -1, -5))
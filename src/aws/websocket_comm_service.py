@@ -1,40 +1,249 @@
+import atexit
+import dataclasses
 import json
 import logging
-from concurrent.futures import ThreadPoolExecutor
+import os
+import threading
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
 
-import boto3
+from botocore.exceptions import ClientError
 
 from game_core.entities.event import Event
 from game_core.comm_service import CommService
+from game_core.exceptions import DeliveryError
+from aws.clients import get_api_gateway_client
 from aws.dynamodb_repository import DynamoDBRepository
+from aws.event_stream import ULID_LENGTH
 
 log = logging.getLogger(__name__)
 
+# The executor posting the events is created on first use and kept by warm invocations, like the boto clients,
+# so a broadcast only pays for the posts. The semaphore bounds the posts submitted and not finished yet.
+MAX_WORKERS = int(os.getenv("COMM_SERVICE_MAX_WORKERS", "10"))
+MAX_IN_FLIGHT = int(os.getenv("COMM_SERVICE_MAX_IN_FLIGHT", str(4 * MAX_WORKERS)))
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_in_flight = threading.BoundedSemaphore(MAX_IN_FLIGHT)
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="websocket-post")
+        return _executor
+
+
+def shutdown_executor(wait: bool = True) -> None:
+    """
+    Shuts down the shared executor, the next post creates a new one
+    :param wait: whether to wait for the submitted posts to finish
+    """
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
+
+
+atexit.register(shutdown_executor)
+
+
+def _json_dumps(value: Any) -> bytes:
+    return json.dumps(value).encode()
+
+
+def get_json_encoder(name: str) -> Callable[[Any], bytes]:
+    """
+    :param name: "json" or "orjson", orjson falls back to json when it is not installed
+    :return: a function encoding a value to JSON bytes
+    """
+    if name == "orjson":
+        try:
+            import orjson
+        except ImportError:
+            log.warning("orjson is not installed, events are encoded with json")
+        else:
+            return orjson.dumps
+    elif name != "json":
+        raise ValueError(f"Unknown JSON encoder {name}")
+    return _json_dumps
+
 
 class WebSocketCommService(CommService):
-    def __init__(self, endpoint_url: str, repository: DynamoDBRepository):
+    """
+    Posts the events to the WebSocket connections of the players. The connection ids of a game are read once and
+    kept for the lifetime of the service, a Lambda invocation, and the connections found gone are deleted. The posts
+    that fail otherwise are logged. A private event sent to a player is given the id of the player's item, the one
+    DynamoDBRepository.get_events gives it, so the player can drop the events polled already.
+    """
+
+    def __init__(
+        self,
+        endpoint_url: str,
+        repository: DynamoDBRepository,
+        json_encoder: Optional[str] = None,
+        raise_undelivered: bool = False,
+    ):
+        """
+        :param json_encoder: "json" or "orjson", defaults to the COMM_SERVICE_JSON_ENCODER environment variable
+        :param raise_undelivered: whether send_batch raises a DeliveryError with the messages of the failed posts, so
+        they are retried, e.g. by a DeliveryWorker
+        """
         self._endpoint_url = endpoint_url
+        self._raise_undelivered = raise_undelivered
         self._repository = repository
-        self._api_gateway = boto3.client("apigatewaymanagementapi", endpoint_url=endpoint_url)
+        self._api_gateway = get_api_gateway_client(endpoint_url)
+        self._dumps = get_json_encoder(json_encoder or os.getenv("COMM_SERVICE_JSON_ENCODER", "json"))
+        # game id -> player id -> connection id
+        self._connection_ids: dict[str, dict[str, str]] = {}
 
     def broadcast(self, event: Event) -> None:
-        connection_ids = self._repository.get_connection_ids(event.game_id)
-        executor = ThreadPoolExecutor(max_workers=10)
-        for connection_id in connection_ids:
-            executor.submit(self._emit, connection_id, event)
-        executor.shutdown(wait=True)
+        # every connection is sent the same bytes, so the event is encoded once
+        data = self._encode(event)
+        if data is None:
+            return
+        connection_ids = self._get_connection_ids(event.game_id)
+        self._post_all(
+            [(event.game_id, player_id, connection_id, data) for player_id, connection_id in connection_ids.items()]
+        )
 
     def notify(self, player_id: str, event: Event) -> None:
-        connection_id = self._repository.get_connection_id(event.game_id, player_id)
-        self._emit(connection_id, event)
+        self.notify_many({player_id: event})
+
+    def notify_many(self, events_by_player_id: dict[str, Event]) -> None:
+        """
+        Reads the connection ids of all the players with one query per game, then posts the events concurrently
+        """
+        # event id -> encoded event, an event sent to several players is encoded once
+        data_by_event_id: dict[str, Optional[bytes]] = {}
+        posts = []
+        for player_id, event in events_by_player_id.items():
+            event = self._for_player(player_id, event)
+            connection_id = self._get_connection_ids(event.game_id).get(player_id)
+            if connection_id is None:
+                log.error(f"Player {player_id} of game {event.game_id} has no connection")
+                continue
+            if event.id not in data_by_event_id:
+                data_by_event_id[event.id] = self._encode(event)
+            if data_by_event_id[event.id] is not None:
+                posts.append((event.game_id, player_id, connection_id, data_by_event_id[event.id]))
+        self._post_all(posts)
+
+    def send_batch(self, messages: list[tuple[Optional[str], Event]]) -> None:
+        """
+        Sends each connected player a single frame, the JSON array of the events broadcast or sent to them in order
+        :raises DeliveryError: with the messages of the players whose post failed, if raise_undelivered
+        """
+        messages_by_game_id: dict[str, list[tuple[Optional[str], Event]]] = defaultdict(list)
+        for player_id, event in messages:
+            messages_by_game_id[event.game_id].append((player_id, event))
+        # event id -> encoded event, each event is encoded once whatever the number of frames it is part of
+        data_by_event_id: dict[str, Optional[bytes]] = {}
+        posts = []
+        # (game id, player id) -> the messages of the player's frame
+        frame_messages: dict[tuple[str, str], list[tuple[Optional[str], Event]]] = {}
+        for game_id, game_messages in messages_by_game_id.items():
+            connection_ids = self._get_connection_ids(game_id)
+            for player_id in {player_id for player_id, _ in game_messages if player_id is not None}:
+                if player_id not in connection_ids:
+                    log.error(f"Player {player_id} of game {game_id} has no connection")
+            for player_id, connection_id in connection_ids.items():
+                events = [
+                    self._for_player(recipient, event)
+                    for recipient, event in game_messages
+                    if recipient is None or recipient == player_id
+                ]
+                for event in events:
+                    if event.id not in data_by_event_id:
+                        data_by_event_id[event.id] = self._encode(event)
+                frame = [data_by_event_id[event.id] for event in events if data_by_event_id[event.id] is not None]
+                if frame:
+                    posts.append((game_id, player_id, connection_id, b"[" + b",".join(frame) + b"]"))
+                    frame_messages[(game_id, player_id)] = [(player_id, event) for event in events]
+        failed_posts = self._post_all(posts)
+        if failed_posts and self._raise_undelivered:
+            undelivered = [message for post in failed_posts for message in frame_messages[post[:2]]]
+            raise DeliveryError(f"Failed to send events to {len(failed_posts)} connections", undelivered)
+
+    @staticmethod
+    def _for_player(player_id: Optional[str], event: Event) -> Event:
+        if player_id is None or not event.recipients:
+            return event
+        return dataclasses.replace(
+            event, id=f"{event.game_id}_private_event_{player_id}_{event.id[-ULID_LENGTH:]}"
+        )
+
+    def _get_connection_ids(self, game_id: str) -> dict[str, str]:
+        if game_id not in self._connection_ids:
+            self._connection_ids[game_id] = self._repository.get_player_connection_ids(game_id)
+        return self._connection_ids[game_id]
 
-    def _emit(self, connection_id: str, event: Event) -> None:
+    def _post_all(self, posts: list[tuple[str, str, str, bytes]]) -> list[tuple[str, str, str, bytes]]:
+        """
+        Posts the events on the shared executor and waits for them, blocking while too many posts are in flight. The
+        connections found gone are pruned once all the posts are done, so only this thread changes the cache.
+        :param posts: the game id, the player id, the connection id and the encoded event of each post
+        :return: the posts that failed, apart from the ones to the connections found gone
+        """
+        executor = get_executor()
+        futures: list[tuple[Future, tuple[str, str, str, bytes]]] = []
+        for post in posts:
+            _in_flight.acquire()
+            try:
+                future = executor.submit(self._emit, *post)
+            except BaseException:
+                _in_flight.release()
+                raise
+            future.add_done_callback(lambda _: _in_flight.release())
+            futures.append((future, post))
+        failed_posts = []
+        for future, post in futures:
+            game_id, player_id, connection_id, _ = post
+            try:
+                gone = future.result()
+            except Exception as e:
+                log.error(f"Failed to send event to connection {connection_id}", exc_info=e)
+                failed_posts.append(post)
+                continue
+            if gone:
+                self._prune(game_id, player_id, connection_id)
+        return failed_posts
+
+    def _encode(self, event: Event) -> Optional[bytes]:
+        try:
+            return self._dumps(event.to_dict())
+        except Exception as e:
+            log.error(f"Failed to encode event {event.id}", exc_info=e)
+            return None
+
+    def _emit(self, game_id: str, player_id: str, connection_id: str, data: bytes) -> bool:
+        """
+        :return: whether the connection is gone
+        """
         try:
-            data = json.dumps(event.to_dict())
             self._api_gateway.post_to_connection(
                 ConnectionId=connection_id,
                 Data=data
             )
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "GoneException":
+                return True
+            raise
+        return False
+
+    def _prune(self, game_id: str, player_id: str, connection_id: str) -> None:
+        """
+        Deletes the connection the client has closed, so the next actions do not post to it
+        """
+        log.info(f"Connection {connection_id} of player {player_id} of game {game_id} is gone, deleting it")
+        connection_ids = self._connection_ids.get(game_id, {})
+        if connection_ids.get(player_id) == connection_id:
+            connection_ids.pop(player_id, None)
+        try:
+            self._repository.delete_connection_id(game_id, player_id, connection_id)
         except Exception as e:
-            log.error(f"Failed to send event to connection {connection_id}", exc_info=e)
-            # raise e
+            log.error(f"Failed to delete connection {connection_id}", exc_info=e)
@@ -0,0 +1,39 @@
+from typing import Optional
+
+from game_core.comm_service import CommService
+from game_core.entities.event import Event
+
+
+class BatchingCommService(CommService):
+    """
+    Buffers the events sent while an action is handled, so they are sent together with send_batch of the wrapped
+    comm service once the action is saved, or dropped when it is not.
+    """
+
+    def __init__(self, comm_service: CommService):
+        self._comm_service = comm_service
+        # player id and event of each message in the order sent, a None player id broadcasts the event
+        self._messages: list[tuple[Optional[str], Event]] = []
+
+    def broadcast(self, event: Event) -> None:
+        self._messages.append((None, event))
+
+    def notify(self, player_id: str, event: Event) -> None:
+        self._messages.append((player_id, event))
+
+    def notify_many(self, events_by_player_id: dict[str, Event]) -> None:
+        self._messages.extend(events_by_player_id.items())
+
+    def send_batch(self, messages: list[tuple[Optional[str], Event]]) -> None:
+        self._messages.extend(messages)
+
+    def flush(self, comm_service: Optional[CommService] = None) -> None:
+        """
+        :param comm_service: sends the messages instead of the wrapped comm service
+        """
+        messages, self._messages = self._messages, []
+        if messages:
+            (comm_service or self._comm_service).send_batch(messages)
+
+    def discard(self) -> None:
+        self._messages = []
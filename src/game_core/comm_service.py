@@ -1,4 +1,5 @@
 from abc import abstractmethod
+from typing import Optional
 
 from game_core.entities.event import Event
 
@@ -12,3 +13,23 @@ class CommService:
     @abstractmethod
     def notify(self, player_id: str, event: Event) -> None:
         pass
+
+    def notify_many(self, events_by_player_id: dict[str, Event]) -> None:
+        """
+        Sends each player their event. Implementations may send them together, by default they are sent one by one.
+        :param events_by_player_id: the event to send to each player
+        """
+        for player_id, event in events_by_player_id.items():
+            self.notify(player_id, event)
+
+    def send_batch(self, messages: list[tuple[Optional[str], Event]]) -> None:
+        """
+        Sends the events in order. Implementations may send each player all their events at once, by default they are
+        sent one by one.
+        :param messages: the player id and the event of each message, a None player id broadcasts the event
+        """
+        for player_id, event in messages:
+            if player_id is None:
+                self.broadcast(event)
+            else:
+                self.notify(player_id, event)
@@ -22,3 +22,9 @@ class Game:
     player_ids: Optional[list[str]]
     assassination_attempts: Optional[int]
     result: Optional[str]
+    version: int = 0
+    # set when a round is created, the current round is round current_round_number of quest current_quest_number
+    current_quest_number: Optional[int] = None
+    current_round_number: Optional[int] = None
+    # index of the current leader in player_ids
+    leader_index: Optional[int] = None
@@ -0,0 +1,19 @@
+from dataclasses import dataclass, field
+
+from game_core.entities.game import Game
+from game_core.entities.player import Player
+from game_core.entities.quest import Quest
+from game_core.entities.quest_vote import QuestVote
+from game_core.entities.round import Round
+from game_core.entities.round_vote import RoundVote
+
+
+@dataclass
+class GameSnapshot:
+    game: Game
+    players: list[Player] = field(default_factory=list)
+    quests: list[Quest] = field(default_factory=list)
+    rounds: list[Round] = field(default_factory=list)
+    round_votes: list[RoundVote] = field(default_factory=list)
+    quest_votes: list[QuestVote] = field(default_factory=list)
+    connection_ids: dict[str, str] = field(default_factory=dict)  # player_id -> connection_id
@@ -11,3 +11,6 @@ class Quest:
     quest_number: int
     result: Optional[VoteResult] = None
     team_member_ids: Optional[list[str]] = None
+    votes_cast: int = 0
+    votes_pass: int = 0
+    votes_fail: int = 0
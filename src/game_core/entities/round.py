@@ -13,3 +13,6 @@ class Round:
     leader_id: str
     team_member_ids: Optional[list[str]]
     result: Optional[VoteResult] = None
+    votes_cast: int = 0
+    votes_pass: int = 0
+    votes_fail: int = 0
@@ -0,0 +1,21 @@
+class DuplicateVoteError(ValueError):
+    """
+    Raised by the repository when a player has already voted in the round or the quest
+    """
+
+
+class ConcurrentModificationError(Exception):
+    """
+    Raised by the repository when the game was updated by someone else since it was read
+    """
+
+
+class DeliveryError(Exception):
+    """
+    Raised by a comm service when some of the messages were not sent, which are kept in messages so only they are
+    sent again
+    """
+
+    def __init__(self, message: str, messages: list):
+        super().__init__(message)
+        self.messages = messages
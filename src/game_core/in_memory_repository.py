@@ -0,0 +1,380 @@
+import bisect
+import copy
+import dataclasses
+import itertools
+import threading
+import uuid
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+from game_core.constants.event_type import EventType
+from game_core.constants.game_status import GameStatus
+from game_core.constants.state_name import StateName
+from game_core.constants.vote_result import VoteResult
+from game_core.entities.event import Event
+from game_core.entities.game import Game
+from game_core.entities.game_snapshot import GameSnapshot
+from game_core.entities.player import Player
+from game_core.entities.quest import Quest
+from game_core.entities.quest_vote import QuestVote
+from game_core.entities.round import Round
+from game_core.entities.round_vote import RoundVote
+from game_core.exceptions import ConcurrentModificationError, DuplicateVoteError
+from game_core.repository import Repository
+
+
+class _Partition:
+    """
+    The entities of one game by sort key, the same keys DynamoDBRepository uses, with the keys kept sorted so the
+    entities sharing a prefix are found by bisection
+    """
+
+    def __init__(self):
+        self.entities: dict[str, Any] = {}
+        self.keys: list[str] = []
+        self.lock = threading.RLock()
+
+    def put(self, sk: str, entity: Any) -> None:
+        if sk not in self.entities:
+            bisect.insort(self.keys, sk)
+        self.entities[sk] = entity
+
+    def delete(self, sk: str) -> None:
+        del self.entities[sk]
+        self.keys.pop(bisect.bisect_left(self.keys, sk))
+
+    def delete_prefix(self, sk_prefix: str) -> None:
+        start = bisect.bisect_left(self.keys, sk_prefix)
+        end = bisect.bisect_left(self.keys, f"{sk_prefix}~")
+        for sk in self.keys[start:end]:
+            del self.entities[sk]
+        del self.keys[start:end]
+
+    def scan(self, sk_prefix: str, after_sk: Optional[str] = None) -> Iterator[Any]:
+        start = bisect.bisect_right(self.keys, after_sk) if after_sk else bisect.bisect_left(self.keys, sk_prefix)
+        for sk in itertools.islice(self.keys, start, None):
+            if not sk.startswith(sk_prefix):
+                return
+            yield self.entities[sk]
+
+
+class InMemoryRepository(Repository):
+    """
+    Keeps the games in memory, for tests and simulations. It is safe to share between threads: each game has a lock,
+    which a unit of work takes when it first uses the game and holds until it exits, so the units of work of different
+    games run concurrently. A unit of work should use a single game, as units of work taking the locks of the same
+    games in a different order deadlock. Its writes are undone if it fails. Entities are copied in and out, so callers
+    never share them with the repository.
+    """
+
+    def __init__(self):
+        self._partitions: dict[str, _Partition] = {}
+        # guards the partitions dict, the entities of a partition are guarded by its own lock
+        self._partitions_lock = threading.Lock()
+        self._local = threading.local()
+        self._event_sequence = itertools.count(1)
+
+    @contextmanager
+    def unit_of_work(self) -> Iterator[None]:
+        if getattr(self._local, "undo_log", None) is not None:
+            yield
+            return
+        self._local.undo_log = []
+        # the partitions locked by the unit of work, released when it exits
+        self._local.locked_partitions = []
+        try:
+            yield
+        except BaseException:
+            for partition, sk, entity in reversed(self._local.undo_log):
+                if entity is None:
+                    partition.delete(sk)
+                else:
+                    partition.put(sk, entity)
+            raise
+        finally:
+            for partition in reversed(self._local.locked_partitions):
+                partition.lock.release()
+            self._local.undo_log = None
+            self._local.locked_partitions = None
+
+    @contextmanager
+    def locked(self, game_id: str) -> Iterator[None]:
+        """
+        Holds the lock of the game, once the unit of work in progress on it has exited. Inside a unit of work, the
+        lock is held until the unit of work exits.
+        """
+        while True:
+            partition = self._partition(game_id)
+            partition.lock.acquire()
+            if self._partitions.get(game_id) is partition:
+                break
+            # the game was deleted while waiting
+            partition.lock.release()
+        locked_partitions = getattr(self._local, "locked_partitions", None)
+        if locked_partitions is not None and partition not in locked_partitions:
+            locked_partitions.append(partition)
+            yield
+            return
+        try:
+            yield
+        finally:
+            partition.lock.release()
+
+    def _partition(self, game_id: str) -> _Partition:
+        with self._partitions_lock:
+            return self._partitions.setdefault(game_id, _Partition())
+
+    def _get(self, game_id: str, sk: str) -> Optional[Any]:
+        partition = self._partitions.get(game_id)
+        return partition and partition.entities.get(sk)
+
+    def _put(self, game_id: str, sk: str, entity: Any) -> None:
+        partition = self._partition(game_id)
+        undo_log = getattr(self._local, "undo_log", None)
+        if undo_log is not None:
+            undo_log.append((partition, sk, partition.entities.get(sk)))
+        partition.put(sk, _copy(entity))
+
+    def _scan(self, game_id: str, sk_prefix: str, after_sk: Optional[str] = None) -> list[Any]:
+        partition = self._partitions.get(game_id)
+        if not partition:
+            return []
+        return [_copy(entity) for entity in partition.scan(sk_prefix, after_sk)]
+
+    def put_game(self) -> Game:
+        game = Game(uuid.uuid4().hex, GameStatus.NotStarted, StateName.GameSetup, None, [], None, None)
+        with self.locked(game.id):
+            self._put(game.id, "game", game)
+        return game
+
+    def get_game(self, game_id: str) -> Game:
+        with self.locked(game_id):
+            game = self._get(game_id, "game")
+            if not game:
+                raise ValueError(f"Game {game_id} not found")
+            return _copy(game)
+
+    def get_game_snapshot(self, game_id: str) -> GameSnapshot:
+        with self.locked(game_id):
+            snapshot = GameSnapshot(game=self.get_game(game_id))
+            snapshot.players = self._scan(game_id, "player_")
+            snapshot.quests = self._scan(game_id, "quest_")
+            snapshot.rounds = self._scan(game_id, "round_")
+            snapshot.round_votes = self._scan(game_id, "vote_round_")
+            snapshot.quest_votes = self._scan(game_id, "vote_quest_")
+            return snapshot
+
+    def put_game_snapshot(self, snapshot: GameSnapshot) -> None:
+        """
+        Stores a game read from another repository, with its players, quests, rounds and votes
+        """
+        game_id = snapshot.game.id
+        with self.locked(game_id):
+            self._put(game_id, "game", snapshot.game)
+            for player in snapshot.players:
+                self._put(game_id, player.id.split("_", 1)[1], player)
+            for quest in snapshot.quests:
+                self._put(game_id, f"quest_{quest.quest_number}", quest)
+            for game_round in snapshot.rounds:
+                self._put(game_id, f"round_{game_round.quest_number}_{game_round.round_number}", game_round)
+            for round_vote in snapshot.round_votes:
+                sk = f"vote_round_{round_vote.quest_number}_{round_vote.round_number}_{round_vote.player_id}"
+                self._put(game_id, sk, round_vote)
+            for quest_vote in snapshot.quest_votes:
+                self._put(game_id, f"vote_quest_{quest_vote.quest_number}_{quest_vote.player_id}", quest_vote)
+
+    def delete_game(self, game_id: str) -> None:
+        """
+        Drops the game with all its entities
+        """
+        with self.locked(game_id), self._partitions_lock:
+            self._partitions.pop(game_id, None)
+
+    def delete_events(self, game_id: str) -> None:
+        """
+        Drops the events of the game
+        """
+        with self.locked(game_id):
+            partition = self._partitions.get(game_id)
+            if partition:
+                partition.delete_prefix("event_")
+
+    def update_game(self, game: Game) -> Game:
+        with self.locked(game.id):
+            stored_game = self._get(game.id, "game")
+            if stored_game and stored_game.version != game.version:
+                raise ConcurrentModificationError(f"Game {game.id} was modified since version {game.version}")
+            game.version += 1
+            self._put(game.id, "game", game)
+        return game
+
+    def put_event(
+        self,
+        game_id: str,
+        event_type: EventType,
+        recipients: list[str],
+        payload: dict[str, Any],
+        timestamp: str,
+    ) -> Event:
+        with self.locked(game_id):
+            sk = f"event_{next(self._event_sequence):012d}"
+            event = Event(f"{game_id}_{sk}", game_id, event_type, recipients, payload, timestamp)
+            self._put(game_id, sk, event)
+        return event
+
+    def get_events(self, game_id: str, player_id: str, since: Optional[str] = None) -> list[Event]:
+        after_sk = f"event_{since.rsplit('_', 1)[-1]}" if since else None
+        with self.locked(game_id):
+            events = self._scan(game_id, "event_", after_sk)
+        return [event for event in events if not event.recipients or player_id in event.recipients]
+
+    def put_player(self, player_id: str, game_id: str, name: str, secret: str) -> Player:
+        player = Player(f"{game_id}_player_{player_id}", game_id, name, secret)
+        with self.locked(game_id):
+            self._put(game_id, f"player_{player_id}", player)
+        return player
+
+    def update_player(self, player: Player) -> Player:
+        with self.locked(player.game_id):
+            self._put(player.game_id, player.id.split("_", 1)[1], player)
+        return player
+
+    def get_players(self, game_id: str) -> list[Player]:
+        with self.locked(game_id):
+            return self._scan(game_id, "player_")
+
+    def get_player(self, player_id: str) -> Player:
+        game_id, sk = player_id.split("_", 1)
+        with self.locked(game_id):
+            player = self._get(game_id, sk)
+            if not player:
+                raise ValueError(f"Player {player_id} not found")
+            return _copy(player)
+
+    def put_quest(self, game_id: str, quest_number: int) -> Quest:
+        quest = Quest(f"{game_id}_quest_{quest_number}", game_id, quest_number, team_member_ids=[])
+        with self.locked(game_id):
+            self._put(game_id, f"quest_{quest_number}", quest)
+        return quest
+
+    def get_quests(self, game_id: str) -> list[Quest]:
+        with self.locked(game_id):
+            return self._scan(game_id, "quest_")
+
+    def get_quest(self, game_id: str, quest_number: int) -> Quest:
+        with self.locked(game_id):
+            quest = self._get(game_id, f"quest_{quest_number}")
+            if not quest:
+                raise ValueError(f"Quest {game_id}_{quest_number} not found")
+            return _copy(quest)
+
+    def update_quest(self, quest: Quest) -> Quest:
+        sk = f"quest_{quest.quest_number}"
+        with self.locked(quest.game_id):
+            self._put(quest.game_id, sk, _with_stored_votes(quest, self._get(quest.game_id, sk)))
+        return quest
+
+    def get_rounds(self, game_id: str) -> list[Round]:
+        with self.locked(game_id):
+            return self._scan(game_id, "round_")
+
+    def put_round(
+        self, game_id: str, quest_number: int, round_number: int, leader_id: str
+    ) -> Round:
+        game_round = Round(
+            f"{game_id}_round_{quest_number}_{round_number}", game_id, quest_number, round_number, leader_id, []
+        )
+        with self.locked(game_id):
+            self._put(game_id, f"round_{quest_number}_{round_number}", game_round)
+        return game_round
+
+    def update_round(self, game_round: Round) -> Round:
+        sk = f"round_{game_round.quest_number}_{game_round.round_number}"
+        with self.locked(game_round.game_id):
+            self._put(game_round.game_id, sk, _with_stored_votes(game_round, self._get(game_round.game_id, sk)))
+        return game_round
+
+    def get_round(self, game_id: str, quest_number: int, round_number: int) -> Round:
+        with self.locked(game_id):
+            game_round = self._get(game_id, f"round_{quest_number}_{round_number}")
+            if not game_round:
+                raise ValueError(f"Round {game_id}_{quest_number}_{round_number} not found")
+            return _copy(game_round)
+
+    def put_round_vote(
+        self,
+        game_id: str,
+        quest_number: int,
+        round_number: int,
+        player_id: str,
+        vote_result: VoteResult,
+    ) -> RoundVote:
+        sk = f"vote_round_{quest_number}_{round_number}_{player_id}"
+        round_vote = RoundVote(f"{game_id}_{sk}", game_id, player_id, quest_number, round_number, vote_result)
+        with self.locked(game_id):
+            if self._get(game_id, sk):
+                raise DuplicateVoteError(
+                    f"Player {player_id} already voted for quest {quest_number} round {round_number}"
+                )
+            game_round = self.get_round(game_id, quest_number, round_number)
+            _count_vote(game_round, vote_result)
+            self._put(game_id, sk, round_vote)
+            self._put(game_id, f"round_{quest_number}_{round_number}", game_round)
+        return round_vote
+
+    def get_round_votes(
+        self, game_id: str, quest_number: int, round_number: int
+    ) -> list[RoundVote]:
+        with self.locked(game_id):
+            return self._scan(game_id, f"vote_round_{quest_number}_{round_number}_")
+
+    def put_quest_vote(
+        self, game_id: str, quest_number: int, player_id: str, is_approved: bool
+    ) -> QuestVote:
+        sk = f"vote_quest_{quest_number}_{player_id}"
+        vote_result = VoteResult.Pass if is_approved else VoteResult.Fail
+        quest_vote = QuestVote(f"{game_id}_{sk}", game_id, player_id, quest_number, vote_result)
+        with self.locked(game_id):
+            if self._get(game_id, sk):
+                raise DuplicateVoteError(f"Player {player_id} already voted for quest {quest_number}")
+            quest = self.get_quest(game_id, quest_number)
+            _count_vote(quest, vote_result)
+            self._put(game_id, sk, quest_vote)
+            self._put(game_id, f"quest_{quest_number}", quest)
+        return quest_vote
+
+    def get_quest_votes(self, game_id: str, quest_number: int) -> list[QuestVote]:
+        with self.locked(game_id):
+            return self._scan(game_id, f"vote_quest_{quest_number}_")
+
+
+def _copy(entity: Any) -> Any:
+    # a shallow copy with its own lists, the other attribute values are immutable or never changed in place
+    entity = copy.copy(entity)
+    for entity_field in dataclasses.fields(entity):
+        value = getattr(entity, entity_field.name)
+        if isinstance(value, list):
+            setattr(entity, entity_field.name, list(value))
+    return entity
+
+
+def _with_stored_votes(entity: Round | Quest, stored_entity: Optional[Round | Quest]) -> Round | Quest:
+    """
+    The vote counters are only changed by putting votes, as the ADD updates of DynamoDBRepository
+    """
+    if not stored_entity:
+        return entity
+    return dataclasses.replace(
+        entity,
+        votes_cast=stored_entity.votes_cast,
+        votes_pass=stored_entity.votes_pass,
+        votes_fail=stored_entity.votes_fail,
+    )
+
+
+def _count_vote(entity: Round | Quest, vote_result: VoteResult) -> None:
+    entity.votes_cast += 1
+    if vote_result == VoteResult.Pass:
+        entity.votes_pass += 1
+    else:
+        entity.votes_fail += 1
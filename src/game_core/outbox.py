@@ -0,0 +1,88 @@
+import logging
+import time
+from queue import Empty, Queue
+from typing import Callable, Optional
+
+from game_core.comm_service import CommService
+from game_core.entities.event import Event
+from game_core.exceptions import DeliveryError
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# player id and event of a message, a None player id broadcasts the event
+Message = tuple[Optional[str], Event]
+
+
+class OutboxCommService(CommService):
+    """
+    Sends nothing while an action is handled. The events are stored with the state change of the action, the outbox,
+    and a DeliveryWorker delivers them once they are stored. Given a queue, the messages are put on it instead, as a
+    local stand-in for the stream of stored events.
+    """
+
+    def __init__(self, queue: Optional[Queue] = None):
+        self._queue = queue
+
+    def broadcast(self, event: Event) -> None:
+        self._put((None, event))
+
+    def notify(self, player_id: str, event: Event) -> None:
+        self._put((player_id, event))
+
+    def _put(self, message: Message) -> None:
+        if self._queue is not None:
+            self._queue.put(message)
+
+
+class DeliveryWorker:
+    """
+    Delivers stored events with the comm service, apart from the actions that created them. A failed delivery is
+    retried with exponential backoff, so the game logic is not run again. When the comm service raises a
+    DeliveryError, only the messages it did not send are retried.
+    """
+
+    def __init__(
+        self,
+        comm_service: CommService,
+        max_attempts: int = 5,
+        base_delay: float = 0.2,
+        sleep: Optional[Callable[[float], None]] = None,
+    ):
+        """
+        :param max_attempts: the number of times a delivery is tried before its error is raised
+        :param base_delay: seconds waited after the first failed attempt, doubled after each following one
+        """
+        self._comm_service = comm_service
+        self._max_attempts = max_attempts
+        self._base_delay = base_delay
+        self._sleep = sleep or time.sleep
+
+    def deliver(self, messages: list[Message]) -> None:
+        for attempt in range(1, self._max_attempts + 1):
+            try:
+                self._comm_service.send_batch(messages)
+                return
+            except Exception as e:
+                if attempt == self._max_attempts:
+                    raise
+                if isinstance(e, DeliveryError):
+                    messages = e.messages
+                delay = self._base_delay * 2 ** (attempt - 1)
+                logger.info(f"Retrying delivery of {len(messages)} messages in {delay}s: {e}")
+                self._sleep(delay)
+
+    def drain(self, queue: Queue) -> int:
+        """
+        Delivers the messages on the queue together, until it is empty
+        :return: the number of messages delivered
+        """
+        messages = []
+        while True:
+            try:
+                messages.append(queue.get_nowait())
+            except Empty:
+                break
+        if messages:
+            self.deliver(messages)
+        return len(messages)
@@ -1,10 +1,12 @@
 from abc import ABC, abstractmethod
-from typing import Any
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
 
 from game_core.constants.event_type import EventType
 from game_core.constants.vote_result import VoteResult
 from game_core.entities.event import Event
 from game_core.entities.game import Game, GameConfig
+from game_core.entities.game_snapshot import GameSnapshot
 from game_core.entities.player import Player
 from game_core.entities.quest import Quest
 from game_core.entities.quest_vote import QuestVote
@@ -22,6 +24,15 @@ class Repository(ABC):
     def get_game(self, game_id: str) -> Game:
         pass
 
+    @abstractmethod
+    def get_game_snapshot(self, game_id: str) -> GameSnapshot:
+        """
+        Loads the game together with its players, quests, rounds, votes and connection ids
+        :param game_id:
+        :return: the snapshot of the game, events are not included
+        """
+        pass
+
     @abstractmethod
     def put_event(
         self,
@@ -33,8 +44,30 @@ class Repository(ABC):
     ) -> Event:
         pass
 
+    def put_events(
+        self,
+        game_id: str,
+        events: list[tuple[EventType, list[str], dict[str, Any]]],
+        timestamp: str,
+    ) -> list[Event]:
+        """
+        Stores several events together. By default they are put one by one in a unit of work, so implementations
+        buffering the unit of work write them in a single request.
+        :param events: the type, recipients and payload of each event
+        :return: the events in the given order
+        """
+        with self.unit_of_work():
+            return [
+                self.put_event(game_id, event_type, recipients, payload, timestamp)
+                for event_type, recipients, payload in events
+            ]
+
     @abstractmethod
-    def get_events(self, game_id: str, player_id: str) -> list[Event]:
+    def get_events(self, game_id: str, player_id: str, since: Optional[str] = None) -> list[Event]:
+        """
+        Lists the events visible to the player, oldest first
+        :param since: id of the last event the player has seen, only newer events are returned
+        """
         pass
 
     @abstractmethod
@@ -45,6 +78,14 @@ class Repository(ABC):
     def update_player(self, player: Player) -> Player:
         pass
 
+    def update_players(self, players: list[Player]) -> list[Player]:
+        """
+        Updates several players together. By default they are updated one by one in a unit of work, so
+        implementations buffering the unit of work write them in a single request.
+        """
+        with self.unit_of_work():
+            return [self.update_player(player) for player in players]
+
     @abstractmethod
     def get_players(self, game_id: str) -> list[Player]:
         pass
@@ -92,6 +133,11 @@ class Repository(ABC):
         player_id: str,
         vote_result: VoteResult,
     ) -> RoundVote:
+        """
+        Saves the vote and, in the same write, adds it to the votes_cast, votes_pass and votes_fail counters of the
+        round, so the updated counts are read back with get_round
+        :raises DuplicateVoteError: if the player has already voted in the round
+        """
         pass
 
     @abstractmethod
@@ -108,6 +154,11 @@ class Repository(ABC):
     def put_quest_vote(
         self, game_id: str, quest_number: int, player_id: str, is_approved: bool
     ) -> QuestVote:
+        """
+        Saves the vote and, in the same write, adds it to the votes_cast, votes_pass and votes_fail counters of the
+        quest, so the updated counts are read back with get_quest
+        :raises DuplicateVoteError: if the player has already voted in the quest
+        """
         pass
 
     @abstractmethod
@@ -116,4 +167,22 @@ class Repository(ABC):
 
     @abstractmethod
     def update_game(self, game: Game) -> Game:
+        """
+        Saves the game if it is still at game.version, and increments the version
+        :raises ConcurrentModificationError: if the game was updated since it was read
+        """
+        pass
+
+    @contextmanager
+    def unit_of_work(self) -> Iterator[None]:
+        """
+        Groups the writes made inside the block. Implementations may buffer them and persist them together
+        when the block exits without error, reads inside the block must still see the buffered writes.
+        """
+        yield
+
+    def evict(self, game_id: str) -> None:
+        """
+        Drops the game from the memory of the implementations that keep games, once it is no longer played
+        """
         pass
@@ -22,7 +22,7 @@ class EventService:
         self._comm_service.broadcast(event)
 
     def create_game_started_events(self, game_id: str, players: list[Player]) -> None:
-        events_by_player_id: dict[str, Event] = {}
+        new_events = []
         player_by_id = {player.id: player for player in players}
         for player in players:
             known_players = [
@@ -39,12 +39,10 @@ class EventService:
                     for known_player in known_players
                 ],
             }
-            events_by_player_id[player.id] = self._create_event(
-                game_id, EventType.GameStarted, [player.id], payload
-            )
+            new_events.append((EventType.GameStarted, [player.id], payload))
 
-        for player_id, event in events_by_player_id.items():
-            self._comm_service.notify(player_id, event)
+        events = self._repository.put_events(game_id, new_events, datetime.now().isoformat())
+        self._comm_service.notify_many({player.id: event for player, event in zip(players, events)})
 
     def create_quest_started_event(self, game_id: str, quest_number: int) -> None:
         payload = {
@@ -156,8 +154,7 @@ class EventService:
         event = self._create_event(
             game_id, EventType.QuestVoteRequested, team_member_ids, payload
         )
-        for team_member_id in team_member_ids:
-            self._comm_service.notify(team_member_id, event)
+        self._comm_service.notify_many({team_member_id: event for team_member_id in team_member_ids})
 
     def create_quest_vote_cast_event(
         self, game_id: str, quest_number: int, player_id: str, vote_result: VoteResult
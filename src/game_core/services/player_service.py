@@ -64,7 +64,7 @@ class PlayerService:
                     logger.debug(f"appending {role_player_id[known_role]}")
                     player.known_player_ids.append(role_player_id[known_role])
             logger.debug(f"player: {player}, known_player_ids: {player.known_player_ids}")
-            self._repository.update_player(player)
+        self._repository.update_players(players)
         return players
 
     def get_player(self, player_id: str) -> Player:
@@ -33,6 +33,8 @@ class QuestService:
         quest = self.get_current_quest(game_id)
         current_round = self._round_service.get_current_round(game_id)
         team_member_ids = current_round.team_member_ids
+        quest.team_member_ids = team_member_ids
+        self._repository.update_quest(quest)
 
         self._event_service.create_quest_vote_started_event(
             game_id, quest.quest_number, team_member_ids
@@ -66,7 +68,8 @@ class QuestService:
             if self.is_quest_passed(action.game_id, quest_number)
             else VoteResult.Fail
         )
-        self.complete_quest(action.game_id, quest_number, result)
+        quest = self._repository.get_quest(game_id, quest_number)
+        self.complete_quest(action.game_id, quest, result)
 
     def _validate_quest_vote_cast_event(self, action: Action) -> None:
         CastQuestVotePayload(**action.payload)
@@ -76,21 +79,14 @@ class QuestService:
         game_id = action.game_id
         self._player_service.get_player(player_id)
         self._repository.get_quest(game_id, quest_number)
-        quest_votes = self._repository.get_quest_votes(game_id, quest_number)
-        voted_player_ids = [qv.player_id for qv in quest_votes]
-        if player_id in voted_player_ids:
-            raise ValueError(f"Player {player_id} already voted for quest {quest_number}")
 
     def is_quest_vote_completed(self, game_id: str, quest_number: int) -> bool:
         quest = self._repository.get_quest(game_id, quest_number)
-        quest_votes = self._repository.get_quest_votes(game_id, quest_number)
-        return len(quest_votes) == len(quest.team_member_ids)
+        return quest.votes_cast == len(quest.team_member_ids)
 
     def is_quest_passed(self, game_id: str, quest_number: int) -> bool:
-        quest_votes = self._repository.get_quest_votes(game_id, quest_number)
-        disapprove_votes = [qv for qv in quest_votes if not qv.result]
-
-        return len(disapprove_votes) <= (0 if quest_number != 4 else 1)
+        quest = self._repository.get_quest(game_id, quest_number)
+        return quest.votes_fail <= (0 if quest_number != 4 else 1)
 
     def has_majority(self, game_id: str) -> bool:
         """
@@ -119,13 +115,23 @@ class QuestService:
         )
 
     def create_quest(self, game_id: str) -> Quest:
+        """
+        Creates the next quest and moves the game's current quest pointer to it
+        """
         current_quest = self.get_current_quest(game_id)
         quest_number = 1 if not current_quest else current_quest.quest_number + 1
         quest = self._repository.put_quest(game_id, quest_number)
+        game = self._repository.get_game(game_id)
+        game.current_quest_number = quest_number
+        self._repository.update_game(game)
         self._event_service.create_quest_started_event(game_id, quest_number)
         return quest
 
     def get_current_quest(self, game_id: str) -> Optional[Quest]:
+        game = self._repository.get_game(game_id)
+        if game.current_quest_number is not None:
+            return self._repository.get_quest(game_id, game.current_quest_number)
+        # games started before the game held the current quest
         quests = self._repository.get_quests(game_id)
         quests = sorted(quests, key=lambda q: q.quest_number)
         return None if not quests else quests[-1]
@@ -4,6 +4,7 @@ from pydantic import BaseModel
 
 from game_core.constants.vote_result import VoteResult
 from game_core.entities.action import Action
+from game_core.entities.game import Game
 from game_core.entities.round import Round
 from game_core.repository import Repository
 from game_core.services.event_service import EventService
@@ -101,40 +102,42 @@ class RoundService:
         game_round = self._repository.get_round(game_id, quest_number, round_number)
         if game_round.result:
             raise ValueError(f"Round {round_number} already completed {game_round}")
-        round_votes = self._repository.get_round_votes(game_id, quest_number, round_number)
-        voted_player_ids = [rv.player_id for rv in round_votes]
-        if player_id in voted_player_ids:
-            raise ValueError(f"Player {player_id} already voted for quest {quest_number} round {round_number}")
 
     def is_round_vote_completed(
         self, game_id: str, quest_number: int, round_number: int
     ) -> bool:
-        players = self._repository.get_players(game_id)
-        round_votes = self._repository.get_round_votes(
-            game_id, quest_number, round_number
-        )
-        return len(players) == len(round_votes)
+        game = self._repository.get_game(game_id)
+        game_round = self._repository.get_round(game_id, quest_number, round_number)
+        return game_round.votes_cast == len(game.player_ids)
 
     def is_proposal_passed(
         self, game_id: str, quest_number: int, round_number: int
     ) -> bool:
-        round_votes = self._repository.get_round_votes(
-            game_id, quest_number, round_number
-        )
-        approved_votes = [rv for rv in round_votes if rv.result == VoteResult.Pass]
-        return len(approved_votes) > len(round_votes) / 2
+        game_round = self._repository.get_round(game_id, quest_number, round_number)
+        return game_round.votes_pass > game_round.votes_cast / 2
 
     def create_round(self, game_id: str, quest_number: int) -> Round:
-        current_round = self.get_current_round(game_id)
-        round_number = 1 if not current_round else current_round.round_number + 1
-        leader_id = self._rotate_leader(game_id)
+        """
+        Creates the next round of the quest and moves the game's current round and leader pointers to it
+        """
+        game = self._repository.get_game(game_id)
+        if game.current_round_number is None:
+            current_round = self.get_current_round(game_id)
+            round_number = 1 if not current_round else current_round.round_number + 1
+        else:
+            round_number = game.current_round_number + 1
+        leader_index = self._rotate_leader(game)
+        leader_id = game.player_ids[leader_index]
         next_round = self._repository.put_round(
             game_id, quest_number, round_number, leader_id
         )
+        game.current_quest_number = quest_number
+        game.current_round_number = round_number
+        game.leader_index = leader_index
+        self._repository.update_game(game)
         self._event_service.create_round_started_event(
             game_id, quest_number, round_number, leader_id
         )
-        game = self._repository.get_game(game_id)
         number_of_players = game.config.quest_team_size[quest_number]
         self._event_service.create_team_selection_requested_event(
             game_id, quest_number, round_number, number_of_players
@@ -142,24 +145,26 @@ class RoundService:
         return next_round
 
     def get_current_round(self, game_id: str) -> Optional[Round]:
+        game = self._repository.get_game(game_id)
+        if game.current_round_number is not None:
+            return self._repository.get_round(game_id, game.current_quest_number, game.current_round_number)
+        # games started before the game held the current round
         rounds = self._repository.get_rounds(game_id)
         rounds = sorted(rounds, key=lambda r: (r.quest_number, r.round_number))
         return rounds[-1] if rounds else None
 
-    def _rotate_leader(self, game_id: str) -> str:
+    def _rotate_leader(self, game: Game) -> int:
         """
         Rotates the leader to the next player
-        :param game_id:
-        :return: the next leader id
+        :param game:
+        :return: the index of the next leader in the game's player ids
         """
-        game = self._repository.get_game(game_id)
-        rounds = self._repository.get_rounds(game_id)
-        rounds.sort(key=lambda r: (r.quest_number, r.round_number))
         player_ids = game.player_ids
-        leader_id = rounds[-1].leader_id if rounds else player_ids[0]
-        idx = player_ids.index(leader_id)
-        next_leader_id = player_ids[(idx + 1) % len(player_ids)]
-        return next_leader_id
+        if game.leader_index is not None:
+            return (game.leader_index + 1) % len(player_ids)
+        current_round = self.get_current_round(game.id)
+        leader_id = current_round.leader_id if current_round else player_ids[0]
+        return (player_ids.index(leader_id) + 1) % len(player_ids)
 
 
 class SubmitTeamProposalPayload(BaseModel):
@@ -0,0 +1,291 @@
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+from game_core.constants.event_type import EventType
+from game_core.constants.vote_result import VoteResult
+from game_core.entities.event import Event
+from game_core.entities.game import Game
+from game_core.entities.game_snapshot import GameSnapshot
+from game_core.entities.player import Player
+from game_core.entities.quest import Quest
+from game_core.entities.quest_vote import QuestVote
+from game_core.entities.round import Round
+from game_core.entities.round_vote import RoundVote
+from game_core.exceptions import DuplicateVoteError
+from game_core.repository import Repository
+
+
+class SnapshotRepository(Repository):
+    """
+    Serves the reads of the loaded games from a GameSnapshot each, which is loaded by a single call to the wrapped
+    repository. Writes go through to the wrapped repository and are applied to the snapshot, so it stays current for
+    the rest of the action. Reads of any other game, and of events, are delegated. The reads served from a snapshot
+    are counted as hits, the ones delegated and the loads as misses, so the saved round trips can be seen.
+    """
+
+    def __init__(self, repository: Repository):
+        self._repository = repository
+        self._snapshots: dict[str, GameSnapshot] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        reads = self.hits + self.misses
+        return self.hits / reads if reads else 0.0
+
+    def load(self, game_id: str) -> GameSnapshot:
+        self.misses += 1
+        return self._load(game_id)
+
+    def _load(self, game_id: str) -> GameSnapshot:
+        snapshot = self._snapshots[game_id] = self._repository.get_game_snapshot(game_id)
+        return snapshot
+
+    def is_loaded(self, game_id: str) -> bool:
+        return game_id in self._snapshots
+
+    def unload(self, game_id: str) -> None:
+        self._snapshots.pop(game_id, None)
+
+    def _get_snapshot(self, game_id: str) -> Optional[GameSnapshot]:
+        return self._snapshots.get(game_id)
+
+    def _read_snapshot(self, game_id: str) -> Optional[GameSnapshot]:
+        snapshot = self._snapshots.get(game_id)
+        if snapshot:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return snapshot
+
+    @contextmanager
+    def unit_of_work(self) -> Iterator[None]:
+        try:
+            with self._repository.unit_of_work():
+                yield
+        except Exception:
+            # the buffered writes were dropped, so the snapshots no longer match what is stored
+            self._snapshots.clear()
+            raise
+
+    def put_game(self) -> Game:
+        return self._repository.put_game()
+
+    def get_game(self, game_id: str) -> Game:
+        snapshot = self._read_snapshot(game_id)
+        if not snapshot:
+            return self._repository.get_game(game_id)
+        return snapshot.game
+
+    def get_game_snapshot(self, game_id: str) -> GameSnapshot:
+        return self._read_snapshot(game_id) or self._load(game_id)
+
+    def update_game(self, game: Game) -> Game:
+        updated_game = self._repository.update_game(game)
+        snapshot = self._get_snapshot(game.id)
+        if snapshot:
+            snapshot.game = updated_game
+        return updated_game
+
+    def put_event(
+        self,
+        game_id: str,
+        event_type: EventType,
+        recipients: list[str],
+        payload: dict[str, Any],
+        timestamp: str,
+    ) -> Event:
+        return self._repository.put_event(game_id, event_type, recipients, payload, timestamp)
+
+    def put_events(
+        self,
+        game_id: str,
+        events: list[tuple[EventType, list[str], dict[str, Any]]],
+        timestamp: str,
+    ) -> list[Event]:
+        return self._repository.put_events(game_id, events, timestamp)
+
+    def get_events(self, game_id: str, player_id: str, since: Optional[str] = None) -> list[Event]:
+        return self._repository.get_events(game_id, player_id, since)
+
+    def put_player(self, player_id: str, game_id: str, name: str, secret: str) -> Player:
+        player = self._repository.put_player(player_id, game_id, name, secret)
+        snapshot = self._get_snapshot(game_id)
+        if snapshot:
+            snapshot.players.append(player)
+        return player
+
+    def update_player(self, player: Player) -> Player:
+        updated_player = self._repository.update_player(player)
+        snapshot = self._get_snapshot(player.game_id)
+        if snapshot:
+            _replace(snapshot.players, updated_player)
+        return updated_player
+
+    def update_players(self, players: list[Player]) -> list[Player]:
+        updated_players = self._repository.update_players(players)
+        for updated_player in updated_players:
+            snapshot = self._get_snapshot(updated_player.game_id)
+            if snapshot:
+                _replace(snapshot.players, updated_player)
+        return updated_players
+
+    def get_players(self, game_id: str) -> list[Player]:
+        snapshot = self._read_snapshot(game_id)
+        if not snapshot:
+            return self._repository.get_players(game_id)
+        return list(snapshot.players)
+
+    def get_player(self, player_id: str) -> Player:
+        snapshot = self._read_snapshot(player_id.split("_player_", 1)[0])
+        if not snapshot:
+            return self._repository.get_player(player_id)
+        return _find(snapshot.players, f"Player {player_id} not found", id=player_id)
+
+    def put_quest(self, game_id: str, quest_number: int) -> Quest:
+        quest = self._repository.put_quest(game_id, quest_number)
+        snapshot = self._get_snapshot(game_id)
+        if snapshot:
+            snapshot.quests.append(quest)
+        return quest
+
+    def get_quests(self, game_id: str) -> list[Quest]:
+        snapshot = self._read_snapshot(game_id)
+        if not snapshot:
+            return self._repository.get_quests(game_id)
+        return list(snapshot.quests)
+
+    def get_quest(self, game_id: str, quest_number: int) -> Quest:
+        snapshot = self._read_snapshot(game_id)
+        if not snapshot:
+            return self._repository.get_quest(game_id, quest_number)
+        return _find(
+            snapshot.quests,
+            f"Quest {game_id}_{quest_number} not found",
+            quest_number=quest_number,
+        )
+
+    def update_quest(self, quest: Quest) -> Quest:
+        updated_quest = self._repository.update_quest(quest)
+        snapshot = self._get_snapshot(quest.game_id)
+        if snapshot:
+            _replace(snapshot.quests, updated_quest)
+        return updated_quest
+
+    def get_rounds(self, game_id: str) -> list[Round]:
+        snapshot = self._read_snapshot(game_id)
+        if not snapshot:
+            return self._repository.get_rounds(game_id)
+        return list(snapshot.rounds)
+
+    def put_round(
+        self, game_id: str, quest_number: int, round_number: int, leader_id: str
+    ) -> Round:
+        game_round = self._repository.put_round(game_id, quest_number, round_number, leader_id)
+        snapshot = self._get_snapshot(game_id)
+        if snapshot:
+            snapshot.rounds.append(game_round)
+        return game_round
+
+    def update_round(self, game_round: Round) -> Round:
+        updated_round = self._repository.update_round(game_round)
+        snapshot = self._get_snapshot(game_round.game_id)
+        if snapshot:
+            _replace(snapshot.rounds, updated_round)
+        return updated_round
+
+    def get_round(self, game_id: str, quest_number: int, round_number: int) -> Round:
+        snapshot = self._read_snapshot(game_id)
+        if not snapshot:
+            return self._repository.get_round(game_id, quest_number, round_number)
+        return _find(
+            snapshot.rounds,
+            f"Round {game_id}_{quest_number}_{round_number} not found",
+            quest_number=quest_number,
+            round_number=round_number,
+        )
+
+    def put_round_vote(
+        self,
+        game_id: str,
+        quest_number: int,
+        round_number: int,
+        player_id: str,
+        vote_result: VoteResult,
+    ) -> RoundVote:
+        snapshot = self._get_snapshot(game_id)
+        if snapshot and any(
+            rv.quest_number == quest_number and rv.round_number == round_number and rv.player_id == player_id
+            for rv in snapshot.round_votes
+        ):
+            raise DuplicateVoteError(f"Player {player_id} already voted for quest {quest_number} round {round_number}")
+        round_vote = self._repository.put_round_vote(
+            game_id, quest_number, round_number, player_id, vote_result
+        )
+        if snapshot:
+            snapshot.round_votes.append(round_vote)
+            game_round = _find(
+                snapshot.rounds,
+                f"Round {game_id}_{quest_number}_{round_number} not found",
+                quest_number=quest_number,
+                round_number=round_number,
+            )
+            _count_vote(game_round, vote_result)
+        return round_vote
+
+    def get_round_votes(
+        self, game_id: str, quest_number: int, round_number: int
+    ) -> list[RoundVote]:
+        snapshot = self._read_snapshot(game_id)
+        if not snapshot:
+            return self._repository.get_round_votes(game_id, quest_number, round_number)
+        return [
+            rv
+            for rv in snapshot.round_votes
+            if rv.quest_number == quest_number and rv.round_number == round_number
+        ]
+
+    def put_quest_vote(
+        self, game_id: str, quest_number: int, player_id: str, is_approved: bool
+    ) -> QuestVote:
+        snapshot = self._get_snapshot(game_id)
+        if snapshot and any(
+            qv.quest_number == quest_number and qv.player_id == player_id for qv in snapshot.quest_votes
+        ):
+            raise DuplicateVoteError(f"Player {player_id} already voted for quest {quest_number}")
+        quest_vote = self._repository.put_quest_vote(game_id, quest_number, player_id, is_approved)
+        if snapshot:
+            snapshot.quest_votes.append(quest_vote)
+            quest = _find(snapshot.quests, f"Quest {game_id}_{quest_number} not found", quest_number=quest_number)
+            _count_vote(quest, VoteResult.Pass if is_approved else VoteResult.Fail)
+        return quest_vote
+
+    def get_quest_votes(self, game_id: str, quest_number: int) -> list[QuestVote]:
+        snapshot = self._read_snapshot(game_id)
+        if not snapshot:
+            return self._repository.get_quest_votes(game_id, quest_number)
+        return [qv for qv in snapshot.quest_votes if qv.quest_number == quest_number]
+
+
+def _find(entities: list, error_message: str, **attributes: Any) -> Any:
+    for entity in entities:
+        if all(getattr(entity, name) == value for name, value in attributes.items()):
+            return entity
+    raise ValueError(error_message)
+
+
+def _replace(entities: list, updated_entity: Any) -> None:
+    for i, entity in enumerate(entities):
+        if entity.id == updated_entity.id:
+            entities[i] = updated_entity
+            return
+    entities.append(updated_entity)
+
+
+def _count_vote(entity: Round | Quest, vote_result: VoteResult) -> None:
+    entity.votes_cast += 1
+    if vote_result == VoteResult.Pass:
+        entity.votes_pass += 1
+    else:
+        entity.votes_fail += 1
@@ -1,7 +1,10 @@
 import logging
+from typing import Optional
 
+from game_core.batching_comm_service import BatchingCommService
 from game_core.constants.state_name import StateName
 from game_core.entities.action import Action
+from game_core.exceptions import ConcurrentModificationError
 from game_core.repository import Repository
 from game_core.comm_service import CommService
 from game_core.services.event_service import EventService
@@ -9,6 +12,7 @@ from game_core.services.game_service import GameService
 from game_core.services.player_service import PlayerService
 from game_core.services.quest_service import QuestService
 from game_core.services.round_service import RoundService
+from game_core.snapshot_repository import SnapshotRepository
 from game_core.states.end_game_state import EndGameState
 from game_core.states.game_setup_state import GameSetupState
 from game_core.states.quest_voting_state import QuestVotingState
@@ -18,28 +22,36 @@ from game_core.states.team_selection_state import TeamSelectionState
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
+MAX_ACTION_ATTEMPTS = 3
+
 
 class StateMachine:
 
     def __init__(self, comm_service: CommService, repository: Repository, game_id: str):
         self._game_id = game_id
-        self._repository = repository
-        self._event_service = EventService(comm_service, repository)
-        self._player_service = PlayerService(self._event_service, repository)
-        self._round_service = RoundService(self._event_service, repository)
+        self._repository = SnapshotRepository(repository)
+        self._comm_service = BatchingCommService(comm_service)
+        self._event_service = EventService(self._comm_service, self._repository)
+        self._player_service = PlayerService(self._event_service, self._repository)
+        self._round_service = RoundService(self._event_service, self._repository)
         self._game_service = GameService(
-            self._player_service, self._event_service, repository
+            self._player_service, self._event_service, self._repository
         )
         self._quest_service = QuestService(
-            self._round_service, self._event_service, self._player_service, repository
+            self._round_service, self._event_service, self._player_service, self._repository
         )
         self._current_state = None
         self.state_name_map = {}
+        self._build_states()
         self._setup_states()
 
-    def _setup_states(self) -> None:
-        game = self._repository.get_game(self._game_id)
+    def unload(self) -> None:
+        """
+        Drops the snapshot of the game, it is loaded again by the next action
+        """
+        self._repository.unload(self._game_id)
 
+    def _build_states(self) -> None:
         game_setup_state = GameSetupState(self._game_service, self._player_service)
         team_selection_state = TeamSelectionState(
             self._quest_service, self._round_service
@@ -49,7 +61,7 @@ class StateMachine:
         end_game_state = EndGameState(self._game_service)
 
         game_setup_state.set_states(team_selection_state)
-        team_selection_state.set_states(round_voting_state, quest_voting_state)
+        team_selection_state.set_states(round_voting_state, end_game_state)
         round_voting_state.set_states(team_selection_state, quest_voting_state)
         quest_voting_state.set_states(team_selection_state, end_game_state)
 
@@ -60,20 +72,58 @@ class StateMachine:
             StateName.QuestVoting: quest_voting_state,
             StateName.EndGame: end_game_state,
         }
+
+    def _setup_states(self) -> None:
+        game = self._repository.load(self._game_id).game
         self._current_state = self.state_name_map.get(game.state)
 
         if not self._current_state:
             raise ValueError(f"Invalid state {game.state}")
 
-    def handle_action(self, action: Action) -> None:
+    def handle_action(self, action: Action, comm_service: Optional[CommService] = None) -> None:
+        """
+        Handles the action and saves the game, then sends the events of the action. If another action updated the game
+        in the meantime, nothing is saved or sent, and the action is handled again on the reloaded game, up to
+        MAX_ACTION_ATTEMPTS times. The game is reloaded first if its snapshot was dropped, e.g. by a failed action.
+        The snapshot and the events are buffered on the state machine, so it handles one action at a time.
+        :param action:
+        :param comm_service: sends the events instead of the comm service of the state machine
+        :return:
+        """
         if action.payload is None:
             raise ValueError("Action payload is None")
-        next_state = self._current_state.handle(action)
-        if next_state != self._current_state:
-            self._current_state.on_exit(self._game_id)
-            self._current_state = next_state.on_enter(self._game_id) or next_state
+        if not self._repository.is_loaded(self._game_id):
+            self._setup_states()
+        for attempt in range(1, MAX_ACTION_ATTEMPTS + 1):
+            try:
+                self._handle_action(action)
+            except ConcurrentModificationError as e:
+                self._comm_service.discard()
+                if attempt == MAX_ACTION_ATTEMPTS:
+                    raise
+                logger.info(f"Retrying action {action.id}: {e}")
+                self._setup_states()
+            except Exception:
+                self._comm_service.discard()
+                raise
+            else:
+                self._comm_service.flush(comm_service)
+                logger.debug(
+                    f"Reads of game {self._game_id}: {self._repository.hits} from its snapshot, "
+                    f"{self._repository.misses} from the repository"
+                )
+                return
+
+    def _handle_action(self, action: Action) -> None:
+        with self._repository.unit_of_work():
+            next_state = self._current_state.handle(action)
+            # on_enter may move on to another state straight away, e.g. to EndGame once a team has won
+            while next_state and next_state != self._current_state:
+                self._current_state.on_exit(self._game_id)
+                self._current_state = next_state
+                next_state = next_state.on_enter(self._game_id)
 
-        game = self._repository.get_game(self._game_id)
-        logger.info(f"Game {game}")
-        game.state = self._current_state.name
-        self._repository.update_game(game)
+            game = self._repository.get_game(self._game_id)
+            logger.info(f"Game {game}")
+            game.state = self._current_state.name
+            self._repository.update_game(game)
@@ -0,0 +1,126 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from game_core.comm_service import CommService
+from game_core.entities.action import Action
+from game_core.repository import Repository
+from game_core.state_machine import StateMachine
+
+MAX_GAMES = 1000
+IDLE_TIMEOUT = 600.0
+
+
+class StateMachineRegistry:
+    """
+    Keeps the state machines of the recently played games, with the snapshots of their games, so a repeated action of
+    a game is handled without building its state machine and loading its game again. The least recently used game is
+    evicted once there are more than max_games, and a game is evicted once it has not been played for idle_timeout
+    seconds. Each state machine has a repository wrapper and an event buffer of its own, so the actions of different
+    games can be handled concurrently, while the actions of one game must be handled one at a time.
+
+    A process that is not the only one handling the actions of its games, e.g. a Lambda container, passes
+    exclusive=False, then each game is reloaded before its action, which is counted as a miss.
+    """
+
+    def __init__(
+        self,
+        repository: Repository,
+        max_games: int = MAX_GAMES,
+        idle_timeout: float = IDLE_TIMEOUT,
+        exclusive: bool = True,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if max_games < 1:
+            raise ValueError(f"max_games must be at least 1, got {max_games}")
+        self._repository = repository
+        self._max_games = max_games
+        self._idle_timeout = idle_timeout
+        self._exclusive = exclusive
+        self._clock = clock
+        # state machine and last use of each game, least recently used first
+        self._state_machines: OrderedDict[str, tuple[StateMachine, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    @property
+    def metrics(self) -> dict[str, float]:
+        return {
+            "games": len(self._state_machines),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "evictions": self.evictions,
+        }
+
+    def handle_action(self, action: Action, comm_service: CommService) -> None:
+        """
+        Handles the action with the state machine of its game
+        :param action:
+        :param comm_service: sends the events of the action
+        :return:
+        """
+        state_machine = self.get(action.game_id, comm_service)
+        try:
+            state_machine.handle_action(action, comm_service)
+        finally:
+            if not self._exclusive:
+                # another process may play the game in the meantime, so it is reloaded by the next action
+                state_machine.unload()
+
+    def get(self, game_id: str, comm_service: CommService) -> StateMachine:
+        """
+        Returns the state machine of the game, which is created if it is not kept
+        :param game_id:
+        :param comm_service: the default comm service of the state machine, if it is created
+        :return:
+        """
+        with self._lock:
+            self._evict_idle(self._clock())
+            entry = self._state_machines.pop(game_id, None)
+            if entry and self._exclusive:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if entry:
+            state_machine = entry[0]
+        else:
+            # built outside the lock, as it loads the game
+            state_machine = StateMachine(comm_service, self._repository, game_id)
+        with self._lock:
+            self._state_machines[game_id] = (state_machine, self._clock())
+            while len(self._state_machines) > self._max_games:
+                self._evict(next(iter(self._state_machines)))
+        return state_machine
+
+    def evict_idle(self, now: Optional[float] = None) -> None:
+        """
+        Evicts the games that have not been played for idle_timeout seconds
+        """
+        with self._lock:
+            self._evict_idle(self._clock() if now is None else now)
+
+    def evict(self, game_id: str) -> None:
+        with self._lock:
+            if game_id in self._state_machines:
+                self._evict(game_id)
+
+    def _evict_idle(self, now: float) -> None:
+        for game_id, (_, last_used) in list(self._state_machines.items()):
+            if now - last_used < self._idle_timeout:
+                break
+            self._evict(game_id)
+
+    def _evict(self, game_id: str) -> None:
+        state_machine, _ = self._state_machines.pop(game_id)
+        state_machine.unload()
+        self.evictions += 1
+        self._repository.evict(game_id)
@@ -0,0 +1,236 @@
+import copy
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+from game_core.constants.event_type import EventType
+from game_core.constants.vote_result import VoteResult
+from game_core.entities.event import Event
+from game_core.entities.game import Game
+from game_core.entities.game_snapshot import GameSnapshot
+from game_core.entities.player import Player
+from game_core.entities.quest import Quest
+from game_core.entities.quest_vote import QuestVote
+from game_core.entities.round import Round
+from game_core.entities.round_vote import RoundVote
+from game_core.in_memory_repository import InMemoryRepository
+from game_core.repository import Repository
+
+# name and arguments of a write method
+Write = tuple[str, tuple]
+
+
+class WriteBehindRepository(Repository):
+    """
+    Serves the games from memory and writes them to the wrapped repository later, when flush is called. A game is
+    read from the wrapped repository the first time it is used. The writes of up to flush_batch_size consecutive
+    units of work are written together in a unit of work of the wrapped repository, in the order they were made, so
+    it has to be the only writer of the games. Games are created in the wrapped repository straight away, as it
+    gives them their ids, and events are read from it, so they lag behind until the next flush. The event ids
+    returned by put_event are the in-memory ones, and the events are dropped from memory once they are flushed. A
+    game stays in memory until it is evicted.
+    """
+
+    def __init__(self, repository: Repository, flush_batch_size: int = 1):
+        if flush_batch_size < 1:
+            raise ValueError(f"flush_batch_size must be at least 1, got {flush_batch_size}")
+        self._repository = repository
+        self._flush_batch_size = flush_batch_size
+        self._memory = InMemoryRepository()
+        self._loaded_game_ids: set[str] = set()
+        # the writes of each unit of work waiting to be flushed
+        self._pending: deque[list[Write]] = deque()
+        self._flush_lock = threading.Lock()
+        self._local = threading.local()
+
+    @property
+    def pending_writes(self) -> int:
+        return sum(len(writes) for writes in list(self._pending))
+
+    def flush(self) -> int:
+        """
+        Writes the pending units of work to the wrapped repository. If a batch fails it is kept, with the ones after
+        it, for the next flush, and its error is raised. A unit of work that keeps failing therefore holds back the
+        up to flush_batch_size - 1 others of its batch, and everything after it, on every retry.
+        :return: the number of units of work written
+        """
+        flushed = 0
+        event_game_ids = set()
+        try:
+            with self._flush_lock:
+                while self._pending:
+                    # indexed, as units of work may be appended meanwhile
+                    batch = [self._pending[i] for i in range(min(len(self._pending), self._flush_batch_size))]
+                    with self._repository.unit_of_work():
+                        for writes in batch:
+                            for name, args in writes:
+                                getattr(self._repository, name)(*args)
+                    for _ in batch:
+                        self._pending.popleft()
+                    flushed += len(batch)
+                    event_game_ids.update(
+                        args[0] for writes in batch for name, args in writes if name in ("put_event", "put_events")
+                    )
+        finally:
+            # events are read from the wrapped repository, dropped outside the flush lock as evict holds the lock of
+            # its game while it flushes
+            for game_id in event_game_ids:
+                self._memory.delete_events(game_id)
+        return flushed
+
+    def evict(self, game_id: str) -> None:
+        """
+        Writes the pending units of work, then drops the game from memory, it is read from the wrapped repository
+        again the next time it is used. If the flush fails the game is kept.
+        """
+        # waits for the unit of work in progress on the game, so its writes are flushed too
+        with self._memory.locked(game_id):
+            self.flush()
+            self._memory.delete_game(game_id)
+            self._loaded_game_ids.discard(game_id)
+
+    @contextmanager
+    def unit_of_work(self) -> Iterator[None]:
+        if getattr(self._local, "writes", None) is not None:
+            yield
+            return
+        self._local.writes = []
+        self._local.loaded_game_ids = []
+        try:
+            with self._memory.unit_of_work():
+                yield
+                # appended before the locks of the games are released, so evict flushes it
+                if self._local.writes:
+                    self._pending.append(self._local.writes)
+        except BaseException:
+            # the games loaded inside the unit of work were undone with its writes
+            self._loaded_game_ids.difference_update(self._local.loaded_game_ids)
+            raise
+        finally:
+            self._local.writes = None
+            self._local.loaded_game_ids = None
+
+    def _write(self, name: str, *args: Any) -> Any:
+        # the arguments are copied before they are used, as the in-memory repository changes some, e.g. game versions
+        writes = [(name, copy.deepcopy(args))]
+        result = getattr(self._memory, name)(*args)
+        if getattr(self._local, "writes", None) is None:
+            self._pending.append(writes)
+        else:
+            self._local.writes.extend(writes)
+        return result
+
+    def _load(self, game_id: str) -> None:
+        if game_id not in self._loaded_game_ids:
+            self._memory.put_game_snapshot(self._repository.get_game_snapshot(game_id))
+            self._loaded_game_ids.add(game_id)
+            if getattr(self._local, "loaded_game_ids", None) is not None:
+                self._local.loaded_game_ids.append(game_id)
+
+    def put_game(self) -> Game:
+        game = self._repository.put_game()
+        self._memory.put_game_snapshot(GameSnapshot(game))
+        self._loaded_game_ids.add(game.id)
+        return game
+
+    def get_game(self, game_id: str) -> Game:
+        self._load(game_id)
+        return self._memory.get_game(game_id)
+
+    def get_game_snapshot(self, game_id: str) -> GameSnapshot:
+        self._load(game_id)
+        return self._memory.get_game_snapshot(game_id)
+
+    def update_game(self, game: Game) -> Game:
+        self._load(game.id)
+        return self._write("update_game", game)
+
+    def put_event(
+        self,
+        game_id: str,
+        event_type: EventType,
+        recipients: list[str],
+        payload: dict[str, Any],
+        timestamp: str,
+    ) -> Event:
+        return self._write("put_event", game_id, event_type, recipients, payload, timestamp)
+
+    def put_events(
+        self, game_id: str, events: list[tuple[EventType, list[str], dict[str, Any]]], timestamp: str
+    ) -> list[Event]:
+        return self._write("put_events", game_id, events, timestamp)
+
+    def get_events(self, game_id: str, player_id: str, since: Optional[str] = None) -> list[Event]:
+        return self._repository.get_events(game_id, player_id, since)
+
+    def put_player(self, player_id: str, game_id: str, name: str, secret: str) -> Player:
+        self._load(game_id)
+        return self._write("put_player", player_id, game_id, name, secret)
+
+    def update_player(self, player: Player) -> Player:
+        self._load(player.game_id)
+        return self._write("update_player", player)
+
+    def update_players(self, players: list[Player]) -> list[Player]:
+        for game_id in {player.game_id for player in players}:
+            self._load(game_id)
+        return self._write("update_players", players)
+
+    def get_players(self, game_id: str) -> list[Player]:
+        self._load(game_id)
+        return self._memory.get_players(game_id)
+
+    def get_player(self, player_id: str) -> Player:
+        self._load(player_id.split("_", 1)[0])
+        return self._memory.get_player(player_id)
+
+    def put_quest(self, game_id: str, quest_number: int) -> Quest:
+        self._load(game_id)
+        return self._write("put_quest", game_id, quest_number)
+
+    def get_quests(self, game_id: str) -> list[Quest]:
+        self._load(game_id)
+        return self._memory.get_quests(game_id)
+
+    def get_quest(self, game_id: str, quest_number: int) -> Quest:
+        self._load(game_id)
+        return self._memory.get_quest(game_id, quest_number)
+
+    def update_quest(self, quest: Quest) -> Quest:
+        self._load(quest.game_id)
+        return self._write("update_quest", quest)
+
+    def get_rounds(self, game_id: str) -> list[Round]:
+        self._load(game_id)
+        return self._memory.get_rounds(game_id)
+
+    def put_round(self, game_id: str, quest_number: int, round_number: int, leader_id: str) -> Round:
+        self._load(game_id)
+        return self._write("put_round", game_id, quest_number, round_number, leader_id)
+
+    def update_round(self, game_round: Round) -> Round:
+        self._load(game_round.game_id)
+        return self._write("update_round", game_round)
+
+    def get_round(self, game_id: str, quest_number: int, round_number: int) -> Round:
+        self._load(game_id)
+        return self._memory.get_round(game_id, quest_number, round_number)
+
+    def put_round_vote(
+        self, game_id: str, quest_number: int, round_number: int, player_id: str, vote_result: VoteResult
+    ) -> RoundVote:
+        self._load(game_id)
+        return self._write("put_round_vote", game_id, quest_number, round_number, player_id, vote_result)
+
+    def get_round_votes(self, game_id: str, quest_number: int, round_number: int) -> list[RoundVote]:
+        self._load(game_id)
+        return self._memory.get_round_votes(game_id, quest_number, round_number)
+
+    def put_quest_vote(self, game_id: str, quest_number: int, player_id: str, is_approved: bool) -> QuestVote:
+        self._load(game_id)
+        return self._write("put_quest_vote", game_id, quest_number, player_id, is_approved)
+
+    def get_quest_votes(self, game_id: str, quest_number: int) -> list[QuestVote]:
+        self._load(game_id)
+        return self._memory.get_quest_votes(game_id, quest_number)
@@ -0,0 +1,578 @@
+import dataclasses
+import json
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+from game_core.constants.event_type import EventType
+from game_core.constants.game_status import GameStatus
+from game_core.constants.role import Role
+from game_core.constants.state_name import StateName
+from game_core.constants.vote_result import VoteResult
+from game_core.entities.event import Event
+from game_core.entities.game import Game, GameConfig
+from game_core.entities.game_snapshot import GameSnapshot
+from game_core.entities.player import Player
+from game_core.entities.quest import Quest
+from game_core.entities.quest_vote import QuestVote
+from game_core.entities.round import Round
+from game_core.entities.round_vote import RoundVote
+from game_core.exceptions import ConcurrentModificationError, DuplicateVoteError
+from game_core.repository import Repository
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    state TEXT NOT NULL,
+    config TEXT,
+    player_ids TEXT NOT NULL,
+    assassination_attempts INTEGER,
+    result TEXT,
+    version INTEGER NOT NULL,
+    current_quest_number INTEGER,
+    current_round_number INTEGER,
+    leader_index INTEGER
+);
+CREATE TABLE IF NOT EXISTS players (
+    game_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    secret TEXT NOT NULL,
+    role TEXT,
+    known_player_ids TEXT NOT NULL,
+    PRIMARY KEY (game_id, id)
+);
+CREATE TABLE IF NOT EXISTS quests (
+    game_id TEXT NOT NULL,
+    quest_number INTEGER NOT NULL,
+    result TEXT,
+    team_member_ids TEXT NOT NULL,
+    PRIMARY KEY (game_id, quest_number)
+);
+CREATE TABLE IF NOT EXISTS rounds (
+    game_id TEXT NOT NULL,
+    quest_number INTEGER NOT NULL,
+    round_number INTEGER NOT NULL,
+    leader_id TEXT NOT NULL,
+    team_member_ids TEXT NOT NULL,
+    result TEXT,
+    PRIMARY KEY (game_id, quest_number, round_number)
+);
+CREATE TABLE IF NOT EXISTS votes (
+    game_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    quest_number INTEGER NOT NULL,
+    round_number INTEGER NOT NULL,
+    player_id TEXT NOT NULL,
+    result TEXT NOT NULL,
+    PRIMARY KEY (game_id, kind, quest_number, round_number, player_id)
+);
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    game_id TEXT NOT NULL,
+    type TEXT NOT NULL,
+    recipients TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    timestamp TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_game_id ON events (game_id, seq);
+CREATE TABLE IF NOT EXISTS event_recipients (
+    game_id TEXT NOT NULL,
+    recipient TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    PRIMARY KEY (game_id, recipient, seq)
+) WITHOUT ROWID;
+"""
+
+# the recipient of the public events in event_recipients
+PUBLIC_RECIPIENT = ""
+
+# fills event_recipients from the events stored before it was created
+BACKFILL_EVENT_RECIPIENTS = """
+INSERT OR IGNORE INTO event_recipients (game_id, recipient, seq)
+SELECT game_id, ?, seq FROM events WHERE recipients = '[]'
+UNION ALL
+SELECT e.game_id, r.value, e.seq FROM events e, json_each(e.recipients) r
+"""
+
+# quest votes are stored with round number 0
+ROUND_VOTE = "round"
+QUEST_VOTE = "quest"
+
+UPSERT_PLAYER = """
+INSERT INTO players (game_id, id, name, secret, role, known_player_ids) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (game_id, id) DO UPDATE SET
+    name = excluded.name, secret = excluded.secret, role = excluded.role, known_player_ids = excluded.known_player_ids
+"""
+# the vote counters are aggregated from the votes primary key index rather than stored
+SELECT_ROUNDS = """
+SELECT r.game_id, r.quest_number, r.round_number, r.leader_id, r.team_member_ids, r.result,
+    COUNT(v.player_id), COALESCE(SUM(v.result = 'Pass'), 0), COALESCE(SUM(v.result = 'Fail'), 0)
+FROM rounds r
+LEFT JOIN votes v
+    ON v.game_id = r.game_id AND v.kind = 'round'
+    AND v.quest_number = r.quest_number AND v.round_number = r.round_number
+"""
+SELECT_QUESTS = """
+SELECT q.game_id, q.quest_number, q.result, q.team_member_ids,
+    COUNT(v.player_id), COALESCE(SUM(v.result = 'Pass'), 0), COALESCE(SUM(v.result = 'Fail'), 0)
+FROM quests q
+LEFT JOIN votes v
+    ON v.game_id = q.game_id AND v.kind = 'quest' AND v.quest_number = q.quest_number AND v.round_number = 0
+"""
+
+
+class SQLiteRepository(Repository):
+    """
+    Stores the games in a SQLite database file, for deployments running on a single host. The database is opened in
+    WAL mode with one connection per thread, so reads are not blocked by a writing action. A unit of work is one
+    immediate transaction.
+    """
+
+    def __init__(self, path: str):
+        self._path = path
+        self._local = threading.local()
+        with self._connection() as connection:
+            backfill = not connection.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'event_recipients'"
+            ).fetchone()
+            connection.executescript(SCHEMA)
+        if backfill:
+            with self.unit_of_work():
+                self._execute(BACKFILL_EVENT_RECIPIENTS, (PUBLIC_RECIPIENT,))
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            # autocommit mode, transactions are started explicitly by unit_of_work
+            connection = sqlite3.connect(
+                self._path, isolation_level=None, check_same_thread=False, cached_statements=256
+            )
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            connection.execute("PRAGMA busy_timeout = 5000")
+            self._local.connection = connection
+        yield connection
+
+    def close(self) -> None:
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    @contextmanager
+    def unit_of_work(self) -> Iterator[None]:
+        with self._connection() as connection:
+            if connection.in_transaction:
+                yield
+                return
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+    @contextmanager
+    def _read_transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Makes several reads see the same state of the database
+        """
+        with self._connection() as connection:
+            if connection.in_transaction:
+                yield connection
+                return
+            connection.execute("BEGIN")
+            try:
+                yield connection
+            finally:
+                connection.execute("COMMIT")
+
+    def _execute(self, sql: str, parameters: tuple = ()) -> sqlite3.Cursor:
+        with self._connection() as connection:
+            return connection.execute(sql, parameters)
+
+    def put_game(self) -> Game:
+        game = Game(uuid.uuid4().hex, GameStatus.NotStarted, StateName.GameSetup, None, [], None, None)
+        self._execute(
+            "INSERT INTO games (id, status, state, config, player_ids, assassination_attempts, result, version) "
+            "VALUES (?, ?, ?, NULL, '[]', NULL, NULL, 0)",
+            (game.id, game.status.value, game.state.value),
+        )
+        return game
+
+    def get_game(self, game_id: str) -> Game:
+        row = self._execute(
+            "SELECT id, status, state, config, player_ids, assassination_attempts, result, version, "
+            "current_quest_number, current_round_number, leader_index FROM games WHERE id = ?",
+            (game_id,),
+        ).fetchone()
+        if not row:
+            raise ValueError(f"Game {game_id} not found")
+        return self._to_game(row)
+
+    def get_game_snapshot(self, game_id: str) -> GameSnapshot:
+        with self._read_transaction():
+            snapshot = GameSnapshot(game=self.get_game(game_id))
+            snapshot.players = self.get_players(game_id)
+            snapshot.quests = self.get_quests(game_id)
+            snapshot.rounds = self.get_rounds(game_id)
+            rows = self._execute(
+                "SELECT game_id, kind, quest_number, round_number, player_id, result FROM votes WHERE game_id = ?",
+                (game_id,),
+            ).fetchall()
+        for row in rows:
+            if row[1] == ROUND_VOTE:
+                snapshot.round_votes.append(self._to_round_vote(row))
+            else:
+                snapshot.quest_votes.append(self._to_quest_vote(row))
+        return snapshot
+
+    def update_game(self, game: Game) -> Game:
+        config = json.dumps(dataclasses.asdict(game.config)) if game.config else None
+        cursor = self._execute(
+            "UPDATE games SET status = ?, state = ?, config = ?, player_ids = ?, assassination_attempts = ?, "
+            "result = ?, current_quest_number = ?, current_round_number = ?, leader_index = ?, "
+            "version = version + 1 WHERE id = ? AND version = ?",
+            (
+                game.status.value,
+                game.state.value,
+                config,
+                json.dumps(game.player_ids or []),
+                game.assassination_attempts,
+                game.result,
+                game.current_quest_number,
+                game.current_round_number,
+                game.leader_index,
+                game.id,
+                game.version,
+            ),
+        )
+        if cursor.rowcount == 0:
+            self.get_game(game.id)
+            raise ConcurrentModificationError(f"Game {game.id} was modified since version {game.version}")
+        game.version += 1
+        return game
+
+    def put_event(
+        self,
+        game_id: str,
+        event_type: EventType,
+        recipients: list[str],
+        payload: dict[str, Any],
+        timestamp: str,
+    ) -> Event:
+        with self.unit_of_work(), self._connection() as connection:
+            seq = connection.execute(
+                "INSERT INTO events (game_id, type, recipients, payload, timestamp) VALUES (?, ?, ?, ?, ?)",
+                (game_id, event_type.value, json.dumps(recipients), json.dumps(payload), timestamp),
+            ).lastrowid
+            connection.executemany(
+                "INSERT OR IGNORE INTO event_recipients (game_id, recipient, seq) VALUES (?, ?, ?)",
+                [(game_id, recipient, seq) for recipient in recipients or [PUBLIC_RECIPIENT]],
+            )
+        return Event(f"{game_id}_event_{seq}", game_id, event_type, recipients, payload, timestamp)
+
+    def get_events(self, game_id: str, player_id: str, since: Optional[str] = None) -> list[Event]:
+        after_seq = int(since.rsplit("_", 1)[-1]) if since else 0
+        # a range of the event_recipients primary key for each of the public events and the player's events
+        rows = self._execute(
+            "SELECT e.seq, e.game_id, e.type, e.recipients, e.payload, e.timestamp "
+            "FROM event_recipients r JOIN events e ON e.seq = r.seq "
+            "WHERE r.game_id = ? AND r.recipient IN (?, ?) AND r.seq > ? "
+            "ORDER BY r.seq",
+            (game_id, PUBLIC_RECIPIENT, player_id, after_seq),
+        ).fetchall()
+        return [
+            Event(
+                f"{game_id}_event_{seq}",
+                game_id,
+                EventType(event_type),
+                json.loads(recipients),
+                json.loads(payload),
+                timestamp,
+            )
+            for seq, game_id, event_type, recipients, payload, timestamp in rows
+        ]
+
+    def put_player(self, player_id: str, game_id: str, name: str, secret: str) -> Player:
+        player = Player(f"{game_id}_player_{player_id}", game_id, name, secret)
+        self._upsert_player(player)
+        return player
+
+    def update_player(self, player: Player) -> Player:
+        self._upsert_player(player)
+        return player
+
+    def update_players(self, players: list[Player]) -> list[Player]:
+        with self.unit_of_work(), self._connection() as connection:
+            connection.executemany(UPSERT_PLAYER, [self._player_parameters(player) for player in players])
+        return players
+
+    def _upsert_player(self, player: Player) -> None:
+        self._execute(UPSERT_PLAYER, self._player_parameters(player))
+
+    @staticmethod
+    def _player_parameters(player: Player) -> tuple:
+        return (
+            player.game_id,
+            player.id,
+            player.name,
+            player.secret,
+            player.role.value if player.role else None,
+            json.dumps(player.known_player_ids),
+        )
+
+    def get_players(self, game_id: str) -> list[Player]:
+        rows = self._execute(
+            "SELECT game_id, id, name, secret, role, known_player_ids FROM players WHERE game_id = ? ORDER BY id",
+            (game_id,),
+        ).fetchall()
+        return [self._to_player(row) for row in rows]
+
+    def get_player(self, player_id: str) -> Player:
+        game_id = player_id.split("_", 1)[0]
+        row = self._execute(
+            "SELECT game_id, id, name, secret, role, known_player_ids FROM players WHERE game_id = ? AND id = ?",
+            (game_id, player_id),
+        ).fetchone()
+        if not row:
+            raise ValueError(f"Player {player_id} not found")
+        return self._to_player(row)
+
+    def put_quest(self, game_id: str, quest_number: int) -> Quest:
+        quest = Quest(f"{game_id}_quest_{quest_number}", game_id, quest_number, team_member_ids=[])
+        self._upsert_quest(quest)
+        return quest
+
+    def get_quests(self, game_id: str) -> list[Quest]:
+        rows = self._execute(
+            f"{SELECT_QUESTS} WHERE q.game_id = ? GROUP BY q.quest_number ORDER BY q.quest_number", (game_id,)
+        ).fetchall()
+        return [self._to_quest(row) for row in rows]
+
+    def get_quest(self, game_id: str, quest_number: int) -> Quest:
+        row = self._execute(
+            f"{SELECT_QUESTS} WHERE q.game_id = ? AND q.quest_number = ? GROUP BY q.quest_number",
+            (game_id, quest_number),
+        ).fetchone()
+        if not row:
+            raise ValueError(f"Quest {game_id}_{quest_number} not found")
+        return self._to_quest(row)
+
+    def update_quest(self, quest: Quest) -> Quest:
+        self._upsert_quest(quest)
+        return quest
+
+    def _upsert_quest(self, quest: Quest) -> None:
+        self._execute(
+            "INSERT INTO quests (game_id, quest_number, result, team_member_ids) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (game_id, quest_number) DO UPDATE SET "
+            "result = excluded.result, team_member_ids = excluded.team_member_ids",
+            (
+                quest.game_id,
+                quest.quest_number,
+                quest.result and quest.result.value,
+                json.dumps(quest.team_member_ids or []),
+            ),
+        )
+
+    def get_rounds(self, game_id: str) -> list[Round]:
+        rows = self._execute(
+            f"{SELECT_ROUNDS} WHERE r.game_id = ? GROUP BY r.quest_number, r.round_number "
+            "ORDER BY r.quest_number, r.round_number",
+            (game_id,),
+        ).fetchall()
+        return [self._to_round(row) for row in rows]
+
+    def put_round(
+        self, game_id: str, quest_number: int, round_number: int, leader_id: str
+    ) -> Round:
+        game_round = Round(
+            f"{game_id}_round_{quest_number}_{round_number}", game_id, quest_number, round_number, leader_id, []
+        )
+        self._upsert_round(game_round)
+        return game_round
+
+    def update_round(self, game_round: Round) -> Round:
+        self._upsert_round(game_round)
+        return game_round
+
+    def _upsert_round(self, game_round: Round) -> None:
+        self._execute(
+            "INSERT INTO rounds (game_id, quest_number, round_number, leader_id, team_member_ids, result) "
+            "VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (game_id, quest_number, round_number) DO UPDATE SET "
+            "leader_id = excluded.leader_id, team_member_ids = excluded.team_member_ids, result = excluded.result",
+            (
+                game_round.game_id,
+                game_round.quest_number,
+                game_round.round_number,
+                game_round.leader_id,
+                json.dumps(game_round.team_member_ids or []),
+                game_round.result and game_round.result.value,
+            ),
+        )
+
+    def get_round(self, game_id: str, quest_number: int, round_number: int) -> Round:
+        row = self._execute(
+            f"{SELECT_ROUNDS} WHERE r.game_id = ? AND r.quest_number = ? AND r.round_number = ? "
+            "GROUP BY r.quest_number, r.round_number",
+            (game_id, quest_number, round_number),
+        ).fetchone()
+        if not row:
+            raise ValueError(f"Round {game_id}_{quest_number}_{round_number} not found")
+        return self._to_round(row)
+
+    def put_round_vote(
+        self,
+        game_id: str,
+        quest_number: int,
+        round_number: int,
+        player_id: str,
+        vote_result: VoteResult,
+    ) -> RoundVote:
+        try:
+            self._execute(
+                "INSERT INTO votes (game_id, kind, quest_number, round_number, player_id, result) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (game_id, ROUND_VOTE, quest_number, round_number, player_id, vote_result.value),
+            )
+        except sqlite3.IntegrityError as e:
+            raise DuplicateVoteError(
+                f"Player {player_id} already voted for quest {quest_number} round {round_number}"
+            ) from e
+        return self._to_round_vote((game_id, ROUND_VOTE, quest_number, round_number, player_id, vote_result.value))
+
+    def get_round_votes(
+        self, game_id: str, quest_number: int, round_number: int
+    ) -> list[RoundVote]:
+        rows = self._execute(
+            "SELECT game_id, kind, quest_number, round_number, player_id, result FROM votes "
+            "WHERE game_id = ? AND kind = ? AND quest_number = ? AND round_number = ? ORDER BY player_id",
+            (game_id, ROUND_VOTE, quest_number, round_number),
+        ).fetchall()
+        return [self._to_round_vote(row) for row in rows]
+
+    def put_quest_vote(
+        self, game_id: str, quest_number: int, player_id: str, is_approved: bool
+    ) -> QuestVote:
+        vote_result = VoteResult.Pass if is_approved else VoteResult.Fail
+        try:
+            self._execute(
+                "INSERT INTO votes (game_id, kind, quest_number, round_number, player_id, result) "
+                "VALUES (?, ?, ?, 0, ?, ?)",
+                (game_id, QUEST_VOTE, quest_number, player_id, vote_result.value),
+            )
+        except sqlite3.IntegrityError as e:
+            raise DuplicateVoteError(f"Player {player_id} already voted for quest {quest_number}") from e
+        return self._to_quest_vote((game_id, QUEST_VOTE, quest_number, 0, player_id, vote_result.value))
+
+    def get_quest_votes(self, game_id: str, quest_number: int) -> list[QuestVote]:
+        rows = self._execute(
+            "SELECT game_id, kind, quest_number, round_number, player_id, result FROM votes "
+            "WHERE game_id = ? AND kind = ? AND quest_number = ? AND round_number = 0 ORDER BY player_id",
+            (game_id, QUEST_VOTE, quest_number),
+        ).fetchall()
+        return [self._to_quest_vote(row) for row in rows]
+
+    @staticmethod
+    def _to_game(row: tuple) -> Game:
+        (
+            game_id, status, state, config, player_ids, assassination_attempts, result, version,
+            current_quest_number, current_round_number, leader_index,
+        ) = row
+        game_config = None
+        if config:
+            config = json.loads(config)
+            game_config = GameConfig(
+                quest_team_size={int(k): v for k, v in config["quest_team_size"].items()},
+                roles=config["roles"],
+                known_roles=config["known_roles"],
+                assassination_attempts=config["assassination_attempts"],
+            )
+        return Game(
+            id=game_id,
+            status=GameStatus(status),
+            state=StateName(state),
+            config=game_config,
+            player_ids=json.loads(player_ids),
+            assassination_attempts=assassination_attempts,
+            result=result,
+            version=version,
+            current_quest_number=current_quest_number,
+            current_round_number=current_round_number,
+            leader_index=leader_index,
+        )
+
+    @staticmethod
+    def _to_player(row: tuple) -> Player:
+        game_id, player_id, name, secret, role, known_player_ids = row
+        return Player(
+            id=player_id,
+            game_id=game_id,
+            name=name,
+            secret=secret,
+            role=Role(role) if role else None,
+            known_player_ids=json.loads(known_player_ids),
+        )
+
+    @staticmethod
+    def _to_quest(row: tuple) -> Quest:
+        game_id, quest_number, result, team_member_ids, votes_cast, votes_pass, votes_fail = row
+        return Quest(
+            id=f"{game_id}_quest_{quest_number}",
+            game_id=game_id,
+            quest_number=quest_number,
+            result=VoteResult(result) if result else None,
+            team_member_ids=json.loads(team_member_ids),
+            votes_cast=votes_cast,
+            votes_pass=votes_pass,
+            votes_fail=votes_fail,
+        )
+
+    @staticmethod
+    def _to_round(row: tuple) -> Round:
+        (
+            game_id, quest_number, round_number, leader_id, team_member_ids, result, votes_cast, votes_pass, votes_fail
+        ) = row
+        return Round(
+            id=f"{game_id}_round_{quest_number}_{round_number}",
+            game_id=game_id,
+            quest_number=quest_number,
+            round_number=round_number,
+            leader_id=leader_id,
+            team_member_ids=json.loads(team_member_ids),
+            result=VoteResult(result) if result else None,
+            votes_cast=votes_cast,
+            votes_pass=votes_pass,
+            votes_fail=votes_fail,
+        )
+
+    @staticmethod
+    def _to_round_vote(row: tuple) -> RoundVote:
+        game_id, _, quest_number, round_number, player_id, result = row
+        return RoundVote(
+            id=f"{game_id}_vote_round_{quest_number}_{round_number}_{player_id}",
+            game_id=game_id,
+            player_id=player_id,
+            quest_number=quest_number,
+            round_number=round_number,
+            result=VoteResult(result),
+        )
+
+    @staticmethod
+    def _to_quest_vote(row: tuple) -> QuestVote:
+        game_id, _, quest_number, _, player_id, result = row
+        return QuestVote(
+            id=f"{game_id}_vote_quest_{quest_number}_{player_id}",
+            game_id=game_id,
+            player_id=player_id,
+            quest_number=quest_number,
+            result=VoteResult(result),
+        )
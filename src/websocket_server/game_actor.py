@@ -0,0 +1,72 @@
+import asyncio
+from typing import Awaitable, Callable, Optional
+
+from game_core.entities.action import Action
+
+MAX_QUEUED_ACTIONS = 64
+
+
+class GameBusyError(Exception):
+    pass
+
+
+class GameActor:
+    """
+    Handles the actions of one game in the order they were submitted. The actions are queued, up to
+    max_queued_actions, and handled one at a time by a worker task, which ends once the queue is drained. The handle
+    coroutine should run the blocking work off the event loop, so the other games and the clients are served
+    meanwhile.
+    """
+
+    def __init__(
+        self,
+        game_id: str,
+        handle: Callable[[Action], Awaitable[None]],
+        max_queued_actions: int = MAX_QUEUED_ACTIONS,
+        on_drained: Optional[Callable[["GameActor"], None]] = None,
+    ):
+        self.game_id = game_id
+        self._handle = handle
+        self._on_drained = on_drained
+        self._actions: asyncio.Queue[tuple[Action, asyncio.Future]] = asyncio.Queue(max_queued_actions)
+        self._worker: Optional[asyncio.Task] = None
+
+    @property
+    def queued_actions(self) -> int:
+        return self._actions.qsize()
+
+    def submit(self, action: Action) -> asyncio.Future:
+        """
+        Queues the action
+        :param action:
+        :return: a future done once the action is handled
+        :raises GameBusyError: when max_queued_actions actions are queued already
+        """
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._actions.put_nowait((action, future))
+        except asyncio.QueueFull:
+            raise GameBusyError(f"Game {self.game_id} has too many queued actions, retry later") from None
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._drain())
+        return future
+
+    async def _drain(self) -> None:
+        try:
+            while not self._actions.empty():
+                action, future = self._actions.get_nowait()
+                # handled even if the client stopped waiting, as the other players are sent its events
+                try:
+                    await self._handle(action)
+                except Exception as e:
+                    if not future.done():
+                        future.set_exception(e)
+                else:
+                    if not future.done():
+                        future.set_result(None)
+        finally:
+            self._worker = None
+            while not self._actions.empty():
+                self._actions.get_nowait()[1].cancel()
+            if self._on_drained:
+                self._on_drained(self)
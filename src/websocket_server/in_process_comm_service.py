@@ -0,0 +1,74 @@
+import json
+import logging
+from typing import Callable, Optional
+
+from game_core.comm_service import CommService
+from game_core.entities.event import Event
+
+log = logging.getLogger(__name__)
+
+
+class InProcessCommService(CommService):
+    """
+    Sends the events to the clients connected to this process, in the frames WebSocketCommService posts. A client is
+    registered with a send function, which must not block, e.g. one queueing the frame for the client's connection.
+    """
+
+    def __init__(self):
+        # game id -> player id -> send function of the player's client
+        self._clients: dict[str, dict[str, Callable[[str], None]]] = {}
+
+    def connect(self, game_id: str, player_id: str, send: Callable[[str], None]) -> None:
+        """
+        Registers the client of the player, replacing the client the player had connected before
+        """
+        self._clients.setdefault(game_id, {})[player_id] = send
+
+    def disconnect(self, game_id: str, player_id: str, send: Callable[[str], None]) -> None:
+        """
+        Unregisters the client of the player, unless the player has connected again with another client since
+        """
+        clients = self._clients.get(game_id, {})
+        if clients.get(player_id) == send:
+            del clients[player_id]
+            if not clients:
+                del self._clients[game_id]
+
+    def get_player_ids(self, game_id: str) -> list[str]:
+        return list(self._clients.get(game_id, {}))
+
+    def broadcast(self, event: Event) -> None:
+        data = json.dumps(event.to_dict())
+        for player_id in self.get_player_ids(event.game_id):
+            self._send(event.game_id, player_id, data)
+
+    def notify(self, player_id: str, event: Event) -> None:
+        self._send(event.game_id, player_id, json.dumps(event.to_dict()))
+
+    def send_batch(self, messages: list[tuple[Optional[str], Event]]) -> None:
+        """
+        Sends each connected player a single frame, the JSON array of the events broadcast or sent to them in order
+        """
+        # event id -> encoded event, each event is encoded once whatever the number of frames it is part of
+        data_by_event_id: dict[str, str] = {}
+        game_ids = dict.fromkeys(event.game_id for _, event in messages)
+        for game_id in game_ids:
+            for player_id in self.get_player_ids(game_id):
+                frame = []
+                for recipient, event in messages:
+                    if event.game_id == game_id and (recipient is None or recipient == player_id):
+                        if event.id not in data_by_event_id:
+                            data_by_event_id[event.id] = json.dumps(event.to_dict())
+                        frame.append(data_by_event_id[event.id])
+                if frame:
+                    self._send(game_id, player_id, "[" + ",".join(frame) + "]")
+
+    def _send(self, game_id: str, player_id: str, data: str) -> None:
+        send = self._clients.get(game_id, {}).get(player_id)
+        if not send:
+            log.info(f"Player {player_id} of game {game_id} is not connected")
+            return
+        try:
+            send(data)
+        except Exception as e:
+            log.error(f"Failed to send event to player {player_id} of game {game_id}", exc_info=e)
@@ -0,0 +1,216 @@
+"""
+Runs Avalon as one long-lived process, without API Gateway and Lambda, for LAN and event deployments. Clients connect
+over WebSocket. The games are kept in memory, the recently played ones with their StateMachine, and written behind to a
+SQLite database, or only kept in memory. Requires the websockets package.
+
+    PYTHONPATH=src python -m websocket_server.server [--host HOST] [--port PORT] [--sqlite PATH]
+
+Messages are JSON objects with a type, each is answered once its events are sent:
+    {"type": "create_game"} -> {"type": "game_created", "game_id": ...}
+    {"type": "join_game", "game_id": ..., "name": ...} -> {"type": "game_joined", "game_id": ..., "player_id": ...}
+    {"type": "connect", "game_id": ..., "player_id": ...} -> {"type": "connected"}
+    {"type": "action", "game_id": ..., "player_id": ..., "action_type": ..., "payload": {...}} -> {"type": "handled"}
+A message that cannot be handled is answered with {"type": "error", "error": ...}, and an action of a game with too many
+queued actions with {"type": "busy", "error": ...}, it can be sent again later. Events are sent as JSON arrays.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import uuid
+from typing import Any, Optional
+
+from websockets.asyncio.server import ServerConnection, serve
+
+from game_core.batching_comm_service import BatchingCommService
+from game_core.constants.action_type import ActionType
+from game_core.entities.action import Action
+from game_core.in_memory_repository import InMemoryRepository
+from game_core.repository import Repository
+from game_core.state_machine_registry import MAX_GAMES, StateMachineRegistry
+from game_core.write_behind_repository import WriteBehindRepository
+from sqlite.sqlite_repository import SQLiteRepository
+from websocket_server.game_actor import MAX_QUEUED_ACTIONS, GameActor, GameBusyError
+from websocket_server.in_process_comm_service import InProcessCommService
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+MAX_QUEUED_FRAMES = 256
+# consecutive actions written to the database together
+FLUSH_BATCH_SIZE = 100
+
+
+class Client:
+    """
+    A connected client. Frames are queued and written by a task of their own, so sending never blocks the game loop.
+    A client whose queue is full is too slow to keep up, and is disconnected.
+    """
+
+    def __init__(self, connection: ServerConnection, max_queued_frames: int = MAX_QUEUED_FRAMES):
+        self._connection = connection
+        self._frames: asyncio.Queue[str] = asyncio.Queue(max_queued_frames)
+        self._writer = asyncio.create_task(self._write())
+        # game id and player id the client is connected as
+        self.player: Optional[tuple[str, str]] = None
+
+    def send(self, data: str) -> None:
+        if self._writer.done():
+            return
+        try:
+            self._frames.put_nowait(data)
+        except asyncio.QueueFull:
+            logger.warning(f"Client {self._connection.remote_address} is too slow, disconnecting it")
+            self._writer.cancel()
+            asyncio.create_task(self._connection.close(code=1008, reason="too slow"))
+
+    async def close(self) -> None:
+        self._writer.cancel()
+
+    async def _write(self) -> None:
+        while True:
+            data = await self._frames.get()
+            await self._connection.send(data)
+
+
+class GameServer:
+    """
+    Handles the messages of the clients on the event loop. The actions of each game are queued to a GameActor, which
+    handles them in order in worker threads, so the actions of different games run concurrently. The writes to the
+    repository are flushed every flush_interval seconds in a worker thread.
+    """
+
+    def __init__(
+        self,
+        repository: Repository,
+        flush_interval: float = 1.0,
+        max_games: int = MAX_GAMES,
+        max_queued_actions: int = MAX_QUEUED_ACTIONS,
+    ):
+        self._repository = WriteBehindRepository(repository, FLUSH_BATCH_SIZE)
+        self._comm_service = InProcessCommService()
+        self.state_machines = StateMachineRegistry(self._repository, max_games)
+        self._actors: dict[str, GameActor] = {}
+        self._max_queued_actions = max_queued_actions
+        self._flush_interval = flush_interval
+
+    async def serve(self, host: str, port: int, stop: Optional[asyncio.Future] = None) -> None:
+        """
+        Serves until stop is done, or forever, then flushes the pending writes
+        """
+        flusher = asyncio.create_task(self._flush_periodically())
+        try:
+            async with serve(self.handle_connection, host, port):
+                logger.info(f"Serving on {host}:{port}")
+                await (stop if stop is not None else asyncio.get_running_loop().create_future())
+        finally:
+            flusher.cancel()
+            await asyncio.to_thread(self._repository.flush)
+
+    async def handle_connection(self, connection: ServerConnection) -> None:
+        client = Client(connection)
+        try:
+            async for message in connection:
+                client.send(json.dumps(await self.handle_message(client, message)))
+        finally:
+            if client.player:
+                game_id, player_id = client.player
+                self._comm_service.disconnect(game_id, player_id, client.send)
+            await client.close()
+
+    async def handle_message(self, client: Client, message: str | bytes) -> dict[str, Any]:
+        try:
+            request = json.loads(message)
+            message_type = request.get("type")
+            if message_type == "create_game":
+                # games are created in the wrapped repository, which may wait for a flush to finish
+                game = await asyncio.to_thread(self._repository.put_game)
+                return {"type": "game_created", "game_id": game.id}
+            if message_type == "join_game":
+                return await self._join_game(client, request["game_id"], request["name"])
+            if message_type == "connect":
+                self._connect(client, request["game_id"], request["player_id"])
+                return {"type": "connected"}
+            if message_type == "action":
+                action_type = ActionType(request["action_type"])
+                payload = request.get("payload", {})
+                await self._handle_action(request["game_id"], request["player_id"], action_type, payload)
+                return {"type": "handled"}
+            raise ValueError(f"Unknown message type {message_type}")
+        except GameBusyError as e:
+            return {"type": "busy", "error": str(e)}
+        except Exception as e:
+            logger.info(f"Failed to handle message {message!r}: {e!r}")
+            return {"type": "error", "error": str(e)}
+
+    async def _join_game(self, client: Client, game_id: str, name: str) -> dict[str, Any]:
+        player_id = uuid.uuid4().hex
+        # connected first, so the player is sent the PlayerJoined event too
+        self._connect(client, game_id, player_id)
+        try:
+            await self._handle_action(game_id, player_id, ActionType.JoinGame, {"name": name})
+        except Exception:
+            self._comm_service.disconnect(game_id, f"{game_id}_player_{player_id}", client.send)
+            client.player = None
+            raise
+        return {"type": "game_joined", "game_id": game_id, "player_id": player_id}
+
+    def _connect(self, client: Client, game_id: str, player_id: str) -> None:
+        if client.player:
+            self._comm_service.disconnect(*client.player, client.send)
+        # events are addressed to the player ids of the repository
+        client.player = (game_id, f"{game_id}_player_{player_id}")
+        self._comm_service.connect(*client.player, client.send)
+
+    async def _handle_action(self, game_id: str, player_id: str, action_type: ActionType, payload: dict) -> None:
+        actor = self._actors.get(game_id)
+        if actor is None:
+            actor = self._actors[game_id] = GameActor(
+                game_id, self._run_action, self._max_queued_actions, self._remove_actor
+            )
+        await actor.submit(Action(uuid.uuid4().hex, game_id, player_id, action_type, payload))
+
+    async def _run_action(self, action: Action) -> None:
+        # handled in a worker thread, as loading a game may read the database, while the events are sent on the loop
+        events = BatchingCommService(self._comm_service)
+        await asyncio.to_thread(self.state_machines.handle_action, action, events)
+        events.flush()
+
+    def _remove_actor(self, actor: GameActor) -> None:
+        if self._actors.get(actor.game_id) is actor:
+            del self._actors[actor.game_id]
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self._flush_interval)
+            try:
+                await asyncio.to_thread(self._repository.flush)
+                # evicting a game flushes it and waits for its action in progress
+                await asyncio.to_thread(self.state_machines.evict_idle)
+            except Exception as e:
+                logger.error("Failed to flush the games, retrying at the next flush", exc_info=e)
+            logger.debug(f"State machines {self.state_machines.metrics}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Runs the Avalon game server")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--sqlite", help="the SQLite database the games are written to, in memory only when omitted")
+    parser.add_argument("--flush-interval", type=float, default=1.0, help="seconds between writes to the database")
+    parser.add_argument("--max-games", type=int, default=MAX_GAMES, help="games kept with their state machines")
+    parser.add_argument(
+        "--max-queued-actions", type=int, default=MAX_QUEUED_ACTIONS, help="actions of a game waiting to be handled"
+    )
+    args = parser.parse_args()
+    logging.basicConfig()
+    if args.sqlite:
+        repository: Repository = SQLiteRepository(args.sqlite)
+    else:
+        repository = InMemoryRepository()
+    game_server = GameServer(repository, args.flush_interval, args.max_games, args.max_queued_actions)
+    asyncio.run(game_server.serve(args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+from typing import Generator
+
+import boto3
+import pytest
+from botocore.client import BaseClient
+from botocore.exceptions import EndpointConnectionError, ClientError
+
+DYNAMODB_HOST_PORT = "8000"
+TABLE_NAME = "avalon_test"
+REGION = "us-east-1"
+
+
+@pytest.fixture(scope="session")
+def dynamodb_table() -> Generator[BaseClient, None, None]:
+    # imported here, so the tests not using DynamoDB Local are collected without Docker
+    import docker
+    from tenacity import retry, stop_after_attempt, wait_fixed
+
+    client = docker.from_env()
+    container = client.containers.run(
+        "amazon/dynamodb-local",
+        ports={"8000/tcp": DYNAMODB_HOST_PORT},
+        detach=True,
+        remove=True,
+    )
+
+    @retry(stop=stop_after_attempt(5), wait=wait_fixed(5))
+    def get_dynamodb_client():
+        dynamodb_client = boto3.client(
+            "dynamodb",
+            endpoint_url=f"http://localhost:{DYNAMODB_HOST_PORT}",
+            region_name=REGION,
+        )
+        dynamodb_client.list_tables()
+        return dynamodb_client
+
+    try:
+        get_dynamodb_client()
+        dynamodb = boto3.resource(
+            "dynamodb",
+            region_name=REGION,
+            endpoint_url=f"http://localhost:{DYNAMODB_HOST_PORT}",
+        )
+        table = dynamodb.create_table(
+            TableName=TABLE_NAME,
+            KeySchema=[
+                {"AttributeName": "pk", "KeyType": "HASH"},
+                {"AttributeName": "sk", "KeyType": "RANGE"},
+            ],
+            AttributeDefinitions=[
+                {"AttributeName": "pk", "AttributeType": "S"},
+                {"AttributeName": "sk", "AttributeType": "S"},
+            ],
+            ProvisionedThroughput={"ReadCapacityUnits": 5, "WriteCapacityUnits": 5},
+        )
+        table.wait_until_exists()
+        yield table
+    except EndpointConnectionError as e:
+        pytest.fail(f"DynamoDB is not connected: {e}")
+    except ClientError as e:
+        pytest.fail(f"Unable to create table {TABLE_NAME}: {e}")
+    except Exception as e:
+        pytest.fail(f"An unexpected error occurred: {e}")
+
+    container.stop()
@@ -0,0 +1,78 @@
+import pytest
+
+from aws.dynamodb_codec import serialize_item
+from aws.dynamodb_repository import DynamoDBRepository
+from aws.lambdas.deliver_events import lambda_handler
+from aws.websocket_comm_service import WebSocketCommService
+from game_core.constants.event_type import EventType
+
+GAME_ID = "game_id"
+TABLE_NAME = "table_name"
+AWS_REGION = "us-east-1"
+WEBSOCKET_ENDPOINT = "wss://<API_ID>.execute-api.us-east-1.amazonaws.com/dev"
+EVENT_ID = "01HZY8Q0D3M8J5X5V2B7K9C4TN"
+
+
+@pytest.fixture(autouse=True)
+def os_environ(mocker):
+    mocker.patch.dict('os.environ', {'DYNAMODB_TABLE': TABLE_NAME, 'AWS_REGION': AWS_REGION,
+                                     'WEBSOCKET_ENDPOINT': WEBSOCKET_ENDPOINT})
+
+
+@pytest.fixture
+def repository(mocker):
+    return mocker.MagicMock(spec=DynamoDBRepository)
+
+
+@pytest.fixture(autouse=True)
+def dynamodb_repository_class(mocker, repository):
+    mocker.patch('aws.lambdas.deliver_events.DynamoDBRepository', return_value=repository)
+
+
+@pytest.fixture
+def comm_service(mocker):
+    return mocker.MagicMock(spec=WebSocketCommService)
+
+
+@pytest.fixture(autouse=True)
+def websocket_comm_service_class(mocker, comm_service):
+    return mocker.patch('aws.lambdas.deliver_events.WebSocketCommService', return_value=comm_service)
+
+
+@pytest.fixture
+def event():
+    item = {
+        "pk": GAME_ID,
+        "sk": f"event_{EVENT_ID}",
+        "type": EventType.RoundStarted.value,
+        "recipients": [],
+        "payload": {},
+        "timestamp": "2024-01-01T00:00:00",
+    }
+    return {'Records': [{"eventName": "INSERT", "dynamodb": {"NewImage": serialize_item(item)}}]}
+
+
+def test_lambda_handler(event, comm_service, websocket_comm_service_class):
+    # Given
+    # When
+    lambda_handler(event, None)
+
+    # Then
+    assert websocket_comm_service_class.call_args.kwargs == {"raise_undelivered": True}
+    comm_service.send_batch.assert_called_once()
+    (player_id, delivered_event), = comm_service.send_batch.call_args.args[0]
+    assert player_id is None
+    assert delivered_event.id == f"{GAME_ID}_event_{EVENT_ID}"
+
+
+def test_lambda_handler_raises_for_stream_retry(mocker, event, comm_service):
+    # Given
+    mocker.patch('game_core.outbox.time.sleep')
+    comm_service.send_batch.side_effect = RuntimeError("throttled")
+
+    # When
+    with pytest.raises(RuntimeError):
+        lambda_handler(event, None)
+
+    # Then
+    assert comm_service.send_batch.call_count > 1
@@ -50,7 +50,7 @@ def test_handle_get_events(mocker, event, repository):
     event1.to_dict.return_value = events[0]
     event2 = mocker.MagicMock()
     event2.to_dict.return_value = events[1]
-    repository.get_events.return_value = [event1, event2]
+    repository.iter_events.return_value = iter([event1, event2])
 
     # When
     res = lambda_handler(event, None)
@@ -59,7 +59,58 @@ def test_handle_get_events(mocker, event, repository):
     assert res["body"] == json.dumps(events)
     assert res["statusCode"] == 200
     repository.get_player.assert_called_with(PLAYER_ID)
-    repository.get_events.assert_called_with(GAME_ID, PLAYER_ID)
+    repository.iter_events.assert_called_with(GAME_ID, PLAYER_ID, limit=None, since=None)
+
+
+def test_handle_get_events_with_limit_and_since(mocker, event, repository):
+    # Given
+    player = mocker.MagicMock()
+    player.secret = PLAYER_SECRET
+    repository.get_player.return_value = player
+    repository.iter_events.return_value = iter([])
+    since = f"{GAME_ID}_event_01ARZ3NDEKTSV4RRFFQ69G5FAV"
+    event["queryStringParameters"] = {"limit": "20", "since": since}
+
+    # When
+    res = lambda_handler(event, None)
+
+    # Then
+    assert res["statusCode"] == 200
+    repository.iter_events.assert_called_with(GAME_ID, PLAYER_ID, limit=20, since=since)
+
+
+@pytest.mark.parametrize("limit", ["ten", "-1", "0", "1.5"])
+def test_handle_get_events_with_invalid_limit(mocker, event, repository, limit):
+    # Given
+    player = mocker.MagicMock()
+    player.secret = PLAYER_SECRET
+    repository.get_player.return_value = player
+    event["queryStringParameters"] = {"limit": limit}
+
+    # When
+    res = lambda_handler(event, None)
+
+    # Then
+    assert res["statusCode"] == 400
+    assert res["body"] == json.dumps({"error": "limit must be a positive integer"})
+    repository.iter_events.assert_not_called()
+
+
+@pytest.mark.parametrize("since", ["event_id", "event_01ARZ3NDEKTSV4RRFFQ69G5FA", "event_81ARZ3NDEKTSV4RRFFQ69G5FAV"])
+def test_handle_get_events_with_invalid_since(mocker, event, repository, since):
+    # Given
+    player = mocker.MagicMock()
+    player.secret = PLAYER_SECRET
+    repository.get_player.return_value = player
+    event["queryStringParameters"] = {"since": since}
+
+    # When
+    res = lambda_handler(event, None)
+
+    # Then
+    assert res["statusCode"] == 400
+    assert res["body"] == json.dumps({"error": "since must be the id of an event"})
+    repository.iter_events.assert_not_called()
 
 
 def test_handle_get_events_with_error(mocker, event, repository):
@@ -74,7 +125,7 @@ def test_handle_get_events_with_error(mocker, event, repository):
     assert res["statusCode"] == 500
     assert res["body"] == json.dumps({"error": error_message})
     repository.get_player.assert_called_with(PLAYER_ID)
-    repository.get_events.assert_not_called()
+    repository.iter_events.assert_not_called()
 
 
 def test_handle_get_events_with_missing_path_parameter(event, repository):
@@ -87,4 +138,4 @@ def test_handle_get_events_with_missing_path_parameter(event, repository):
     # Then
     assert res["statusCode"] == 400
     assert res["body"] == json.dumps({"error": "Missing required parameters"})
-    repository.get_events.assert_not_called()
+    repository.iter_events.assert_not_called()
@@ -41,7 +41,7 @@ def comm_service(mocker):
 
 @pytest.fixture(autouse=True)
 def websocket_comm_service_class(mocker, comm_service):
-    mocker.patch('aws.lambdas.join_game.WebSocketCommService', return_value=comm_service)
+    mocker.patch('aws.event_delivery.WebSocketCommService', return_value=comm_service)
 
 
 @pytest.fixture
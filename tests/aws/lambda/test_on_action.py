@@ -5,7 +5,9 @@ import pytest
 
 from game_core.constants.action_type import ActionType
 from game_core.entities.action import Action
-from game_core.state_machine import StateMachine
+from game_core.exceptions import DuplicateVoteError
+from game_core.outbox import OutboxCommService
+from game_core.state_machine_registry import StateMachineRegistry
 from aws.dynamodb_repository import DynamoDBRepository
 from aws.lambdas.on_action import lambda_handler
 from aws.websocket_comm_service import WebSocketCommService
@@ -41,17 +43,17 @@ def comm_service(mocker):
 
 @pytest.fixture(autouse=True)
 def websocket_comm_service_class(mocker, comm_service):
-    mocker.patch('aws.lambdas.on_action.WebSocketCommService', return_value=comm_service)
+    mocker.patch('aws.event_delivery.WebSocketCommService', return_value=comm_service)
 
 
 @pytest.fixture
-def state_machine(mocker):
-    return mocker.MagicMock(spec=StateMachine)
+def registry(mocker):
+    return mocker.MagicMock(spec=StateMachineRegistry)
 
 
 @pytest.fixture(autouse=True)
-def state_machine_class(mocker, state_machine):
-    mocker.patch('aws.lambdas.on_action.StateMachine', return_value=state_machine)
+def get_state_machine_registry(mocker, registry):
+    return mocker.patch('aws.lambdas.on_action.get_state_machine_registry', return_value=registry)
 
 
 @pytest.fixture
@@ -67,19 +69,47 @@ def event():
     }
 
 
-def test_lambda_handler(event, repository, comm_service, state_machine):
+def test_lambda_handler(event, get_state_machine_registry, registry, comm_service):
     # Given
     # When
     res = lambda_handler(event, None)
 
     # Then
     assert res['statusCode'] == 200
-    state_machine.handle_action.assert_called_once_with(
+    get_state_machine_registry.assert_called_once_with(TABLE_NAME, AWS_REGION)
+    registry.handle_action.assert_called_once_with(
         Action(
             id=ANY,
             game_id=GAME_ID,
             player_id=PLAYER_ID,
             type=ActionType.CastRoundVote,
             payload=PAYLOAD,
-        )
+        ),
+        comm_service,
     )
+
+
+def test_lambda_handler_with_duplicate_vote(event, registry):
+    # Given
+    registry.handle_action.side_effect = DuplicateVoteError("Player player_id already voted for quest 1")
+
+    # When
+    res = lambda_handler(event, None)
+
+    # Then
+    assert res['statusCode'] == 409
+    assert json.loads(res['body']) == {"error": "Player player_id already voted for quest 1"}
+
+
+def test_lambda_handler_in_outbox_mode(mocker, event, registry):
+    # Given
+    mocker.patch.dict('os.environ', {'EVENT_DELIVERY': 'outbox'})
+    websocket_comm_service_class = mocker.patch('aws.event_delivery.WebSocketCommService')
+
+    # When
+    res = lambda_handler(event, None)
+
+    # Then
+    assert res['statusCode'] == 200
+    websocket_comm_service_class.assert_not_called()
+    assert isinstance(registry.handle_action.call_args.args[1], OutboxCommService)
@@ -0,0 +1,70 @@
+import pytest
+
+from aws.dynamodb_repository import DynamoDBRepository
+from aws.lambdas.on_disconnect import lambda_handler
+
+GAME_ID = "game_id"
+TABLE_NAME = "table_name"
+AWS_REGION = "us-east-1"
+PLAYER_ID = "player_id"
+CONNECTION_ID = "connection_id"
+
+
+@pytest.fixture(autouse=True)
+def os_environ(mocker):
+    mocker.patch.dict('os.environ', {'DYNAMODB_TABLE': TABLE_NAME, 'AWS_REGION': AWS_REGION})
+
+
+@pytest.fixture
+def repository(mocker):
+    return mocker.MagicMock(spec=DynamoDBRepository)
+
+
+@pytest.fixture(autouse=True)
+def dynamodb_repository_class(mocker, repository):
+    mocker.patch('aws.lambdas.on_disconnect.DynamoDBRepository', return_value=repository)
+
+
+@pytest.fixture
+def event():
+    return {
+        'requestContext': {
+            "connectionId":  CONNECTION_ID,
+        },
+    }
+
+
+def test_lambda_handler(event, repository):
+    # Given
+    repository.get_connection.return_value = (GAME_ID, PLAYER_ID)
+
+    # When
+    res = lambda_handler(event, None)
+
+    # Then
+    assert res['body'] == "Disconnected"
+    assert res['statusCode'] == 200
+    repository.get_connection.assert_called_once_with(CONNECTION_ID)
+    repository.delete_connection_id.assert_called_once_with(GAME_ID, PLAYER_ID, CONNECTION_ID)
+
+
+def test_lambda_handler_with_unknown_connection(event, repository):
+    # Given
+    repository.get_connection.return_value = None
+
+    # When
+    res = lambda_handler(event, None)
+
+    # Then
+    assert res['statusCode'] == 200
+    repository.delete_connection_id.assert_not_called()
+
+
+def test_lambda_handler_without_connection_id(repository):
+    # Given
+    # When
+    res = lambda_handler({'requestContext': {}}, None)
+
+    # Then
+    assert res['statusCode'] == 400
+    repository.get_connection.assert_not_called()
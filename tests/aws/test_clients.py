@@ -0,0 +1,36 @@
+from aws.clients import get_api_gateway_client, get_dynamodb_client, get_dynamodb_resource
+
+REGION = "us-east-1"
+ENDPOINT_URL = "https://apiid.execute-api.us-east-1.amazonaws.com/dev"
+
+
+def test_get_dynamodb_resource_is_reused():
+    # Given
+    # When
+    resource = get_dynamodb_resource(REGION)
+
+    # Then
+    assert get_dynamodb_resource(REGION) is resource
+    assert resource.meta.client.meta.config.retries["mode"] == "adaptive"
+    assert resource.meta.client.meta.config.tcp_keepalive
+
+
+def test_get_api_gateway_client_is_reused(mocker):
+    # Given
+    mocker.patch.dict("os.environ", {"AWS_DEFAULT_REGION": REGION})
+    # When
+    client = get_api_gateway_client(ENDPOINT_URL)
+
+    # Then
+    assert get_api_gateway_client(ENDPOINT_URL) is client
+    assert client.meta.config.retries["mode"] == "adaptive"
+
+
+def test_get_dynamodb_client_is_reused():
+    # Given
+    # When
+    client = get_dynamodb_client(REGION)
+
+    # Then
+    assert get_dynamodb_client(REGION) is client
+    assert client.meta.config.retries["mode"] == "adaptive"
@@ -0,0 +1,94 @@
+from decimal import Decimal
+
+import pytest
+from boto3.dynamodb.types import TypeSerializer
+
+from aws.dynamodb_codec import deserialize, deserialize_item, serialize, serialize_item
+
+GAME_ID = "game_id"
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "value",
+        None,
+        True,
+        7,
+        Decimal("1.5"),
+        [],
+        ["a", 1, None],
+        {"quest_team_size": {"1": "2"}, "roles": ["Merlin"], "nested": {"empty": {}}},
+    ],
+)
+def test_serialize_matches_type_serializer(value):
+    # Given
+    # When
+    res = serialize(value)
+
+    # Then
+    assert res == TypeSerializer().serialize(value)
+    assert deserialize(res) == value
+
+
+def test_serialize_unsupported_type():
+    # Given
+    # When
+    with pytest.raises(TypeError):
+        serialize(1.5)
+
+    # Then
+
+
+def test_deserialize_numbers_to_int():
+    # Given
+    item = {"pk": {"S": GAME_ID}, "sk": {"S": "unknown"}, "count": {"N": "3"}, "ratio": {"N": "0.5"}}
+
+    # When
+    res = deserialize_item(item)
+
+    # Then
+    assert res == {"pk": GAME_ID, "sk": "unknown", "count": 3, "ratio": Decimal("0.5")}
+    assert type(res["count"]) is int
+
+
+def test_deserialize_item_by_schema():
+    # Given
+    item = {
+        "pk": GAME_ID,
+        "sk": "round_1_2",
+        "quest_number": 1,
+        "round_number": 2,
+        "leader_id": "leader_id",
+        "team_member_ids": ["player_id1", "player_id2"],
+        "result": None,
+        "votes_cast": 2,
+        "votes_pass": 1,
+        "votes_fail": 1,
+    }
+
+    # When
+    res = deserialize_item(serialize_item(item))
+
+    # Then
+    assert res == item
+
+
+def test_deserialize_game_item():
+    # Given
+    item = {
+        "pk": GAME_ID,
+        "sk": "game",
+        "status": "InProgress",
+        "state": "TeamSelection",
+        "config": {"quest_team_size": {"1": "2"}, "roles": ["Merlin"], "known_roles": {}, "assassination_attempts": 1},
+        "player_ids": ["player_id1"],
+        "assassination_attempts": 1,
+        "version": 3,
+    }
+
+    # When
+    res = deserialize_item(serialize_item(item))
+
+    # Then
+    assert res == item
@@ -1,14 +1,9 @@
 import uuid
-from typing import Generator
 
-import boto3
-import docker
 import pytest
-from botocore.client import BaseClient
-from botocore.exceptions import EndpointConnectionError, ClientError
-from tenacity import retry, stop_after_attempt, wait_fixed
 
 from aws.dynamodb_repository import DynamoDBRepository
+from aws.ulid import min_ulid
 from game_core.constants.config import DEFAULT_QUEST_TEAM_SIZE, DEFAULT_TEAM_SIZE_ROLES, KNOWN_ROLES
 from game_core.constants.event_type import EventType
 from game_core.constants.game_status import GameStatus
@@ -16,67 +11,14 @@ from game_core.constants.role import Role
 from game_core.constants.state_name import StateName
 from game_core.constants.vote_result import VoteResult
 from game_core.entities.game import GameConfig
+from game_core.exceptions import ConcurrentModificationError, DuplicateVoteError
+from tests.aws.conftest import DYNAMODB_HOST_PORT, REGION, TABLE_NAME
 
-DYNAMODB_HOST_PORT = "8000"
-TABLE_NAME = "avalon_test"
-REGION = "us-east-1"
 
-
-@pytest.fixture(scope="session")
-def dynamodb_table() -> Generator[BaseClient, None, None]:
-    client = docker.from_env()
-    container = client.containers.run(
-        "amazon/dynamodb-local",
-        ports={"8000/tcp": DYNAMODB_HOST_PORT},
-        detach=True,
-        remove=True,
-    )
-
-    @retry(stop=stop_after_attempt(5), wait=wait_fixed(5))
-    def get_dynamodb_client():
-        dynamodb_client = boto3.client(
-            "dynamodb",
-            endpoint_url=f"http://localhost:{DYNAMODB_HOST_PORT}",
-            region_name=REGION,
-        )
-        dynamodb_client.list_tables()
-        return dynamodb_client
-
-    try:
-        get_dynamodb_client()
-        dynamodb = boto3.resource(
-            "dynamodb",
-            region_name=REGION,
-            endpoint_url=f"http://localhost:{DYNAMODB_HOST_PORT}",
-        )
-        table = dynamodb.create_table(
-            TableName=TABLE_NAME,
-            KeySchema=[
-                {"AttributeName": "pk", "KeyType": "HASH"},
-                {"AttributeName": "sk", "KeyType": "RANGE"},
-            ],
-            AttributeDefinitions=[
-                {"AttributeName": "pk", "AttributeType": "S"},
-                {"AttributeName": "sk", "AttributeType": "S"},
-            ],
-            ProvisionedThroughput={"ReadCapacityUnits": 5, "WriteCapacityUnits": 5},
-        )
-        table.wait_until_exists()
-        yield table
-    except EndpointConnectionError as e:
-        pytest.fail(f"DynamoDB is not connected: {e}")
-    except ClientError as e:
-        pytest.fail(f"Unable to create table {TABLE_NAME}: {e}")
-    except Exception as e:
-        pytest.fail(f"An unexpected error occurred: {e}")
-
-    container.stop()
-
-
-@pytest.fixture
-def dynamodb_repository():
+@pytest.fixture(params=[False, True], ids=["resource", "low_level_client"])
+def dynamodb_repository(request):
     return DynamoDBRepository(
-        TABLE_NAME, REGION, endpoint_url=f"http://localhost:{DYNAMODB_HOST_PORT}"
+        TABLE_NAME, REGION, endpoint_url=f"http://localhost:{DYNAMODB_HOST_PORT}", low_level_client=request.param
     )
 
 
@@ -200,9 +142,8 @@ def test_update_game(dynamodb_repository, dynamodb_table):
 
 def test_put_event(mocker, dynamodb_repository, dynamodb_table):
     # Given
-    event_id = "eventId"
-    mock_uuid = mocker.patch("aws.dynamodb_repository.uuid")
-    mock_uuid.uuid4.return_value.hex = event_id
+    event_id = "01ARZ3NDEKTSV4RRFFQ69G5FAV"
+    mocker.patch("aws.dynamodb_repository.new_ulid", return_value=event_id)
     game_id = uuid.uuid4().hex
     event_type = EventType.GameStarted
     recipients = ["player_id1"]
@@ -217,16 +158,17 @@ def test_put_event(mocker, dynamodb_repository, dynamodb_table):
     # Then
     res = dynamodb_table.get_item(
         TableName=TABLE_NAME,
-        Key={"pk": game_id, "sk": f"event_{event_id}"},
+        Key={"pk": game_id, "sk": f"private_event_{recipients[0]}_{event_id}"},
     )
     actual_event = res["Item"]
-    assert actual_event["sk"].split("_")[1] == event_id, actual_event["sk"]
+    assert actual_event["sk"].rsplit("_", 1)[1] == event_id, actual_event["sk"]
     assert actual_event["pk"] == game_id
     assert actual_event["type"] == event_type.value
     assert actual_event["recipients"] == recipients
     assert actual_event["payload"] == payload
     assert actual_event["timestamp"] == timestamp
-    assert event.id == event_id
+    assert event.id == f"{game_id}_private_event_{recipients[0]}_{event_id}"
+    assert event.id == dynamodb_repository.get_events(game_id, recipients[0])[0].id
     assert event.game_id == game_id
     assert event.type == event_type
     assert event.recipients == recipients
@@ -559,6 +501,7 @@ def test_put_quest_vote(dynamodb_repository, dynamodb_table):
     quest_number = 1
     player_id = "player_id1"
     is_approved = True
+    dynamodb_repository.put_quest(game_id, quest_number)
 
     # When
     vote = dynamodb_repository.put_quest_vote(
@@ -568,16 +511,10 @@ def test_put_quest_vote(dynamodb_repository, dynamodb_table):
     # Then
     res = dynamodb_table.get_item(
         TableName=TABLE_NAME,
-        Key={"pk": game_id, "sk": f"vote_quest_{quest_number}_{player_id}"},
-    )
-    actual_vote = res["Item"]
-    assert actual_vote["pk"] == game_id
-    assert actual_vote["sk"] == f"vote_quest_{quest_number}_{player_id}"
-    assert actual_vote["player_id"] == player_id
-    assert actual_vote["quest_number"] == quest_number
-    assert actual_vote["result"] == (
-        VoteResult.Pass.value if is_approved else VoteResult.Fail.value
+        Key={"pk": game_id, "sk": f"quest_{quest_number}"},
     )
+    assert res["Item"]["votes"] == {player_id: VoteResult.Pass.value}
+    assert "Item" not in dynamodb_table.get_item(Key={"pk": game_id, "sk": f"vote_quest_{quest_number}_{player_id}"})
     assert vote.id == f"{game_id}_vote_quest_{quest_number}_{player_id}"
     assert vote.game_id == game_id
     assert vote.quest_number == quest_number
@@ -590,24 +527,17 @@ def test_get_quest_votes(dynamodb_repository, dynamodb_table):
     game_id = uuid.uuid4().hex
     quest_number = 1
     player_ids = ["player_id1", "player_id2", "player_id3"]
-    items = [
-        {
-            "pk": game_id,
-            "sk": f"vote_quest_{quest_number}_{player_id}",
-            "player_id": player_id,
-            "quest_number": quest_number,
-            "result": (VoteResult.Pass.value if i % 2 == 0 else VoteResult.Fail.value),
-        }
-        for i, player_id in enumerate(player_ids)
-    ]
-    items.append(
-        {
-            "pk": game_id,
-            "sk": "game",
-        }
-    )
-    for item in items:
-        dynamodb_table.put_item(Item=item)
+    item = {
+        "pk": game_id,
+        "sk": f"quest_{quest_number}",
+        "quest_number": quest_number,
+        "team_member_ids": player_ids,
+        "votes": {
+            player_id: (VoteResult.Pass.value if i % 2 == 0 else VoteResult.Fail.value)
+            for i, player_id in enumerate(player_ids)
+        },
+    }
+    dynamodb_table.put_item(Item=item)
 
     # When
     votes = dynamodb_repository.get_quest_votes(game_id, quest_number)
@@ -785,25 +715,19 @@ def test_get_round_votes(dynamodb_repository, dynamodb_table):
     quest_number = 2
     round_number = 3
     player_ids = ["player_id1", "player_id2", "player_id3"]
-    items = [
-        {
-            "pk": game_id,
-            "sk": f"vote_round_{quest_number}_{round_number}_{player_id}",
-            "quest_number": quest_number,
-            "round_number": round_number,
-            "player_id": player_id,
-            "result": (VoteResult.Pass.value if i % 2 == 0 else VoteResult.Fail.value),
-        }
-        for i, player_id in enumerate(player_ids)
-    ]
-    items.append(
-        {
-            "pk": game_id,
-            "sk": "game",
-        }
-    )
-    for item in items:
-        dynamodb_table.put_item(Item=item)
+    item = {
+        "pk": game_id,
+        "sk": f"round_{quest_number}_{round_number}",
+        "quest_number": quest_number,
+        "round_number": round_number,
+        "leader_id": "player_id1",
+        "team_member_ids": [],
+        "votes": {
+            player_id: (VoteResult.Pass.value if i % 2 == 0 else VoteResult.Fail.value)
+            for i, player_id in enumerate(player_ids)
+        },
+    }
+    dynamodb_table.put_item(Item=item)
 
     # When
     votes = dynamodb_repository.get_round_votes(game_id, quest_number, round_number)
@@ -830,6 +754,7 @@ def test_put_round_vote(dynamodb_repository, dynamodb_table):
     round_number = 3
     player_id = "player_id1"
     result = VoteResult.Fail
+    dynamodb_repository.put_round(game_id, quest_number, round_number, player_id)
 
     # When
     vote = dynamodb_repository.put_round_vote(
@@ -839,18 +764,9 @@ def test_put_round_vote(dynamodb_repository, dynamodb_table):
     # Then
     res = dynamodb_table.get_item(
         TableName=TABLE_NAME,
-        Key={
-            "pk": game_id,
-            "sk": f"vote_round_{quest_number}_{round_number}_{player_id}",
-        },
+        Key={"pk": game_id, "sk": f"round_{quest_number}_{round_number}"},
     )
-    actual_vote = res["Item"]
-    assert actual_vote["pk"] == game_id
-    assert actual_vote["sk"] == f"vote_round_{quest_number}_{round_number}_{player_id}"
-    assert actual_vote["player_id"] == player_id
-    assert actual_vote["quest_number"] == quest_number
-    assert actual_vote["round_number"] == round_number
-    assert actual_vote["result"] == result.value
+    assert res["Item"]["votes"] == {player_id: result.value}
     assert vote.id == f"{game_id}_vote_round_{quest_number}_{round_number}_{player_id}"
     assert vote.game_id == game_id
     assert vote.quest_number == quest_number
@@ -859,11 +775,14 @@ def test_put_round_vote(dynamodb_repository, dynamodb_table):
     assert vote.result == result
 
 
-def test_put_connection_id(dynamodb_repository, dynamodb_table):
+def test_put_connection_id(mocker, dynamodb_repository, dynamodb_table):
     # Given
     game_id = uuid.uuid4().hex
     player_id = "player_id1"
     connection_id = "connection_id1"
+    transact_write_items = mocker.patch.object(
+        dynamodb_repository, "_transact_write_items", wraps=dynamodb_repository._transact_write_items
+    )
 
     # When
     dynamodb_repository.put_connection_id(game_id, player_id, connection_id)
@@ -877,6 +796,48 @@ def test_put_connection_id(dynamodb_repository, dynamodb_table):
     assert actual_connection["pk"] == game_id
     assert actual_connection["sk"] == f"connection_id_{player_id}"
     assert actual_connection["connection_id"] == connection_id
+    assert dynamodb_repository.get_connection(connection_id) == (game_id, player_id)
+    transact_write_items.assert_called_once()
+
+
+def test_get_connection_not_found(dynamodb_repository):
+    # Given
+    # When
+    connection = dynamodb_repository.get_connection(uuid.uuid4().hex)
+
+    # Then
+    assert connection is None
+
+
+def test_delete_connection_id(dynamodb_repository):
+    # Given
+    game_id = uuid.uuid4().hex
+    connection_id = uuid.uuid4().hex
+    dynamodb_repository.put_connection_id(game_id, "player_id1", connection_id)
+    dynamodb_repository.put_connection_id(game_id, "player_id2", uuid.uuid4().hex)
+
+    # When
+    dynamodb_repository.delete_connection_id(game_id, "player_id1", connection_id)
+
+    # Then
+    assert list(dynamodb_repository.get_player_connection_ids(game_id)) == ["player_id2"]
+    assert dynamodb_repository.get_connection(connection_id) is None
+
+
+def test_delete_connection_id_after_reconnect(dynamodb_repository):
+    # Given
+    game_id = uuid.uuid4().hex
+    old_connection_id = uuid.uuid4().hex
+    new_connection_id = uuid.uuid4().hex
+    dynamodb_repository.put_connection_id(game_id, "player_id1", old_connection_id)
+    dynamodb_repository.put_connection_id(game_id, "player_id1", new_connection_id)
+
+    # When
+    dynamodb_repository.delete_connection_id(game_id, "player_id1", old_connection_id)
+
+    # Then
+    assert dynamodb_repository.get_player_connection_ids(game_id) == {"player_id1": new_connection_id}
+    assert dynamodb_repository.get_connection(old_connection_id) is None
 
 
 def test_get_connection_id(dynamodb_repository, dynamodb_table):
@@ -926,3 +887,520 @@ def test_get_connection_ids(dynamodb_repository, dynamodb_table):
 
     # Then
     assert set(actual_connection_ids) == set(connection_ids)
+
+
+def test_get_player_connection_ids(dynamodb_repository, dynamodb_table):
+    # Given
+    game_id = uuid.uuid4().hex
+    dynamodb_table.put_item(Item={"pk": game_id, "sk": "game"})
+    for player_id, connection_id in [("player_id1", "connection_id1"), ("player_id2", "connection_id2")]:
+        dynamodb_repository.put_connection_id(game_id, player_id, connection_id)
+
+    # When
+    actual_connection_ids = dynamodb_repository.get_player_connection_ids(game_id)
+
+    # Then
+    assert actual_connection_ids == {"player_id1": "connection_id1", "player_id2": "connection_id2"}
+
+
+def test_get_game_snapshot(dynamodb_repository, dynamodb_table):
+    # Given
+    game_id = uuid.uuid4().hex
+    player_id = "player_id1"
+    items = [
+        {
+            "pk": game_id,
+            "sk": "game",
+            "status": GameStatus.InProgress.value,
+            "state": StateName.RoundVoting.value,
+            "config": None,
+            "player_ids": [player_id],
+        },
+        {
+            "pk": game_id,
+            "sk": f"player_{player_id}",
+            "name": "player 1",
+            "secret": uuid.uuid4().hex,
+            "role": Role.Merlin.value,
+            "known_player_ids": [],
+        },
+        {
+            "pk": game_id,
+            "sk": "quest_1",
+            "quest_number": 1,
+            "result": None,
+            "team_member_ids": [player_id],
+            "votes": {player_id: VoteResult.Fail.value},
+        },
+        {
+            "pk": game_id,
+            "sk": "round_1_1",
+            "quest_number": 1,
+            "round_number": 1,
+            "leader_id": player_id,
+            "team_member_ids": [player_id],
+            "votes": {player_id: VoteResult.Pass.value},
+        },
+        {
+            "pk": game_id,
+            "sk": f"connection_id_{player_id}",
+            "connection_id": "connection_id1",
+        },
+        {
+            "pk": game_id,
+            "sk": f"event_{uuid.uuid4().hex}",
+            "type": EventType.GameStarted.value,
+            "recipients": [],
+            "payload": {},
+            "timestamp": "2021-09-01T00:00:00Z",
+        },
+    ]
+    for item in items:
+        dynamodb_table.put_item(Item=item)
+
+    # When
+    snapshot = dynamodb_repository.get_game_snapshot(game_id)
+
+    # Then
+    assert snapshot.game.id == game_id
+    assert snapshot.game.state == StateName.RoundVoting
+    assert [p.id for p in snapshot.players] == [f"{game_id}_player_{player_id}"]
+    assert [q.quest_number for q in snapshot.quests] == [1]
+    assert [(r.quest_number, r.round_number) for r in snapshot.rounds] == [(1, 1)]
+    assert [rv.result for rv in snapshot.round_votes] == [VoteResult.Pass]
+    assert [qv.result for qv in snapshot.quest_votes] == [VoteResult.Fail]
+    assert snapshot.connection_ids == {player_id: "connection_id1"}
+
+
+def test_get_game_snapshot_does_not_read_events(mocker, dynamodb_repository, dynamodb_table):
+    # Given
+    game_id = uuid.uuid4().hex
+    dynamodb_table.put_item(
+        Item={
+            "pk": game_id,
+            "sk": "game",
+            "status": GameStatus.InProgress.value,
+            "state": StateName.RoundVoting.value,
+            "player_ids": [],
+        }
+    )
+    dynamodb_repository.put_player("player_id1", game_id, "player 1", "secret")
+    dynamodb_repository.put_quest(game_id, 1)
+    dynamodb_repository.put_event(game_id, EventType.GameStarted, [], {}, "2021-09-01T00:00:00Z")
+    dynamodb_repository.put_event(game_id, EventType.GameStarted, ["player_id1"], {}, "2021-09-01T00:00:00Z")
+    query = mocker.spy(dynamodb_repository._table, "query")
+
+    # When
+    snapshot = dynamodb_repository.get_game_snapshot(game_id)
+
+    # Then
+    assert [p.name for p in snapshot.players] == ["player 1"]
+    assert [q.quest_number for q in snapshot.quests] == [1]
+    read_sks = [item["sk"] for response in query.spy_return_list for item in response["Items"]]
+    assert read_sks == ["game", "player_player_id1", "quest_1"]
+    assert sum(response["ScannedCount"] for response in query.spy_return_list) == 3
+
+
+def test_get_game_snapshot_not_found(dynamodb_repository, dynamodb_table):
+    # Given
+    game_id = uuid.uuid4().hex
+
+    # When
+    with pytest.raises(ValueError):
+        dynamodb_repository.get_game_snapshot(game_id)
+
+
+def test_unit_of_work(dynamodb_repository, dynamodb_table):
+    # Given
+    game_id = uuid.uuid4().hex
+    dynamodb_table.put_item(
+        Item={
+            "pk": game_id,
+            "sk": "game",
+            "status": GameStatus.NotStarted.value,
+            "state": StateName.GameSetup.value,
+            "config": None,
+            "player_ids": [],
+        }
+    )
+
+    # When
+    with dynamodb_repository.unit_of_work():
+        game = dynamodb_repository.get_game(game_id)
+        game.state = StateName.TeamSelection
+        dynamodb_repository.update_game(game)
+        dynamodb_repository.put_quest(game_id, 1)
+        game_round = dynamodb_repository.put_round(game_id, 1, 1, "player_id1")
+        game_round.team_member_ids = ["player_id1"]
+        dynamodb_repository.update_round(game_round)
+
+        # Then
+        assert "Item" not in dynamodb_table.get_item(Key={"pk": game_id, "sk": "quest_1"})
+        assert dynamodb_repository.get_game(game_id).state == StateName.TeamSelection
+        assert [q.quest_number for q in dynamodb_repository.get_quests(game_id)] == [1]
+        assert dynamodb_repository.get_round(game_id, 1, 1).team_member_ids == ["player_id1"]
+
+    game_item = dynamodb_table.get_item(Key={"pk": game_id, "sk": "game"})["Item"]
+    assert game_item["state"] == StateName.TeamSelection.value
+    assert "Item" in dynamodb_table.get_item(Key={"pk": game_id, "sk": "quest_1"})
+    round_item = dynamodb_table.get_item(Key={"pk": game_id, "sk": "round_1_1"})["Item"]
+    assert round_item["team_member_ids"] == ["player_id1"]
+    assert round_item["leader_id"] == "player_id1"
+
+
+def test_unit_of_work_discards_writes_on_error(dynamodb_repository, dynamodb_table):
+    # Given
+    game_id = uuid.uuid4().hex
+
+    # When
+    with pytest.raises(RuntimeError):
+        with dynamodb_repository.unit_of_work():
+            dynamodb_repository.put_quest(game_id, 1)
+            dynamodb_repository.put_round(game_id, 1, 1, "player_id1")
+            raise RuntimeError("action failed")
+
+    # Then
+    assert "Item" not in dynamodb_table.get_item(Key={"pk": game_id, "sk": "quest_1"})
+    assert "Item" not in dynamodb_table.get_item(Key={"pk": game_id, "sk": "round_1_1"})
+
+
+def test_iter_events_follows_pages(dynamodb_repository, dynamodb_table):
+    # Given
+    game_id = uuid.uuid4().hex
+    player_id = "player_id1"
+    for i in range(5):
+        dynamodb_table.put_item(
+            Item={
+                "pk": game_id,
+                "sk": f"event_{i}",
+                "type": EventType.PlayerJoined.value,
+                "recipients": [] if i != 2 else ["not_matched_player_id"],
+                "payload": {},
+                "timestamp": f"2021-09-01T00:00:0{i}Z",
+            }
+        )
+
+    # When
+    events = list(dynamodb_repository.iter_events(game_id, player_id, page_size=2))
+    limited_events = list(dynamodb_repository.iter_events(game_id, player_id, limit=2))
+
+    # Then
+    assert [e.id for e in events] == [f"{game_id}_event_{i}" for i in [0, 1, 3, 4]]
+    assert [e.id for e in limited_events] == [f"{game_id}_event_{i}" for i in [0, 1]]
+
+
+def test_iter_players_with_limit(dynamodb_repository, dynamodb_table):
+    # Given
+    game_id = uuid.uuid4().hex
+    for i in range(3):
+        dynamodb_table.put_item(
+            Item={"pk": game_id, "sk": f"player_player_id{i}", "name": f"player {i}", "secret": "secret"}
+        )
+
+    # When
+    players = list(dynamodb_repository.iter_players(game_id, limit=2, page_size=1))
+
+    # Then
+    assert [p.id for p in players] == [f"{game_id}_player_player_id{i}" for i in range(2)]
+
+
+def _ulids(*seconds: int) -> list[str]:
+    # ids further apart than the since window
+    return [min_ulid(1_600_000_000_000 + second * 1000) for second in seconds]
+
+
+def test_get_events_since(mocker, dynamodb_repository, dynamodb_table):
+    # Given
+    mocker.patch("aws.dynamodb_repository.new_ulid", side_effect=_ulids(0, 10, 20, 30))
+    game_id = uuid.uuid4().hex
+    player_id = "player_id1"
+    events = [
+        dynamodb_repository.put_event(
+            game_id, EventType.PlayerJoined, [], {"index": i}, f"2021-09-01T00:00:0{i}Z"
+        )
+        for i in range(4)
+    ]
+
+    # When
+    all_events = dynamodb_repository.get_events(game_id, player_id)
+    new_events = dynamodb_repository.get_events(game_id, player_id, since=events[1].id)
+    new_events_by_sk_id = dynamodb_repository.get_events(game_id, player_id, since=all_events[2].id)
+
+    # Then
+    assert [e.payload["index"] for e in all_events] == [0, 1, 2, 3]
+    assert [e.payload["index"] for e in new_events] == [2, 3]
+    assert [e.payload["index"] for e in new_events_by_sk_id] == [3]
+
+
+def test_put_public_event(mocker, dynamodb_repository, dynamodb_table):
+    # Given
+    event_id = "01ARZ3NDEKTSV4RRFFQ69G5FAV"
+    mocker.patch("aws.dynamodb_repository.new_ulid", return_value=event_id)
+    game_id = uuid.uuid4().hex
+
+    # When
+    dynamodb_repository.put_event(game_id, EventType.PlayerJoined, [], {}, "2021-09-01T00:00:00Z")
+
+    # Then
+    items = dynamodb_table.query(
+        KeyConditionExpression="pk = :pk", ExpressionAttributeValues={":pk": game_id}
+    )["Items"]
+    assert [item["sk"] for item in items] == [f"event_{event_id}"]
+
+
+def test_get_events_merges_private_events(mocker, dynamodb_repository, dynamodb_table):
+    # Given
+    mocker.patch("aws.dynamodb_repository.new_ulid", side_effect=_ulids(0, 10, 20, 30, 40))
+    game_id = uuid.uuid4().hex
+    player_id = f"{game_id}_player_player_id1"
+    other_player_id = f"{game_id}_player_player_id2"
+    put_event = dynamodb_repository.put_event
+    put_event(game_id, EventType.PlayerJoined, [], {"index": 0}, "2021-09-01T00:00:00Z")
+    put_event(game_id, EventType.GameStarted, [player_id], {"index": 1}, "2021-09-01T00:00:01Z")
+    put_event(game_id, EventType.GameStarted, [other_player_id], {"index": 2}, "2021-09-01T00:00:02Z")
+    put_event(game_id, EventType.RoundStarted, [], {"index": 3}, "2021-09-01T00:00:03Z")
+    put_event(
+        game_id, EventType.QuestVoteRequested, [player_id, other_player_id], {"index": 4}, "2021-09-01T00:00:04Z"
+    )
+
+    # When
+    events = dynamodb_repository.get_events(game_id, player_id)
+    other_events = dynamodb_repository.get_events(game_id, other_player_id)
+    new_events = dynamodb_repository.get_events(game_id, player_id, since=events[1].id)
+
+    # Then
+    assert [e.payload["index"] for e in events] == [0, 1, 3, 4]
+    assert [e.payload["index"] for e in other_events] == [0, 2, 3, 4]
+    assert [e.payload["index"] for e in new_events] == [3, 4]
+
+
+def test_get_events_since_returns_events_within_window(mocker, dynamodb_table):
+    # Given
+    repository = DynamoDBRepository(
+        TABLE_NAME, REGION, endpoint_url=f"http://localhost:{DYNAMODB_HOST_PORT}", since_window_ms=1000
+    )
+    # the third event is created by a process whose clock is half a second behind
+    mocker.patch("aws.dynamodb_repository.new_ulid", side_effect=_ulids(0, 10) + [min_ulid(1_600_000_009_500)])
+    game_id = uuid.uuid4().hex
+    player_id = "player_id1"
+    events = [
+        repository.put_event(game_id, EventType.PlayerJoined, [], {"index": i}, "2021-09-01T00:00:00Z")
+        for i in range(3)
+    ]
+
+    # When
+    new_events = repository.get_events(game_id, player_id, since=events[1].id)
+
+    # Then
+    assert [e.payload["index"] for e in new_events] == [2]
+
+
+def test_put_round_vote_counts_vote_on_round(dynamodb_repository, dynamodb_table):
+    # Given
+    game_id = uuid.uuid4().hex
+    dynamodb_repository.put_round(game_id, 1, 1, "player_id1")
+
+    # When
+    dynamodb_repository.put_round_vote(game_id, 1, 1, "player_id1", VoteResult.Pass)
+    dynamodb_repository.put_round_vote(game_id, 1, 1, "player_id2", VoteResult.Fail)
+    dynamodb_repository.put_round_vote(game_id, 1, 1, "player_id3", VoteResult.Pass)
+
+    # Then
+    game_round = dynamodb_repository.get_round(game_id, 1, 1)
+    assert game_round.votes_cast == 3
+    assert game_round.votes_pass == 2
+    assert game_round.votes_fail == 1
+
+
+def test_put_quest_vote_counts_vote_in_unit_of_work(dynamodb_repository, dynamodb_table):
+    # Given
+    game_id = uuid.uuid4().hex
+    dynamodb_repository.put_quest(game_id, 1)
+
+    # When
+    with dynamodb_repository.unit_of_work():
+        dynamodb_repository.put_quest_vote(game_id, 1, "player_id1", True)
+        dynamodb_repository.put_quest_vote(game_id, 1, "player_id2", False)
+        quest = dynamodb_repository.get_quest(game_id, 1)
+        quest.team_member_ids = ["player_id1", "player_id2"]
+        dynamodb_repository.update_quest(quest)
+
+        # Then
+        assert dynamodb_table.get_item(Key={"pk": game_id, "sk": "quest_1"})["Item"]["votes"] == {}
+        assert dynamodb_repository.get_quest(game_id, 1).votes_cast == 2
+        assert [v.player_id for v in dynamodb_repository.get_quest_votes(game_id, 1)] == ["player_id1", "player_id2"]
+
+    quest_item = dynamodb_table.get_item(Key={"pk": game_id, "sk": "quest_1"})["Item"]
+    assert quest_item["votes_cast"] == 2
+    assert quest_item["votes_pass"] == 1
+    assert quest_item["votes_fail"] == 1
+    assert quest_item["team_member_ids"] == ["player_id1", "player_id2"]
+
+
+def test_put_round_vote_counts_vote_on_buffered_round(dynamodb_repository, dynamodb_table):
+    # Given
+    game_id = uuid.uuid4().hex
+
+    # When
+    with dynamodb_repository.unit_of_work():
+        dynamodb_repository.put_round(game_id, 1, 1, "player_id1")
+        dynamodb_repository.put_round_vote(game_id, 1, 1, "player_id1", VoteResult.Fail)
+
+    # Then
+    round_item = dynamodb_table.get_item(Key={"pk": game_id, "sk": "round_1_1"})["Item"]
+    assert round_item["votes"] == {"player_id1": VoteResult.Fail.value}
+    assert round_item["votes_cast"] == 1
+    assert round_item["votes_pass"] == 0
+    assert round_item["votes_fail"] == 1
+
+
+def test_put_round_vote_twice(dynamodb_repository, dynamodb_table):
+    # Given
+    game_id = uuid.uuid4().hex
+    dynamodb_repository.put_round(game_id, 1, 1, "player_id1")
+    dynamodb_repository.put_round_vote(game_id, 1, 1, "player_id1", VoteResult.Pass)
+
+    # When
+    with pytest.raises(DuplicateVoteError):
+        dynamodb_repository.put_round_vote(game_id, 1, 1, "player_id1", VoteResult.Fail)
+
+    # Then
+    round_item = dynamodb_table.get_item(Key={"pk": game_id, "sk": "round_1_1"})["Item"]
+    assert round_item["votes"] == {"player_id1": VoteResult.Pass.value}
+    assert dynamodb_repository.get_round(game_id, 1, 1).votes_cast == 1
+
+
+def test_put_quest_vote_twice_in_unit_of_work(dynamodb_repository, dynamodb_table):
+    # Given
+    game_id = uuid.uuid4().hex
+    dynamodb_repository.put_quest(game_id, 1)
+    dynamodb_repository.put_quest_vote(game_id, 1, "player_id1", True)
+
+    # When
+    with pytest.raises(DuplicateVoteError):
+        with dynamodb_repository.unit_of_work():
+            dynamodb_repository.put_quest_vote(game_id, 1, "player_id2", True)
+            dynamodb_repository.put_quest_vote(game_id, 1, "player_id1", False)
+
+    # Then
+    assert [v.player_id for v in dynamodb_repository.get_quest_votes(game_id, 1)] == ["player_id1"]
+    assert dynamodb_repository.get_quest(game_id, 1).votes_cast == 1
+
+
+def test_put_quest_vote_stored_by_another_writer(dynamodb_repository, dynamodb_table):
+    # Given
+    game_id = uuid.uuid4().hex
+    dynamodb_repository.put_quest(game_id, 1)
+
+    # When
+    with pytest.raises(DuplicateVoteError):
+        with dynamodb_repository.unit_of_work():
+            dynamodb_repository.put_quest_vote(game_id, 1, "player_id1", True)
+            dynamodb_table.update_item(
+                Key={"pk": game_id, "sk": "quest_1"},
+                UpdateExpression="SET votes.player_id1 = :result",
+                ExpressionAttributeValues={":result": VoteResult.Fail.value},
+            )
+
+    # Then
+    quest_item = dynamodb_table.get_item(Key={"pk": game_id, "sk": "quest_1"})["Item"]
+    assert quest_item["votes"] == {"player_id1": VoteResult.Fail.value}
+    assert dynamodb_repository.get_quest(game_id, 1).votes_cast == 0
+
+
+def test_update_players_in_one_request(mocker, dynamodb_repository, dynamodb_table):
+    # Given
+    game_id = uuid.uuid4().hex
+    players = [dynamodb_repository.put_player(f"player_id{i}", game_id, f"name{i}", "secret") for i in range(10)]
+    for player in players:
+        player.role = Role.Villager
+    transact_write_items = mocker.patch.object(
+        dynamodb_repository, "_transact_write_items", wraps=dynamodb_repository._transact_write_items
+    )
+
+    # When
+    dynamodb_repository.update_players(players)
+    dynamodb_repository.put_events(
+        game_id, [(EventType.GameStarted, [player.id], {}) for player in players], "2021-09-01T00:00:00Z"
+    )
+
+    # Then
+    assert transact_write_items.call_count == 2
+    assert [player.role for player in dynamodb_repository.get_players(game_id)] == [Role.Villager] * 10
+    assert len(dynamodb_repository.get_events(game_id, players[0].id)) == 1
+
+
+def test_update_game_current_pointers(dynamodb_repository, dynamodb_table):
+    # Given
+    game = dynamodb_repository.put_game()
+    game.current_quest_number = 2
+    game.current_round_number = 7
+    game.leader_index = 0
+
+    # When
+    dynamodb_repository.update_game(game)
+
+    # Then
+    game_item = dynamodb_table.get_item(Key={"pk": game.id, "sk": "game"})["Item"]
+    assert (game_item["current_quest_number"], game_item["current_round_number"], game_item["leader_index"]) == (2, 7, 0)
+    assert dynamodb_repository.get_game(game.id) == game
+
+
+def test_update_game_increments_version(dynamodb_repository, dynamodb_table):
+    # Given
+    game = dynamodb_repository.put_game()
+
+    # When
+    game.state = StateName.TeamSelection
+    dynamodb_repository.update_game(game)
+    with dynamodb_repository.unit_of_work():
+        dynamodb_repository.update_game(game)
+        dynamodb_repository.update_game(game)
+
+    # Then
+    game_item = dynamodb_table.get_item(Key={"pk": game.id, "sk": "game"})["Item"]
+    assert game_item["version"] == 3
+    assert game.version == 3
+    assert dynamodb_repository.get_game(game.id).version == 3
+
+
+def test_update_game_with_stale_version(dynamodb_repository, dynamodb_table):
+    # Given
+    game = dynamodb_repository.put_game()
+    stale_game = dynamodb_repository.get_game(game.id)
+    dynamodb_repository.update_game(game)
+
+    # When
+    with pytest.raises(ConcurrentModificationError):
+        with dynamodb_repository.unit_of_work():
+            dynamodb_repository.put_quest(game.id, 1)
+            stale_game.state = StateName.TeamSelection
+            dynamodb_repository.update_game(stale_game)
+
+    # Then
+    game_item = dynamodb_table.get_item(Key={"pk": game.id, "sk": "game"})["Item"]
+    assert game_item["state"] == StateName.GameSetup.value
+    assert game_item["version"] == 1
+    assert "Item" not in dynamodb_table.get_item(Key={"pk": game.id, "sk": "quest_1"})
+
+
+def test_update_game_without_version(dynamodb_repository, dynamodb_table):
+    # Given
+    game_id = uuid.uuid4().hex
+    dynamodb_table.put_item(
+        Item={
+            "pk": game_id,
+            "sk": "game",
+            "status": GameStatus.NotStarted.value,
+            "state": StateName.GameSetup.value,
+            "config": None,
+            "player_ids": [],
+        }
+    )
+    game = dynamodb_repository.get_game(game_id)
+
+    # When
+    dynamodb_repository.update_game(game)
+
+    # Then
+    assert dynamodb_repository.get_game(game_id).version == 1
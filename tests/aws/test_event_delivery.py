@@ -0,0 +1,29 @@
+from aws.dynamodb_repository import DynamoDBRepository
+from aws.event_delivery import create_comm_service
+from game_core.outbox import OutboxCommService
+
+WEBSOCKET_ENDPOINT = "wss://<API_ID>.execute-api.us-east-1.amazonaws.com/dev"
+
+
+def test_create_comm_service(mocker):
+    # Given
+    repository = mocker.MagicMock(spec=DynamoDBRepository)
+    websocket_comm_service_class = mocker.patch("aws.event_delivery.WebSocketCommService")
+
+    # When
+    comm_service = create_comm_service(WEBSOCKET_ENDPOINT, repository)
+
+    # Then
+    websocket_comm_service_class.assert_called_once_with(WEBSOCKET_ENDPOINT, repository)
+    assert comm_service == websocket_comm_service_class.return_value
+
+
+def test_create_comm_service_in_outbox_mode(mocker):
+    # Given
+    mocker.patch.dict("os.environ", {"EVENT_DELIVERY": "outbox"})
+
+    # When
+    comm_service = create_comm_service(WEBSOCKET_ENDPOINT, mocker.MagicMock(spec=DynamoDBRepository))
+
+    # Then
+    assert isinstance(comm_service, OutboxCommService)
@@ -0,0 +1,63 @@
+from aws.dynamodb_codec import serialize_item
+from aws.event_stream import to_messages
+from game_core.constants.event_type import EventType
+
+GAME_ID = "game_id"
+TIMESTAMP = "2024-01-01T00:00:00"
+FIRST_EVENT_ID = "01HZY8Q0D3M8J5X5V2B7K9C4TN"
+SECOND_EVENT_ID = "01HZY8Q0D3M8J5X5V2B7K9C4TP"
+
+
+def make_record(sk: str, event_type: EventType, recipients: list[str], event_name: str = "INSERT") -> dict:
+    item = {
+        "pk": GAME_ID,
+        "sk": sk,
+        "type": event_type.value,
+        "recipients": recipients,
+        "payload": {"quest_number": 1},
+        "timestamp": TIMESTAMP,
+    }
+    return {"eventName": event_name, "dynamodb": {"NewImage": serialize_item(item)}}
+
+
+def test_to_messages():
+    # Given
+    records = [
+        make_record(f"private_event_{GAME_ID}_player_1_{SECOND_EVENT_ID}", EventType.QuestVoteRequested, ["p1", "p2"]),
+        make_record(f"event_{FIRST_EVENT_ID}", EventType.QuestVoteStarted, []),
+        make_record(f"private_event_{GAME_ID}_player_2_{SECOND_EVENT_ID}", EventType.QuestVoteRequested, ["p1", "p2"]),
+    ]
+
+    # When
+    messages = to_messages(records)
+
+    # Then
+    assert [(player_id, event.id, event.type) for player_id, event in messages] == [
+        (None, f"{GAME_ID}_event_{FIRST_EVENT_ID}", EventType.QuestVoteStarted),
+        (
+            f"{GAME_ID}_player_1",
+            f"{GAME_ID}_private_event_{GAME_ID}_player_1_{SECOND_EVENT_ID}",
+            EventType.QuestVoteRequested,
+        ),
+        (
+            f"{GAME_ID}_player_2",
+            f"{GAME_ID}_private_event_{GAME_ID}_player_2_{SECOND_EVENT_ID}",
+            EventType.QuestVoteRequested,
+        ),
+    ]
+    assert messages[0][1].payload == {"quest_number": 1}
+    assert messages[0][1].game_id == GAME_ID
+
+
+def test_to_messages_skips_other_records():
+    # Given
+    records = [
+        make_record(f"event_{FIRST_EVENT_ID}", EventType.QuestVoteStarted, [], event_name="MODIFY"),
+        {"eventName": "INSERT", "dynamodb": {"NewImage": serialize_item({"pk": GAME_ID, "sk": "quest_1"})}},
+    ]
+
+    # When
+    messages = to_messages(records)
+
+    # Then
+    assert messages == []
@@ -0,0 +1,134 @@
+import uuid
+
+import pytest
+
+from aws.dynamodb_repository import DynamoDBRepository
+from aws.migrate_vote_maps import migrate_game, migrate_table
+from game_core.constants.vote_result import VoteResult
+from tests.aws.conftest import DYNAMODB_HOST_PORT, REGION, TABLE_NAME
+
+
+@pytest.fixture
+def dynamodb_repository():
+    return DynamoDBRepository(TABLE_NAME, REGION, endpoint_url=f"http://localhost:{DYNAMODB_HOST_PORT}")
+
+
+@pytest.fixture
+def game_id(dynamodb_table):
+    """
+    A game stored with one item per vote and without vote counters
+    """
+    game_id = uuid.uuid4().hex
+    items = [
+        {"pk": game_id, "sk": "game", "status": "InProgress", "state": "QuestVoting", "player_ids": []},
+        {"pk": game_id, "sk": "quest_1", "quest_number": 1, "team_member_ids": ["player_id1"]},
+        {"pk": game_id, "sk": "quest_2", "quest_number": 2, "team_member_ids": []},
+        {
+            "pk": game_id,
+            "sk": "round_1_1",
+            "quest_number": 1,
+            "round_number": 1,
+            "leader_id": "player_id1",
+            "team_member_ids": ["player_id1"],
+        },
+        {
+            "pk": game_id,
+            "sk": "vote_quest_1_player_id1",
+            "player_id": "player_id1",
+            "quest_number": 1,
+            "result": VoteResult.Fail.value,
+        },
+    ]
+    for player_id, result in [("player_id1", VoteResult.Pass), ("player_id2", VoteResult.Fail)]:
+        items.append(
+            {
+                "pk": game_id,
+                "sk": f"vote_round_1_1_{player_id}",
+                "player_id": player_id,
+                "quest_number": 1,
+                "round_number": 1,
+                "result": result.value,
+            }
+        )
+    for item in items:
+        dynamodb_table.put_item(Item=item)
+    return game_id
+
+
+def test_migrate_game(dynamodb_table, dynamodb_repository, game_id):
+    # Given
+    # When
+    deleted = migrate_game(dynamodb_table, game_id)
+
+    # Then
+    assert deleted == 3
+    assert "Item" not in dynamodb_table.get_item(Key={"pk": game_id, "sk": "vote_round_1_1_player_id1"})
+    round_item = dynamodb_table.get_item(Key={"pk": game_id, "sk": "round_1_1"})["Item"]
+    assert round_item["votes"] == {"player_id1": VoteResult.Pass.value, "player_id2": VoteResult.Fail.value}
+    game_round = dynamodb_repository.get_round(game_id, 1, 1)
+    assert (game_round.votes_cast, game_round.votes_pass, game_round.votes_fail) == (2, 1, 1)
+    assert [v.result for v in dynamodb_repository.get_quest_votes(game_id, 1)] == [VoteResult.Fail]
+    assert dynamodb_repository.get_quest(game_id, 1).votes_fail == 1
+    assert dynamodb_repository.get_quest_votes(game_id, 2) == []
+
+
+def test_migrated_game_takes_new_votes(dynamodb_table, dynamodb_repository, game_id):
+    # Given
+    migrate_game(dynamodb_table, game_id)
+
+    # When
+    dynamodb_repository.put_quest_vote(game_id, 2, "player_id1", True)
+
+    # Then
+    assert dynamodb_repository.get_quest(game_id, 2).votes_cast == 1
+
+
+def test_migrate_game_again(dynamodb_table, dynamodb_repository, game_id):
+    # Given
+    migrate_game(dynamodb_table, game_id)
+    dynamodb_repository.put_round_vote(game_id, 1, 1, "player_id3", VoteResult.Pass)
+
+    # When
+    deleted = migrate_game(dynamodb_table, game_id)
+
+    # Then
+    assert deleted == 0
+    assert dynamodb_repository.get_round(game_id, 1, 1).votes_cast == 3
+    assert len(dynamodb_repository.get_round_votes(game_id, 1, 1)) == 3
+
+
+def test_migrate_game_merges_votes_written_since(dynamodb_table, dynamodb_repository, game_id):
+    # Given
+    migrate_game(dynamodb_table, game_id)
+    dynamodb_repository.put_round_vote(game_id, 1, 1, "player_id3", VoteResult.Pass)
+    # written by the code before the migration, e.g. while it was still deployed
+    dynamodb_table.put_item(
+        Item={
+            "pk": game_id,
+            "sk": "vote_round_1_1_player_id4",
+            "player_id": "player_id4",
+            "quest_number": 1,
+            "round_number": 1,
+            "result": VoteResult.Fail.value,
+        }
+    )
+
+    # When
+    deleted = migrate_game(dynamodb_table, game_id)
+    deleted_again = migrate_game(dynamodb_table, game_id)
+
+    # Then
+    assert (deleted, deleted_again) == (1, 0)
+    game_round = dynamodb_repository.get_round(game_id, 1, 1)
+    assert (game_round.votes_cast, game_round.votes_pass, game_round.votes_fail) == (4, 2, 2)
+    round_votes = dynamodb_repository.get_round_votes(game_id, 1, 1)
+    assert sorted(v.player_id for v in round_votes) == ["player_id1", "player_id2", "player_id3", "player_id4"]
+
+
+def test_migrate_table(dynamodb_table, dynamodb_repository, game_id):
+    # Given
+    # When
+    migrate_table(dynamodb_table)
+
+    # Then
+    assert dynamodb_repository.get_round(game_id, 1, 1).votes_cast == 2
@@ -0,0 +1,60 @@
+import time
+
+import pytest
+
+from aws.ulid import CROCKFORD_BASE32, get_timestamp, is_ulid, min_ulid, new_ulid
+
+
+def test_new_ulid():
+    # Given
+    # When
+    ulids = [new_ulid() for _ in range(1000)]
+
+    # Then
+    assert all(len(ulid) == 26 for ulid in ulids)
+    assert all(c in CROCKFORD_BASE32 for ulid in ulids for c in ulid)
+    assert len(set(ulids)) == len(ulids)
+    assert ulids == sorted(ulids)
+
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("01ARZ3NDEKTSV4RRFFQ69G5FAV", True),
+        ("01ARZ3NDEKTSV4RRFFQ69G5FA", False),
+        ("01ARZ3NDEKTSV4RRFFQ69G5FAU", False),
+        ("81ARZ3NDEKTSV4RRFFQ69G5FAV", False),
+    ],
+)
+def test_is_ulid(value, expected):
+    # Given
+    # When
+    res = is_ulid(value)
+
+    # Then
+    assert res == expected
+
+
+def test_get_timestamp():
+    # Given
+    ulid = new_ulid()
+
+    # When
+    timestamp = get_timestamp(ulid)
+
+    # Then
+    assert abs(timestamp - time.time_ns() // 1_000_000) < 1000
+
+
+def test_min_ulid():
+    # Given
+    timestamp = 1_600_000_000_000
+
+    # When
+    ulid = min_ulid(timestamp)
+
+    # Then
+    assert ulid == "01EJ3PX000" + "0" * 16
+    assert get_timestamp(ulid) == timestamp
+    assert min_ulid(timestamp - 1) < ulid < new_ulid()
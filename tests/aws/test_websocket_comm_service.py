@@ -1,37 +1,38 @@
 import json
+import threading
 
 import pytest
+from botocore.exceptions import ClientError
 
 from game_core.constants.event_type import EventType
 from game_core.entities.event import Event
-from aws.websocket_comm_service import WebSocketCommService
+from game_core.exceptions import DeliveryError
+from game_core.outbox import DeliveryWorker
+from aws.websocket_comm_service import WebSocketCommService, get_executor, get_json_encoder, shutdown_executor
 
 ENDPOINT_URL = "https://mock_api_gateway_endpoint.com"
 TIMESTAMP = "2021-01-01T00:00:00Z"
+ULID = "01ARZ3NDEKTSV4RRFFQ69G5FAV"
 
 
-@pytest.fixture
-def api_gateway(mocker):
-    return mocker.Mock()
+def private_event_id(player_id: str, ulid: str = ULID) -> str:
+    return f"game_id_private_event_{player_id}_{ulid}"
 
 
 @pytest.fixture
-def boto3(mocker, api_gateway):
-    mocked_boto3 = mocker.patch("aws.websocket_comm_service.boto3")
-    mocked_boto3.client.return_value = api_gateway
-    return mocked_boto3
+def api_gateway(mocker):
+    return mocker.Mock()
 
 
 @pytest.fixture
-def thread_pool_executor(mocker):
-    return mocker.Mock()
+def get_api_gateway_client(mocker, api_gateway):
+    return mocker.patch("aws.websocket_comm_service.get_api_gateway_client", return_value=api_gateway)
 
 
-@pytest.fixture
-def thread_pool_executor_class(mocker, thread_pool_executor):
-    mocked_thread_pool_executor_class = mocker.patch("aws.websocket_comm_service.ThreadPoolExecutor")
-    mocked_thread_pool_executor_class.return_value = thread_pool_executor
-    return mocked_thread_pool_executor_class
+@pytest.fixture(autouse=True)
+def executor():
+    yield get_executor()
+    shutdown_executor()
 
 
 @pytest.fixture
@@ -40,7 +41,7 @@ def repository(mocker):
 
 
 @pytest.fixture
-def websocket_comm_service(api_gateway, repository, boto3, thread_pool_executor_class):
+def websocket_comm_service(api_gateway, repository, get_api_gateway_client):
     return WebSocketCommService(ENDPOINT_URL, repository)
 
 
@@ -55,20 +56,20 @@ def test_notify(websocket_comm_service, repository, api_gateway):
         timestamp=TIMESTAMP,
     )
     player_id = "player_id"
-    repository.get_connection_id.return_value = "connection_id"
+    repository.get_player_connection_ids.return_value = {"player_id": "connection_id"}
 
     # When
     websocket_comm_service.notify(player_id, event)
 
     # Then
-    repository.get_connection_id.assert_called_once_with("game_id", "player_id")
+    repository.get_player_connection_ids.assert_called_once_with("game_id")
     api_gateway.post_to_connection.assert_called_once_with(
         ConnectionId="connection_id",
-        Data=json.dumps(event.to_dict())
+        Data=json.dumps(event.to_dict()).encode()
     )
 
 
-def test_broadcast(websocket_comm_service, repository, api_gateway, thread_pool_executor):
+def test_broadcast(websocket_comm_service, repository, api_gateway):
     # Given
     event = Event(
         id="event_id",
@@ -78,13 +79,271 @@ def test_broadcast(websocket_comm_service, repository, api_gateway, thread_pool_
         payload={"key": "value"},
         timestamp=TIMESTAMP,
     )
-    repository.get_connection_ids.return_value = ["connection_id_1", "connection_id_2"]
+    repository.get_player_connection_ids.return_value = {
+        "player_id1": "connection_id_1",
+        "player_id2": "connection_id_2",
+    }
+
+    # When
+    websocket_comm_service.broadcast(event)
+
+    # Then
+    repository.get_player_connection_ids.assert_called_once_with("game_id")
+    assert api_gateway.post_to_connection.call_count == 2
+    api_gateway.post_to_connection.assert_any_call(ConnectionId="connection_id_1", Data=json.dumps(event.to_dict()).encode())
+    api_gateway.post_to_connection.assert_any_call(ConnectionId="connection_id_2", Data=json.dumps(event.to_dict()).encode())
+
+
+def test_notify_many(websocket_comm_service, repository, api_gateway):
+    # Given
+    event1 = Event(private_event_id("player_id1"), "game_id", EventType.GameStarted, ["player_id1"], {}, TIMESTAMP)
+    event2 = Event(private_event_id("player_id2"), "game_id", EventType.GameStarted, ["player_id2"], {}, TIMESTAMP)
+    event3 = Event(private_event_id("player_id3"), "game_id", EventType.GameStarted, ["player_id3"], {}, TIMESTAMP)
+    repository.get_player_connection_ids.return_value = {
+        "player_id1": "connection_id_1",
+        "player_id2": "connection_id_2",
+    }
+
+    # When
+    websocket_comm_service.notify_many({"player_id1": event1, "player_id2": event2, "player_id3": event3})
+
+    # Then
+    repository.get_player_connection_ids.assert_called_once_with("game_id")
+    repository.get_connection_id.assert_not_called()
+    assert api_gateway.post_to_connection.call_count == 2
+    api_gateway.post_to_connection.assert_any_call(ConnectionId="connection_id_1", Data=json.dumps(event1.to_dict()).encode())
+    api_gateway.post_to_connection.assert_any_call(ConnectionId="connection_id_2", Data=json.dumps(event2.to_dict()).encode())
+
+
+def test_executor_is_shared(websocket_comm_service, repository, api_gateway, executor):
+    # Given
+    event = Event("event_id", "game_id", EventType.PlayerJoined, [], {}, TIMESTAMP)
+    repository.get_player_connection_ids.return_value = {"player_id1": "connection_id_1"}
+    other_comm_service = WebSocketCommService(ENDPOINT_URL, repository)
+
+    # When
+    websocket_comm_service.broadcast(event)
+    other_comm_service.broadcast(event)
+
+    # Then
+    assert get_executor() is executor
+    assert api_gateway.post_to_connection.call_count == 2
+
+
+def test_shutdown_executor(executor):
+    # Given
+    # When
+    shutdown_executor()
+
+    # Then
+    assert get_executor() is not executor
+    with pytest.raises(RuntimeError):
+        executor.submit(print)
+
+
+def test_broadcast_encodes_event_once(websocket_comm_service, repository, api_gateway, mocker):
+    # Given
+    event = Event("event_id", "game_id", EventType.PlayerJoined, [], {"key": "value"}, TIMESTAMP)
+    repository.get_player_connection_ids.return_value = {
+        "player_id1": "connection_id_1",
+        "player_id2": "connection_id_2",
+        "player_id3": "connection_id_3",
+    }
+    to_dict = mocker.spy(event, "to_dict")
 
     # When
     websocket_comm_service.broadcast(event)
 
     # Then
-    repository.get_connection_ids.assert_called_once_with("game_id")
-    thread_pool_executor.submit.assert_any_call(websocket_comm_service._emit, "connection_id_1", event)
-    thread_pool_executor.submit.assert_any_call(websocket_comm_service._emit, "connection_id_2", event)
-    thread_pool_executor.shutdown.assert_called_once_with(wait=True)
+    assert to_dict.call_count == 1
+    data = {c.kwargs["Data"] for c in api_gateway.post_to_connection.call_args_list}
+    assert data == {json.dumps(event.to_dict()).encode()}
+
+
+def test_notify_many_gives_private_event_recipient_item_id(websocket_comm_service, repository, api_gateway):
+    # Given
+    recipients = ["player_id1", "player_id2"]
+    event = Event(private_event_id("player_id1"), "game_id", EventType.QuestVoteRequested, recipients, {}, TIMESTAMP)
+    repository.get_player_connection_ids.return_value = {
+        "player_id1": "connection_id_1",
+        "player_id2": "connection_id_2",
+    }
+
+    # When
+    websocket_comm_service.notify_many({"player_id1": event, "player_id2": event})
+
+    # Then
+    posts = api_gateway.post_to_connection.call_args_list
+    ids = {c.kwargs["ConnectionId"]: json.loads(c.kwargs["Data"])["id"] for c in posts}
+    assert ids == {"connection_id_1": private_event_id("player_id1"), "connection_id_2": private_event_id("player_id2")}
+
+
+def test_notify_many_encodes_shared_event_once(websocket_comm_service, repository, api_gateway, mocker):
+    # Given
+    event = Event("event_id", "game_id", EventType.QuestVoteRequested, [], {}, TIMESTAMP)
+    repository.get_player_connection_ids.return_value = {"player_id1": "connection_id_1", "player_id2": "connection_id_2"}
+    to_dict = mocker.spy(event, "to_dict")
+
+    # When
+    websocket_comm_service.notify_many({"player_id1": event, "player_id2": event})
+
+    # Then
+    assert to_dict.call_count == 1
+    assert api_gateway.post_to_connection.call_count == 2
+
+
+@pytest.mark.parametrize("name", ["json", "orjson"])
+def test_get_json_encoder(name):
+    # Given
+    value = {"id": "event_id", "payload": {"team_member_ids": ["player_id1"], "quest_number": 1}}
+
+    # When
+    data = get_json_encoder(name)(value)
+
+    # Then
+    assert json.loads(data) == value
+
+
+def test_get_json_encoder_unknown():
+    # Given
+    # When
+    with pytest.raises(ValueError):
+        get_json_encoder("pickle")
+
+    # Then
+
+
+def test_send_batch(websocket_comm_service, repository, api_gateway):
+    # Given
+    round_completed = Event("event_id1", "game_id", EventType.RoundCompleted, [], {}, TIMESTAMP)
+    quest_vote_requested = Event(
+        private_event_id("player_id1"), "game_id", EventType.QuestVoteRequested, ["player_id1"], {}, TIMESTAMP
+    )
+    quest_vote_started = Event("event_id3", "game_id", EventType.QuestVoteStarted, [], {}, TIMESTAMP)
+    repository.get_player_connection_ids.return_value = {
+        "player_id1": "connection_id_1",
+        "player_id2": "connection_id_2",
+    }
+
+    # When
+    websocket_comm_service.send_batch(
+        [(None, round_completed), ("player_id1", quest_vote_requested), (None, quest_vote_started)]
+    )
+
+    # Then
+    repository.get_player_connection_ids.assert_called_once_with("game_id")
+    frames = {c.kwargs["ConnectionId"]: json.loads(c.kwargs["Data"]) for c in api_gateway.post_to_connection.call_args_list}
+    assert frames == {
+        "connection_id_1": [round_completed.to_dict(), quest_vote_requested.to_dict(), quest_vote_started.to_dict()],
+        "connection_id_2": [round_completed.to_dict(), quest_vote_started.to_dict()],
+    }
+
+
+def test_connection_ids_are_read_once(websocket_comm_service, repository, api_gateway):
+    # Given
+    event = Event("event_id", "game_id", EventType.RoundStarted, [], {}, TIMESTAMP)
+    repository.get_player_connection_ids.return_value = {"player_id1": "connection_id_1"}
+
+    # When
+    websocket_comm_service.broadcast(event)
+    websocket_comm_service.notify("player_id1", event)
+    websocket_comm_service.send_batch([(None, event)])
+
+    # Then
+    repository.get_player_connection_ids.assert_called_once_with("game_id")
+    assert api_gateway.post_to_connection.call_count == 3
+
+
+def test_gone_connection_is_deleted(websocket_comm_service, repository, api_gateway):
+    # Given
+    event = Event("event_id", "game_id", EventType.RoundStarted, [], {}, TIMESTAMP)
+    repository.get_player_connection_ids.return_value = {
+        "player_id1": "connection_id_1",
+        "player_id2": "connection_id_2",
+    }
+
+    def post_to_connection(ConnectionId, Data):
+        if ConnectionId == "connection_id_1":
+            raise ClientError({"Error": {"Code": "GoneException"}}, "PostToConnection")
+
+    api_gateway.post_to_connection.side_effect = post_to_connection
+    pruning_threads = []
+    repository.delete_connection_id.side_effect = lambda *_: pruning_threads.append(threading.get_ident())
+
+    # When
+    websocket_comm_service.broadcast(event)
+    websocket_comm_service.broadcast(event)
+
+    # Then
+    repository.delete_connection_id.assert_called_once_with("game_id", "player_id1", "connection_id_1")
+    connection_ids = [c.kwargs["ConnectionId"] for c in api_gateway.post_to_connection.call_args_list]
+    assert connection_ids.count("connection_id_1") == 1
+    assert api_gateway.post_to_connection.call_count == 3
+    # pruned by the calling thread, once the posts are done
+    assert pruning_threads == [threading.get_ident()]
+
+
+def test_failed_post_keeps_connection(websocket_comm_service, repository, api_gateway):
+    # Given
+    event = Event("event_id", "game_id", EventType.RoundStarted, [], {}, TIMESTAMP)
+    repository.get_player_connection_ids.return_value = {"player_id1": "connection_id_1"}
+    api_gateway.post_to_connection.side_effect = ClientError(
+        {"Error": {"Code": "LimitExceededException"}}, "PostToConnection"
+    )
+
+    # When
+    websocket_comm_service.broadcast(event)
+
+    # Then
+    repository.delete_connection_id.assert_not_called()
+
+
+def test_send_batch_raises_undelivered_messages(repository, api_gateway, get_api_gateway_client):
+    # Given
+    websocket_comm_service = WebSocketCommService(ENDPOINT_URL, repository, raise_undelivered=True)
+    public_event = Event("event_id1", "game_id", EventType.RoundStarted, [], {}, TIMESTAMP)
+    private_event = Event(
+        private_event_id("player_id2"), "game_id", EventType.GameStarted, ["player_id2"], {}, TIMESTAMP
+    )
+    repository.get_player_connection_ids.return_value = {
+        "player_id1": "connection_id_1",
+        "player_id2": "connection_id_2",
+    }
+
+    def post_to_connection(ConnectionId, Data):
+        if ConnectionId == "connection_id_2":
+            raise ClientError({"Error": {"Code": "LimitExceededException"}}, "PostToConnection")
+
+    api_gateway.post_to_connection.side_effect = post_to_connection
+
+    # When
+    with pytest.raises(DeliveryError) as e:
+        websocket_comm_service.send_batch([(None, public_event), ("player_id2", private_event)])
+
+    # Then
+    assert e.value.messages == [("player_id2", public_event), ("player_id2", private_event)]
+    repository.delete_connection_id.assert_not_called()
+
+
+def test_failed_post_is_retried(mocker, repository, api_gateway, get_api_gateway_client):
+    # Given
+    websocket_comm_service = WebSocketCommService(ENDPOINT_URL, repository, raise_undelivered=True)
+    event = Event("event_id", "game_id", EventType.RoundStarted, [], {}, TIMESTAMP)
+    repository.get_player_connection_ids.return_value = {
+        "player_id1": "connection_id_1",
+        "player_id2": "connection_id_2",
+    }
+    failures = [ClientError({"Error": {"Code": "LimitExceededException"}}, "PostToConnection")]
+
+    def post_to_connection(ConnectionId, Data):
+        if ConnectionId == "connection_id_2" and failures:
+            raise failures.pop()
+
+    api_gateway.post_to_connection.side_effect = post_to_connection
+
+    # When
+    DeliveryWorker(websocket_comm_service, sleep=mocker.Mock()).deliver([(None, event)])
+
+    # Then
+    connection_ids = [c.kwargs["ConnectionId"] for c in api_gateway.post_to_connection.call_args_list]
+    assert sorted(connection_ids) == ["connection_id_1", "connection_id_2", "connection_id_2"]
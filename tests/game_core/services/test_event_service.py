@@ -1,5 +1,3 @@
-from unittest.mock import call
-
 import pytest
 
 from game_core.constants.event_type import EventType
@@ -79,15 +77,14 @@ def test_create_game_started_events(
     players = [player1, player2]
     event1 = mocker.MagicMock(spec=Event)
     event2 = mocker.MagicMock(spec=Event)
-    repository.put_event.side_effect = [event1, event2]
+    repository.put_events.return_value = [event1, event2]
 
     # When
     event_service.create_game_started_events(GAME_ID, players)
 
     # Then
-    calls = [
-        call(
-            GAME_ID,
+    new_events = [
+        (
             EventType.GameStarted,
             [player1.id],
             {
@@ -99,10 +96,8 @@ def test_create_game_started_events(
                     }
                 ],
             },
-            TIMESTAMP,
         ),
-        call(
-            GAME_ID,
+        (
             EventType.GameStarted,
             [player2.id],
             {
@@ -114,13 +109,11 @@ def test_create_game_started_events(
                     }
                 ],
             },
-            TIMESTAMP,
         ),
     ]
-    repository.put_event.assert_has_calls(calls)
-    comm_service.notify.assert_has_calls(
-        [call(player1.id, event1), call(player2.id, event2)]
-    )
+    repository.put_events.assert_called_once_with(GAME_ID, new_events, TIMESTAMP)
+    repository.put_event.assert_not_called()
+    comm_service.notify_many.assert_called_once_with({player1.id: event1, player2.id: event2})
 
 
 def test_create_assassination_started_event(
@@ -305,11 +298,8 @@ def test_create_quest_vote_requested_event(
         {"quest_number": QUEST_NUMBER, "team_member_ids": team_member_ids},
         TIMESTAMP,
     )
-    comm_service.notify.assert_has_calls(
-        [
-            call(team_member_ids[0], created_event),
-            call(team_member_ids[1], created_event),
-        ]
+    comm_service.notify_many.assert_called_once_with(
+        {team_member_ids[0]: created_event, team_member_ids[1]: created_event}
     )
 
 
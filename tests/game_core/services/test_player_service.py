@@ -1,5 +1,3 @@
-from unittest.mock import call
-
 import pytest
 
 from game_core.constants.action_type import ActionType
@@ -104,7 +102,7 @@ def test_assign_roles(mocker, repository, player_service):
 
     assert len(assigned_players) == len(players)
     repository.get_players.assert_called_once_with(game_id)
-    repository.update_player.assert_has_calls([call(p) for p in players])
+    repository.update_players.assert_called_once_with(players)
     morgana_player = [p for p in players if p.role == Role.Morgana][0]
     assassin_player = [p for p in players if p.role == Role.Assassin][0]
     oberon_player = [p for p in players if p.role == Role.Oberon][0]
@@ -2,9 +2,12 @@ import pytest
 
 from game_core.constants.action_type import ActionType
 from game_core.constants.vote_result import VoteResult
+from game_core.constants.game_status import GameStatus
+from game_core.constants.state_name import StateName
 from game_core.entities.action import Action
+from game_core.entities.game import Game
 from game_core.entities.quest import Quest
-from game_core.entities.quest_vote import QuestVote
+from game_core.exceptions import DuplicateVoteError
 from game_core.repository import Repository
 from game_core.services.event_service import EventService
 from game_core.services.player_service import PlayerService
@@ -23,6 +26,16 @@ def repository(mocker):
     return mocker.MagicMock(spec=Repository)
 
 
+@pytest.fixture
+def game(repository):
+    """
+    A game without current quest pointer, as stored before the game held it
+    """
+    game = Game(GAME_ID, GameStatus.InProgress, StateName.TeamSelection, None, [PLAYER_ID], None, None)
+    repository.get_game.return_value = game
+    return game
+
+
 @pytest.fixture
 def round_service(mocker):
     return mocker.MagicMock(spec=RoundService)
@@ -69,7 +82,7 @@ def cast_quest_vote_action():
     ],
 )
 def test_handle_on_enter_team_selection_state_create_quest(
-    mocker, quest_service, repository, round_service, event_service, quests
+    mocker, quest_service, repository, round_service, event_service, game, quests
 ):
     # Given
     repository.get_quests.return_value = quests
@@ -89,10 +102,12 @@ def test_handle_on_enter_team_selection_state_create_quest(
     event_service.create_quest_started_event.assert_called_once_with(
         GAME_ID, len(quests) + 1
     )
+    assert game.current_quest_number == len(quests) + 1
+    repository.update_game.assert_called_once_with(game)
 
 
 def test_handle_on_enter_team_selection_state_no_create_quest(
-    quest_service, repository, round_service, event_service
+    quest_service, repository, round_service, event_service, game
 ):
     # Given
     quests = [
@@ -110,6 +125,36 @@ def test_handle_on_enter_team_selection_state_no_create_quest(
     round_service.create_round.assert_called_once_with(GAME_ID, quests[-1].quest_number)
 
 
+def test_get_current_quest_from_game(quest_service, repository, game):
+    # Given
+    game.current_quest_number = 2
+    quest = Quest("quest_id2", GAME_ID, 2)
+    repository.get_quest.return_value = quest
+
+    # When
+    res = quest_service.get_current_quest(GAME_ID)
+
+    # Then
+    assert res == quest
+    repository.get_quest.assert_called_once_with(GAME_ID, 2)
+    repository.get_quests.assert_not_called()
+
+
+def test_create_quest_from_game(quest_service, repository, event_service, game):
+    # Given
+    game.current_quest_number = 2
+    repository.get_quest.return_value = Quest("quest_id2", GAME_ID, 2, result=VoteResult.Pass)
+
+    # When
+    quest_service.create_quest(GAME_ID)
+
+    # Then
+    repository.put_quest.assert_called_once_with(GAME_ID, 3)
+    assert game.current_quest_number == 3
+    repository.update_game.assert_called_once_with(game)
+    repository.get_quests.assert_not_called()
+
+
 def test_set_team_member_ids(mocker, quest_service, repository):
     # Given
     game_id = "game_id"
@@ -128,7 +173,7 @@ def test_set_team_member_ids(mocker, quest_service, repository):
 
 
 def test_on_enter_quest_voting_state(
-    mocker, event_service, quest_service, round_service, repository
+    mocker, event_service, quest_service, round_service, repository, game
 ):
     # Given
     team_member_ids = ["player_id1", "player_id2"]
@@ -145,6 +190,8 @@ def test_on_enter_quest_voting_state(
     quest_service.on_enter_quest_voting_state(GAME_ID)
 
     # Then
+    repository.update_quest.assert_called_once_with(quests[1])
+    assert quests[1].team_member_ids == team_member_ids
     event_service.create_quest_vote_started_event.assert_called_once_with(
         GAME_ID, 2, team_member_ids
     )
@@ -157,16 +204,16 @@ def test_handle_quest_vote_cast(
     mocker, quest_service, event_service, repository, cast_quest_vote_action
 ):
     # Given
-    quest = mocker.MagicMock(spec=Quest)
-    quest.result = None
-    team_member_ids = ["player_id1", "player_id2"]
+    quest = Quest(
+        "quest_id",
+        GAME_ID,
+        QUEST_NUMBER,
+        team_member_ids=["player_id1", "player_id2"],
+        votes_cast=1,
+        votes_pass=1,
+    )
     repository.get_quest.return_value = quest
-    quest_votes = []
-    for _ in range(len(team_member_ids)):
-        quest_vote = mocker.MagicMock()
-        quest_vote.result = VoteResult.Pass
-        quest_votes.append(quest_vote)
-    repository.get_quest_votes.return_value = quest_votes
+    repository.get_quest_votes.return_value = []
 
     # When
     quest_service.handle_cast_quest_vote(cast_quest_vote_action)
@@ -178,6 +225,34 @@ def test_handle_quest_vote_cast(
     event_service.create_quest_vote_cast_event.assert_called_once_with(
         GAME_ID, QUEST_NUMBER, PLAYER_ID, VoteResult.Pass
     )
+    repository.update_quest.assert_not_called()
+
+
+def test_handle_quest_vote_cast_completes_quest(
+    quest_service, event_service, repository, cast_quest_vote_action
+):
+    # Given
+    quest = Quest(
+        "quest_id",
+        GAME_ID,
+        QUEST_NUMBER,
+        team_member_ids=["player_id1", "player_id2"],
+        votes_cast=2,
+        votes_pass=1,
+        votes_fail=1,
+    )
+    repository.get_quest.return_value = quest
+    repository.get_quest_votes.return_value = []
+
+    # When
+    quest_service.handle_cast_quest_vote(cast_quest_vote_action)
+
+    # Then
+    assert quest.result == VoteResult.Fail
+    repository.update_quest.assert_called_once_with(quest)
+    event_service.create_quest_completed_event.assert_called_once_with(
+        GAME_ID, QUEST_NUMBER, VoteResult.Fail
+    )
 
 
 @pytest.mark.parametrize(
@@ -230,39 +305,41 @@ def test_handle_quest_vote_cast_with_quest_not_found(
 
 
 def test_handle_quest_vote_cast_with_player_voted(
-    quest_service, player_service, cast_quest_vote_action, repository
+    quest_service, event_service, cast_quest_vote_action, repository
 ):
     # Given
-    repository.get_quest_votes.return_value = [QuestVote("id", GAME_ID, PLAYER_ID, QUEST_NUMBER, VoteResult.Fail)]
+    repository.put_quest_vote.side_effect = DuplicateVoteError(
+        f"Player {PLAYER_ID} already voted for quest {QUEST_NUMBER}"
+    )
 
     # When
-    with pytest.raises(ValueError):
+    with pytest.raises(DuplicateVoteError):
         quest_service.handle_cast_quest_vote(cast_quest_vote_action)
 
     # Then
-    repository.put_quest_vote.assert_not_called()
+    repository.get_quest_votes.assert_not_called()
+    event_service.create_quest_vote_cast_event.assert_not_called()
 
 
 @pytest.mark.parametrize(
-    "team_member_ids, quest_votes, is_completed",
-    [(["id1", "id2"], [{}], False), (["id1", "id2"], [{}, {}], True)],
+    "team_member_ids, votes_cast, is_completed",
+    [(["id1", "id2"], 1, False), (["id1", "id2"], 2, True)],
 )
 def test_is_quest_vote_completed(
-    mocker, quest_service, repository, team_member_ids, quest_votes, is_completed
+    quest_service, repository, team_member_ids, votes_cast, is_completed
 ):
     # Given
     game_id = "game_id"
     quest_number = 1
-    quest = mocker.MagicMock(spec=Quest)
-    quest.team_member_ids = team_member_ids
+    quest = Quest("quest_id", game_id, quest_number, team_member_ids=team_member_ids, votes_cast=votes_cast)
     repository.get_quest.return_value = quest
-    repository.get_quest_votes.return_value = quest_votes
 
     # When
     result = quest_service.is_quest_vote_completed(game_id, quest_number)
 
     # Then
     assert result == is_completed
+    repository.get_quest_votes.assert_not_called()
 
 
 @pytest.mark.parametrize(
@@ -275,22 +352,26 @@ def test_is_quest_vote_completed(
     ],
 )
 def test_is_quest_passed(
-    mocker, quest_service, repository, votes, quest_number, is_passed
+    quest_service, repository, votes, quest_number, is_passed
 ):
     # Given
     game_id = "game_id"
-    quest_votes = []
-    for vote in votes:
-        quest_vote = mocker.MagicMock()
-        quest_vote.result = vote
-        quest_votes.append(quest_vote)
-    repository.get_quest_votes.return_value = quest_votes
+    quest = Quest(
+        "quest_id",
+        game_id,
+        quest_number,
+        votes_cast=len(votes),
+        votes_pass=votes.count(True),
+        votes_fail=votes.count(False),
+    )
+    repository.get_quest.return_value = quest
 
     # When
     result = quest_service.is_quest_passed(game_id, quest_number)
 
     # Then
     assert result == is_passed
+    repository.get_quest_votes.assert_not_called()
 
 
 def test_set_quest_result(mocker, quest_service, event_service, repository):
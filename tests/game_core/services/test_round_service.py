@@ -3,12 +3,14 @@ from unittest.mock import call
 import pytest
 
 from game_core.constants.action_type import ActionType
+from game_core.constants.game_status import GameStatus
+from game_core.constants.state_name import StateName
 from game_core.constants.vote_result import VoteResult
 from game_core.entities.action import Action
-from game_core.entities.game import GameConfig
+from game_core.entities.game import Game, GameConfig
 from game_core.entities.player import Player
 from game_core.entities.round import Round
-from game_core.entities.round_vote import RoundVote
+from game_core.exceptions import DuplicateVoteError
 from game_core.repository import Repository
 from game_core.services.event_service import EventService
 from game_core.services.round_service import RoundService
@@ -84,6 +86,9 @@ def test_round_service_create_round(mocker, round_service, repository, event_ser
     game_config.quest_team_size = {QUEST_NUMBER: number_of_players}
     game.config = game_config
     game.player_ids = player_ids
+    # a game started before the game held the current round and leader
+    game.current_round_number = None
+    game.leader_index = None
     repository.get_game.return_value = game
     current_round = mocker.MagicMock()
     repository.put_round.return_value = current_round
@@ -104,6 +109,65 @@ def test_round_service_create_round(mocker, round_service, repository, event_ser
     assert res == current_round
 
 
+def test_create_round_from_game(mocker, round_service, repository, event_service):
+    # Given
+    player_ids = ["player_id1", "player_id2", LEADER_ID]
+    game = Game(
+        GAME_ID,
+        GameStatus.InProgress,
+        StateName.TeamSelection,
+        GameConfig({QUEST_NUMBER + 1: 3}, [], {}, 1),
+        player_ids,
+        None,
+        None,
+        current_quest_number=QUEST_NUMBER,
+        current_round_number=ROUND_NUMBER,
+        leader_index=2,
+    )
+    repository.get_game.return_value = game
+
+    # When
+    round_service.create_round(GAME_ID, QUEST_NUMBER + 1)
+
+    # Then
+    repository.put_round.assert_called_once_with(GAME_ID, QUEST_NUMBER + 1, ROUND_NUMBER + 1, player_ids[0])
+    assert (game.current_quest_number, game.current_round_number, game.leader_index) == (
+        QUEST_NUMBER + 1, ROUND_NUMBER + 1, 0
+    )
+    repository.update_game.assert_called_once_with(game)
+    repository.get_rounds.assert_not_called()
+    event_service.create_team_selection_requested_event.assert_called_once_with(
+        GAME_ID, QUEST_NUMBER + 1, ROUND_NUMBER + 1, 3
+    )
+
+
+def test_get_current_round_from_game(round_service, repository):
+    # Given
+    game = Game(
+        GAME_ID,
+        GameStatus.InProgress,
+        StateName.RoundVoting,
+        None,
+        [LEADER_ID],
+        None,
+        None,
+        current_quest_number=QUEST_NUMBER,
+        current_round_number=ROUND_NUMBER,
+        leader_index=0,
+    )
+    repository.get_game.return_value = game
+    game_round = Round("round_id", GAME_ID, QUEST_NUMBER, ROUND_NUMBER, LEADER_ID, [])
+    repository.get_round.return_value = game_round
+
+    # When
+    res = round_service.get_current_round(GAME_ID)
+
+    # Then
+    assert res == game_round
+    repository.get_round.assert_called_once_with(GAME_ID, QUEST_NUMBER, ROUND_NUMBER)
+    repository.get_rounds.assert_not_called()
+
+
 def test_handle_team_proposal_submitted(
     mocker, round_service, repository, event_service
 ):
@@ -216,8 +280,13 @@ def test_handle_round_vote_cast(
     game_round = mocker.MagicMock(spec=Round)
     game_round.round_number = round_number
     game_round.result = None
+    game_round.votes_cast = 1
+    game_round.votes_pass = 1
     repository.get_round.return_value = game_round
     repository.get_round_votes.return_value = []
+    game = mocker.MagicMock()
+    game.player_ids = [PLAYER_ID]
+    repository.get_game.return_value = game
 
     # When
     round_service.handle_cast_round_vote(submit_team_proposal_action)
@@ -229,7 +298,7 @@ def test_handle_round_vote_cast(
     repository.put_round_vote.assert_called_once_with(
         GAME_ID, quest_number, round_number, PLAYER_ID, VoteResult.Pass
     )
-    repository.get_round_votes.assert_any_call(GAME_ID, quest_number, round_number)
+    repository.get_round_votes.assert_not_called()
     updated_game_round = game_round
     updated_game_round.team_member_ids = [PLAYER_ID]
     repository.update_round.assert_called_once_with(updated_game_round)
@@ -289,42 +358,40 @@ def test_handle_round_vote_cast_with_player_voted(
     game_round.round_number = round_number
     game_round.result = None
     repository.get_round.return_value = game_round
-    repository.get_round_votes.return_value = [
-        RoundVote(
-            "id", GAME_ID, PLAYER_ID, quest_number, round_number, VoteResult.Pass
-        ),
-    ]
+    repository.put_round_vote.side_effect = DuplicateVoteError(
+        f"Player {PLAYER_ID} already voted for quest {quest_number} round {round_number}"
+    )
 
     # When
-    with pytest.raises(ValueError):
+    with pytest.raises(DuplicateVoteError):
         round_service.handle_cast_round_vote(cast_round_vote_action)
 
     # Then
-    repository.put_round_vote.assert_not_called()
+    repository.get_round_votes.assert_not_called()
     event_service.create_round_vote_cast_event.assert_not_called()
 
 
 @pytest.mark.parametrize("num_of_votes, is_completed", [(10, True), (4, False)])
-def test_is_round_vote_completed(round_service, repository, num_of_votes, is_completed):
+def test_is_round_vote_completed(mocker, round_service, repository, num_of_votes, is_completed):
     # Given
     game_id = "game_id"
     quest_number = 3
     round_number = 4
     num_of_players = 10
-    players = [{}] * num_of_players
-    round_votes = [{}] * num_of_votes
-    repository.get_players.return_value = players
-    repository.get_round_votes.return_value = round_votes
+    game = mocker.MagicMock()
+    game.player_ids = [f"player_id{i}" for i in range(num_of_players)]
+    repository.get_game.return_value = game
+    game_round = Round("round_id", game_id, quest_number, round_number, LEADER_ID, [], votes_cast=num_of_votes)
+    repository.get_round.return_value = game_round
 
     # When
     res = round_service.is_round_vote_completed(game_id, quest_number, round_number)
 
     # Then
     assert res == is_completed
-    repository.get_players.assert_called_once_with(game_id)
-    repository.get_round_votes.assert_called_once_with(
-        game_id, quest_number, round_number
-    )
+    repository.get_round.assert_called_once_with(game_id, quest_number, round_number)
+    repository.get_players.assert_not_called()
+    repository.get_round_votes.assert_not_called()
 
 
 @pytest.mark.parametrize(
@@ -337,21 +404,24 @@ def test_is_proposal_passed(
     game_id = "game_id"
     quest_number = 3
     round_number = 4
-    round_votes = []
     num_of_players = 10
-    for i in range(num_of_players):
-        vote = mocker.MagicMock(spec=RoundVote)
-        vote.result = VoteResult.Fail
-        round_votes.append(vote)
-    for i in range(num_of_approval):
-        round_votes[i].result = VoteResult.Pass
-    repository.get_round_votes.return_value = round_votes
+    game_round = Round(
+        "round_id",
+        game_id,
+        quest_number,
+        round_number,
+        LEADER_ID,
+        [],
+        votes_cast=num_of_players,
+        votes_pass=num_of_approval,
+        votes_fail=num_of_players - num_of_approval,
+    )
+    repository.get_round.return_value = game_round
 
     # When
     res = round_service.is_proposal_passed(game_id, quest_number, round_number)
 
     # Then
     assert res == is_passed
-    repository.get_round_votes.assert_called_once_with(
-        game_id, quest_number, round_number
-    )
+    repository.get_round.assert_called_once_with(game_id, quest_number, round_number)
+    repository.get_round_votes.assert_not_called()
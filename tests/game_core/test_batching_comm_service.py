@@ -0,0 +1,86 @@
+import pytest
+
+from game_core.batching_comm_service import BatchingCommService
+from game_core.comm_service import CommService
+from game_core.constants.event_type import EventType
+from game_core.entities.event import Event
+
+GAME_ID = "game_id"
+TIMESTAMP = "2024-01-01T00:00:00"
+
+
+@pytest.fixture
+def comm_service(mocker):
+    return mocker.MagicMock(spec=CommService)
+
+
+@pytest.fixture
+def batching_comm_service(comm_service):
+    return BatchingCommService(comm_service)
+
+
+def make_event(event_id: str, event_type: EventType, recipients: list[str]) -> Event:
+    return Event(event_id, GAME_ID, event_type, recipients, {}, TIMESTAMP)
+
+
+def test_flush(batching_comm_service, comm_service):
+    # Given
+    round_vote_cast = make_event("event_id1", EventType.RoundVoteCast, [])
+    quest_vote_requested = make_event("event_id2", EventType.QuestVoteRequested, ["player_id1", "player_id2"])
+    game_started = make_event("event_id3", EventType.GameStarted, ["player_id3"])
+    batching_comm_service.broadcast(round_vote_cast)
+    batching_comm_service.notify_many({"player_id1": quest_vote_requested, "player_id2": quest_vote_requested})
+    batching_comm_service.notify("player_id3", game_started)
+
+    # When
+    batching_comm_service.flush()
+
+    # Then
+    comm_service.broadcast.assert_not_called()
+    comm_service.notify.assert_not_called()
+    comm_service.send_batch.assert_called_once_with(
+        [
+            (None, round_vote_cast),
+            ("player_id1", quest_vote_requested),
+            ("player_id2", quest_vote_requested),
+            ("player_id3", game_started),
+        ]
+    )
+
+
+def test_flush_sends_events_once(batching_comm_service, comm_service):
+    # Given
+    batching_comm_service.broadcast(make_event("event_id1", EventType.RoundVoteCast, []))
+    batching_comm_service.flush()
+
+    # When
+    batching_comm_service.flush()
+
+    # Then
+    comm_service.send_batch.assert_called_once()
+
+
+def test_discard(batching_comm_service, comm_service):
+    # Given
+    batching_comm_service.broadcast(make_event("event_id1", EventType.RoundVoteCast, []))
+
+    # When
+    batching_comm_service.discard()
+    batching_comm_service.flush()
+
+    # Then
+    comm_service.send_batch.assert_not_called()
+
+
+def test_flush_to_other_comm_service(mocker, batching_comm_service, comm_service):
+    # Given
+    other_comm_service = mocker.MagicMock(spec=CommService)
+    event = make_event("event_id1", EventType.RoundVoteCast, [])
+    batching_comm_service.broadcast(event)
+
+    # When
+    batching_comm_service.flush(other_comm_service)
+
+    # Then
+    comm_service.send_batch.assert_not_called()
+    other_comm_service.send_batch.assert_called_once_with([(None, event)])
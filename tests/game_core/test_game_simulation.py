@@ -0,0 +1,132 @@
+import random
+import uuid
+from typing import Optional
+
+import pytest
+
+from game_core.comm_service import CommService
+from game_core.constants.action_type import ActionType
+from game_core.constants.game_status import GameStatus
+from game_core.constants.state_name import StateName
+from game_core.constants.vote_result import VoteResult
+from game_core.entities.action import Action
+from game_core.entities.event import Event
+from game_core.in_memory_repository import InMemoryRepository
+from game_core.state_machine import StateMachine
+from game_core.state_machine_registry import StateMachineRegistry
+
+
+class RecordingCommService(CommService):
+    def __init__(self):
+        self.events: list[Event] = []
+
+    def broadcast(self, event: Event) -> None:
+        self.events.append(event)
+
+    def notify(self, player_id: str, event: Event) -> None:
+        self.events.append(event)
+
+
+def play_game(
+    repository: InMemoryRepository,
+    comm_service: CommService,
+    number_of_players: int,
+    registry: Optional[StateMachineRegistry] = None,
+) -> str:
+    game_id = repository.put_game().id
+
+    def handle_action(action_type: ActionType, payload: dict, player_id: str = "admin") -> None:
+        action = Action(uuid.uuid4().hex, game_id, player_id, action_type, payload)
+        if registry:
+            registry.handle_action(action, comm_service)
+        else:
+            StateMachine(comm_service, repository, game_id).handle_action(action)
+
+    player_ids = [uuid.uuid4().hex for _ in range(number_of_players)]
+    for player_id in player_ids:
+        handle_action(ActionType.JoinGame, {"name": f"name_{player_id}"}, player_id)
+    handle_action(ActionType.StartGame, {"player_ids": player_ids})
+
+    for _ in range(200):
+        game = repository.get_game(game_id)
+        if game.status == GameStatus.Finished:
+            return game_id
+        players = [player.id for player in repository.get_players(game_id)]
+        rounds = sorted(repository.get_rounds(game_id), key=lambda r: (r.quest_number, r.round_number))
+        current_round = rounds[-1] if rounds else None
+        if game.state == StateName.TeamSelection:
+            team_member_ids = random.sample(players, game.config.quest_team_size[current_round.quest_number])
+            handle_action(
+                ActionType.SubmitTeamProposal,
+                {
+                    "quest_number": current_round.quest_number,
+                    "round_number": current_round.round_number,
+                    "team_member_ids": team_member_ids,
+                },
+            )
+        elif game.state == StateName.RoundVoting:
+            for player_id in players:
+                handle_action(
+                    ActionType.CastRoundVote,
+                    {
+                        "player_id": player_id,
+                        "is_approved": random.random() < 0.6,
+                        "quest_number": current_round.quest_number,
+                        "round_number": current_round.round_number,
+                    },
+                )
+        elif game.state == StateName.QuestVoting:
+            for player_id in current_round.team_member_ids:
+                handle_action(
+                    ActionType.CastQuestVote,
+                    {
+                        "player_id": player_id,
+                        "is_approved": random.random() < 0.7,
+                        "quest_number": current_round.quest_number,
+                    },
+                )
+        else:
+            handle_action(ActionType.SubmitAssassinationTarget, {"target_id": random.choice(players)})
+    raise AssertionError(f"Game {game_id} did not finish")
+
+
+@pytest.mark.parametrize("seed", range(12))
+def test_play_game(seed):
+    # Given
+    random.seed(seed)
+    repository = InMemoryRepository()
+    comm_service = RecordingCommService()
+
+    # When
+    game_id = play_game(repository, comm_service, number_of_players=5 + seed % 6)
+
+    # Then
+    quests = repository.get_quests(game_id)
+    results = [quest.result for quest in quests]
+    assert results.count(VoteResult.Pass) == 3 or results.count(VoteResult.Fail) == 3
+    for quest in quests:
+        assert quest.votes_cast in (0, len(quest.team_member_ids))
+        assert quest.votes_cast == len(repository.get_quest_votes(game_id, quest.quest_number))
+    for game_round in repository.get_rounds(game_id):
+        round_votes = repository.get_round_votes(game_id, game_round.quest_number, game_round.round_number)
+        assert game_round.votes_cast == len(round_votes)
+        assert game_round.votes_pass == len([v for v in round_votes if v.result == VoteResult.Pass])
+    assert comm_service.events
+
+
+def test_play_games_with_registry():
+    # Given
+    random.seed(0)
+    repository = InMemoryRepository()
+    comm_service = RecordingCommService()
+    registry = StateMachineRegistry(repository, max_games=2)
+
+    # When
+    game_ids = [play_game(repository, comm_service, 5 + i, registry) for i in range(3)]
+
+    # Then
+    for game_id in game_ids:
+        assert repository.get_game(game_id).status == GameStatus.Finished
+    assert registry.misses == 3
+    assert registry.evictions == 1
+    assert registry.hit_rate > 0.9
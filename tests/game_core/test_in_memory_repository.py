@@ -0,0 +1,298 @@
+import threading
+
+import pytest
+
+from game_core.constants.event_type import EventType
+from game_core.constants.game_status import GameStatus
+from game_core.constants.role import Role
+from game_core.constants.state_name import StateName
+from game_core.constants.vote_result import VoteResult
+from game_core.exceptions import ConcurrentModificationError, DuplicateVoteError
+from game_core.in_memory_repository import InMemoryRepository
+
+TIMESTAMP = "2024-01-01T00:00:00"
+
+
+@pytest.fixture
+def repository():
+    return InMemoryRepository()
+
+
+@pytest.fixture
+def game(repository):
+    return repository.put_game()
+
+
+def test_put_game(repository):
+    # Given
+    # When
+    game = repository.put_game()
+
+    # Then
+    assert repository.get_game(game.id) == game
+    assert game.status == GameStatus.NotStarted
+    assert game.state == StateName.GameSetup
+    assert game.version == 0
+
+
+def test_get_game_not_found(repository):
+    # Given
+    # When
+    with pytest.raises(ValueError):
+        repository.get_game("game_id")
+
+    # Then
+
+
+def test_entities_are_copied(repository, game):
+    # Given
+    player = repository.put_player("player_id", game.id, "name", "secret")
+
+    # When
+    player.known_player_ids.append("other_player_id")
+    repository.get_player(player.id).name = "other_name"
+
+    # Then
+    assert repository.get_player(player.id).known_player_ids == []
+    assert repository.get_player(player.id).name == "name"
+
+
+def test_update_game_checks_version(repository, game):
+    # Given
+    stale_game = repository.get_game(game.id)
+    game.state = StateName.TeamSelection
+    repository.update_game(game)
+
+    # When
+    with pytest.raises(ConcurrentModificationError):
+        repository.update_game(stale_game)
+
+    # Then
+    assert repository.get_game(game.id).state == StateName.TeamSelection
+    assert repository.get_game(game.id).version == 1
+
+
+def test_get_players_in_sort_key_order(repository, game):
+    # Given
+    for player_id in ["c", "a", "b"]:
+        repository.put_player(player_id, game.id, f"name_{player_id}", "secret")
+    repository.put_quest(game.id, 1)
+
+    # When
+    players = repository.get_players(game.id)
+
+    # Then
+    assert [p.id for p in players] == [f"{game.id}_player_{p}" for p in ["a", "b", "c"]]
+
+
+def test_get_rounds_and_votes(repository, game):
+    # Given
+    repository.put_quest(game.id, 1)
+    game_round = repository.put_round(game.id, 1, 1, "leader_id")
+    repository.put_round(game.id, 1, 2, "leader_id")
+    game_round.team_member_ids = ["player_id1"]
+    repository.update_round(game_round)
+
+    # When
+    repository.put_round_vote(game.id, 1, 1, "player_id1", VoteResult.Pass)
+    repository.put_round_vote(game.id, 1, 1, "player_id2", VoteResult.Fail)
+    repository.put_round_vote(game.id, 1, 2, "player_id1", VoteResult.Pass)
+    repository.put_quest_vote(game.id, 1, "player_id1", False)
+
+    # Then
+    assert [(r.quest_number, r.round_number) for r in repository.get_rounds(game.id)] == [(1, 1), (1, 2)]
+    assert [v.player_id for v in repository.get_round_votes(game.id, 1, 1)] == ["player_id1", "player_id2"]
+    res_round = repository.get_round(game.id, 1, 1)
+    assert res_round.team_member_ids == ["player_id1"]
+    assert (res_round.votes_cast, res_round.votes_pass, res_round.votes_fail) == (2, 1, 1)
+    res_quest = repository.get_quest(game.id, 1)
+    assert (res_quest.votes_cast, res_quest.votes_pass, res_quest.votes_fail) == (1, 0, 1)
+
+
+def test_update_round_keeps_vote_counters(repository, game):
+    # Given
+    game_round = repository.put_round(game.id, 1, 1, "leader_id")
+    repository.put_round_vote(game.id, 1, 1, "player_id1", VoteResult.Pass)
+
+    # When
+    game_round.result = VoteResult.Pass
+    repository.update_round(game_round)
+
+    # Then
+    res = repository.get_round(game.id, 1, 1)
+    assert res.result == VoteResult.Pass
+    assert res.votes_cast == 1
+
+
+def test_put_vote_twice(repository, game):
+    # Given
+    repository.put_quest(game.id, 1)
+    repository.put_quest_vote(game.id, 1, "player_id1", True)
+
+    # When
+    with pytest.raises(DuplicateVoteError):
+        repository.put_quest_vote(game.id, 1, "player_id1", False)
+
+    # Then
+    assert repository.get_quest(game.id, 1).votes_cast == 1
+
+
+def test_get_events(repository, game):
+    # Given
+    first_event = repository.put_event(game.id, EventType.QuestStarted, [], {}, TIMESTAMP)
+    repository.put_event(game.id, EventType.GameStarted, ["player_id2"], {}, TIMESTAMP)
+    last_event = repository.put_event(game.id, EventType.GameStarted, ["player_id1"], {}, TIMESTAMP)
+
+    # When
+    events = repository.get_events(game.id, "player_id1")
+    new_events = repository.get_events(game.id, "player_id1", since=first_event.id)
+
+    # Then
+    assert events == [first_event, last_event]
+    assert new_events == [last_event]
+
+
+def test_delete_events(repository, game):
+    # Given
+    quest = repository.put_quest(game.id, 1)
+    repository.put_event(game.id, EventType.QuestStarted, [], {}, TIMESTAMP)
+    repository.put_event(game.id, EventType.GameStarted, ["player_id1"], {}, TIMESTAMP)
+
+    # When
+    repository.delete_events(game.id)
+
+    # Then
+    assert repository.get_events(game.id, "player_id1") == []
+    assert repository.get_quests(game.id) == [quest]
+
+
+def test_delete_game(repository, game):
+    # Given
+    repository.put_quest(game.id, 1)
+
+    # When
+    repository.delete_game(game.id)
+
+    # Then
+    with pytest.raises(ValueError):
+        repository.get_game(game.id)
+    assert repository.get_quests(game.id) == []
+
+
+def test_get_game_snapshot(repository, game):
+    # Given
+    player = repository.put_player("player_id", game.id, "name", "secret")
+    quest = repository.put_quest(game.id, 1)
+    game_round = repository.put_round(game.id, 1, 1, "leader_id")
+    repository.put_event(game.id, EventType.QuestStarted, [], {}, TIMESTAMP)
+
+    # When
+    snapshot = repository.get_game_snapshot(game.id)
+
+    # Then
+    assert snapshot.game == game
+    assert snapshot.players == [player]
+    assert snapshot.quests == [quest]
+    assert snapshot.rounds == [game_round]
+    assert snapshot.round_votes == []
+
+
+def test_unit_of_work_undoes_writes_on_error(repository, game):
+    # Given
+    repository.put_quest(game.id, 1)
+
+    # When
+    with pytest.raises(RuntimeError):
+        with repository.unit_of_work():
+            quest = repository.get_quest(game.id, 1)
+            quest.result = VoteResult.Fail
+            repository.update_quest(quest)
+            repository.put_quest(game.id, 2)
+            repository.update_game(game)
+            raise RuntimeError("action failed")
+
+    # Then
+    assert [q.result for q in repository.get_quests(game.id)] == [None]
+    assert repository.get_game(game.id).version == 0
+
+
+def test_unit_of_work_is_isolated(repository, game):
+    # Given
+    repository.put_quest(game.id, 1)
+    in_unit_of_work = threading.Event()
+    results = []
+
+    def read_quests():
+        in_unit_of_work.wait()
+        results.append(len(repository.get_quests(game.id)))
+
+    reader = threading.Thread(target=read_quests)
+    reader.start()
+
+    # When
+    with repository.unit_of_work():
+        repository.put_quest(game.id, 2)
+        in_unit_of_work.set()
+        reader.join(timeout=0.1)
+        repository.put_quest(game.id, 3)
+    reader.join()
+
+    # Then
+    assert results == [3]
+
+
+def test_units_of_work_of_different_games_are_concurrent(repository, game):
+    # Given
+    other_game = repository.put_game()
+    results = []
+
+    def put_quest():
+        with repository.unit_of_work():
+            results.append(repository.put_quest(other_game.id, 1).quest_number)
+
+    writer = threading.Thread(target=put_quest, daemon=True)
+
+    # When
+    with repository.unit_of_work():
+        repository.put_quest(game.id, 1)
+        writer.start()
+        writer.join(timeout=5)
+
+    # Then
+    assert not writer.is_alive()
+    assert results == [1]
+
+
+def test_unit_of_work_releases_locks(repository, game):
+    # Given
+    with repository.unit_of_work():
+        repository.get_game(game.id)
+        repository.put_quest(game.id, 1)
+    reader = threading.Thread(target=repository.get_quests, args=(game.id,), daemon=True)
+
+    # When
+    reader.start()
+    reader.join(timeout=5)
+
+    # Then
+    assert not reader.is_alive()
+
+
+def test_update_players_and_put_events(repository, game):
+    # Given
+    players = [repository.put_player(player_id, game.id, f"name_{player_id}", "secret") for player_id in ["a", "b"]]
+    for player in players:
+        player.role = Role.Merlin
+
+    # When
+    repository.update_players(players)
+    events = repository.put_events(
+        game.id,
+        [(EventType.GameStarted, [player.id], {"role": Role.Merlin.value}) for player in players],
+        TIMESTAMP,
+    )
+
+    # Then
+    assert repository.get_players(game.id) == players
+    assert [event.recipients for event in events] == [[player.id] for player in players]
+    assert repository.get_events(game.id, players[1].id) == [events[1]]
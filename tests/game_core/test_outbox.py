@@ -0,0 +1,117 @@
+import random
+from queue import Queue
+
+import pytest
+
+from game_core.comm_service import CommService
+from game_core.constants.event_type import EventType
+from game_core.entities.event import Event
+from game_core.exceptions import DeliveryError
+from game_core.in_memory_repository import InMemoryRepository
+from game_core.outbox import DeliveryWorker, OutboxCommService
+from tests.game_core.test_game_simulation import RecordingCommService, play_game
+
+GAME_ID = "game_id"
+TIMESTAMP = "2024-01-01T00:00:00"
+
+
+@pytest.fixture
+def comm_service(mocker):
+    return mocker.MagicMock(spec=CommService)
+
+
+@pytest.fixture
+def sleep(mocker):
+    return mocker.Mock()
+
+
+@pytest.fixture
+def delivery_worker(comm_service, sleep):
+    return DeliveryWorker(comm_service, max_attempts=3, base_delay=0.5, sleep=sleep)
+
+
+def make_event(event_id: str, recipients: list[str]) -> Event:
+    return Event(event_id, GAME_ID, EventType.RoundVoteCast, recipients, {}, TIMESTAMP)
+
+
+def test_outbox_comm_service_puts_messages_on_queue():
+    # Given
+    queue = Queue()
+    outbox_comm_service = OutboxCommService(queue)
+    public_event = make_event("event_id1", [])
+    private_event = make_event("event_id2", ["player_id1"])
+
+    # When
+    outbox_comm_service.send_batch([(None, public_event), ("player_id1", private_event)])
+
+    # Then
+    assert [queue.get_nowait(), queue.get_nowait()] == [(None, public_event), ("player_id1", private_event)]
+    assert queue.empty()
+
+
+def test_deliver(delivery_worker, comm_service, sleep):
+    # Given
+    messages = [(None, make_event("event_id1", []))]
+
+    # When
+    delivery_worker.deliver(messages)
+
+    # Then
+    comm_service.send_batch.assert_called_once_with(messages)
+    sleep.assert_not_called()
+
+
+def test_deliver_retries_with_backoff(delivery_worker, comm_service, sleep):
+    # Given
+    messages = [(None, make_event("event_id1", []))]
+    comm_service.send_batch.side_effect = [RuntimeError("throttled"), RuntimeError("throttled"), None]
+
+    # When
+    delivery_worker.deliver(messages)
+
+    # Then
+    assert comm_service.send_batch.call_count == 3
+    assert [c.args[0] for c in sleep.call_args_list] == [0.5, 1.0]
+
+
+def test_deliver_gives_up_after_max_attempts(delivery_worker, comm_service, sleep):
+    # Given
+    comm_service.send_batch.side_effect = RuntimeError("throttled")
+
+    # When
+    with pytest.raises(RuntimeError):
+        delivery_worker.deliver([(None, make_event("event_id1", []))])
+
+    # Then
+    assert comm_service.send_batch.call_count == 3
+
+
+def test_deliver_retries_undelivered_messages(delivery_worker, comm_service, sleep):
+    # Given
+    undelivered = [("player_id2", make_event("event_id1", []))]
+    messages = [(None, make_event("event_id1", []))]
+    comm_service.send_batch.side_effect = [DeliveryError("throttled", undelivered), None]
+
+    # When
+    delivery_worker.deliver(messages)
+
+    # Then
+    assert [c.args[0] for c in comm_service.send_batch.call_args_list] == [messages, undelivered]
+
+
+def test_drain_delivers_game_events():
+    # Given
+    random.seed(0)
+    queue = Queue()
+    repository = InMemoryRepository()
+    game_id = play_game(repository, OutboxCommService(queue), number_of_players=5)
+    recording_comm_service = RecordingCommService()
+
+    # When
+    delivered = DeliveryWorker(recording_comm_service).drain(queue)
+
+    # Then
+    assert delivered == len(recording_comm_service.events)
+    assert queue.empty()
+    stored_event_ids = {event.id for event in repository.get_events(game_id, "admin")}
+    assert {event.id for event in recording_comm_service.events if not event.recipients} == stored_event_ids
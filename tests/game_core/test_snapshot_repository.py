@@ -0,0 +1,238 @@
+import pytest
+
+from game_core.constants.game_status import GameStatus
+from game_core.constants.role import Role
+from game_core.constants.state_name import StateName
+from game_core.constants.vote_result import VoteResult
+from game_core.entities.game import Game
+from game_core.entities.game_snapshot import GameSnapshot
+from game_core.entities.player import Player
+from game_core.entities.quest import Quest
+from game_core.entities.quest_vote import QuestVote
+from game_core.entities.round import Round
+from game_core.entities.round_vote import RoundVote
+from game_core.exceptions import DuplicateVoteError
+from game_core.repository import Repository
+from game_core.snapshot_repository import SnapshotRepository
+
+GAME_ID = "game_id"
+OTHER_GAME_ID = "other_game_id"
+PLAYER_ID = f"{GAME_ID}_player_player_id"
+QUEST_NUMBER = 2
+ROUND_NUMBER = 3
+
+
+@pytest.fixture
+def repository(mocker):
+    return mocker.MagicMock(spec=Repository)
+
+
+@pytest.fixture
+def game():
+    return Game(GAME_ID, GameStatus.InProgress, StateName.RoundVoting, None, [PLAYER_ID], None, None)
+
+
+@pytest.fixture
+def snapshot(game):
+    return GameSnapshot(
+        game=game,
+        players=[Player(PLAYER_ID, GAME_ID, "name", "secret")],
+        quests=[Quest(f"{GAME_ID}_quest_{QUEST_NUMBER}", GAME_ID, QUEST_NUMBER)],
+        rounds=[
+            Round(
+                f"{GAME_ID}_round_{QUEST_NUMBER}_{ROUND_NUMBER}",
+                GAME_ID,
+                QUEST_NUMBER,
+                ROUND_NUMBER,
+                PLAYER_ID,
+                [],
+            )
+        ],
+    )
+
+
+@pytest.fixture
+def snapshot_repository(repository, snapshot):
+    repository.get_game_snapshot.return_value = snapshot
+    snapshot_repository = SnapshotRepository(repository)
+    snapshot_repository.load(GAME_ID)
+    return snapshot_repository
+
+
+def test_load(snapshot_repository, repository, snapshot):
+    # Given
+    # When
+    res = snapshot_repository.get_game_snapshot(GAME_ID)
+
+    # Then
+    repository.get_game_snapshot.assert_called_once_with(GAME_ID)
+    assert res == snapshot
+
+
+def test_reads_are_served_from_snapshot(snapshot_repository, repository, snapshot, game):
+    # Given
+    # When
+    res_game = snapshot_repository.get_game(GAME_ID)
+    res_players = snapshot_repository.get_players(GAME_ID)
+    res_player = snapshot_repository.get_player(PLAYER_ID)
+    res_quest = snapshot_repository.get_quest(GAME_ID, QUEST_NUMBER)
+    res_rounds = snapshot_repository.get_rounds(GAME_ID)
+    res_round = snapshot_repository.get_round(GAME_ID, QUEST_NUMBER, ROUND_NUMBER)
+    res_round_votes = snapshot_repository.get_round_votes(GAME_ID, QUEST_NUMBER, ROUND_NUMBER)
+
+    # Then
+    assert res_game == game
+    assert res_players == snapshot.players
+    assert res_players is not snapshot.players
+    assert res_player == snapshot.players[0]
+    assert res_quest == snapshot.quests[0]
+    assert res_rounds == snapshot.rounds
+    assert res_round == snapshot.rounds[0]
+    assert res_round_votes == []
+    repository.get_game.assert_not_called()
+    repository.get_players.assert_not_called()
+    repository.get_player.assert_not_called()
+    repository.get_quest.assert_not_called()
+    repository.get_rounds.assert_not_called()
+    repository.get_round.assert_not_called()
+    repository.get_round_votes.assert_not_called()
+
+
+def test_reads_are_counted(snapshot_repository, repository):
+    # Given
+    # When
+    snapshot_repository.get_game(GAME_ID)
+    snapshot_repository.get_quest(GAME_ID, QUEST_NUMBER)
+    snapshot_repository.get_round(GAME_ID, QUEST_NUMBER, ROUND_NUMBER)
+    snapshot_repository.get_game(OTHER_GAME_ID)
+
+    # Then
+    assert (snapshot_repository.hits, snapshot_repository.misses) == (3, 2)
+    assert snapshot_repository.hit_rate == 3 / 5
+
+
+def test_get_missing_item_raises(snapshot_repository):
+    # Given
+    # When
+    with pytest.raises(ValueError):
+        snapshot_repository.get_round(GAME_ID, QUEST_NUMBER, ROUND_NUMBER + 1)
+
+    # Then
+
+
+def test_reads_of_other_game_are_delegated(snapshot_repository, repository):
+    # Given
+    # When
+    snapshot_repository.get_players(OTHER_GAME_ID)
+
+    # Then
+    repository.get_players.assert_called_once_with(OTHER_GAME_ID)
+
+
+def test_snapshots_of_several_games(snapshot_repository, repository, snapshot):
+    # Given
+    other_game = Game(OTHER_GAME_ID, GameStatus.NotStarted, StateName.GameSetup, None, [], None, None)
+    repository.get_game_snapshot.return_value = GameSnapshot(other_game)
+    snapshot_repository.load(OTHER_GAME_ID)
+
+    # When
+    snapshot_repository.unload(GAME_ID)
+
+    # Then
+    assert not snapshot_repository.is_loaded(GAME_ID)
+    assert snapshot_repository.is_loaded(OTHER_GAME_ID)
+    assert snapshot_repository.get_game(OTHER_GAME_ID) == other_game
+    snapshot_repository.get_game(GAME_ID)
+    repository.get_game.assert_called_once_with(GAME_ID)
+
+
+def test_writes_are_applied_to_snapshot(snapshot_repository, repository, snapshot):
+    # Given
+    round_vote = RoundVote("vote_id", GAME_ID, PLAYER_ID, QUEST_NUMBER, ROUND_NUMBER, VoteResult.Pass)
+    repository.put_round_vote.return_value = round_vote
+    updated_round = Round(
+        f"{GAME_ID}_round_{QUEST_NUMBER}_{ROUND_NUMBER}",
+        GAME_ID,
+        QUEST_NUMBER,
+        ROUND_NUMBER,
+        PLAYER_ID,
+        [PLAYER_ID],
+        VoteResult.Pass,
+    )
+    repository.update_round.return_value = updated_round
+
+    # When
+    snapshot_repository.put_round_vote(GAME_ID, QUEST_NUMBER, ROUND_NUMBER, PLAYER_ID, VoteResult.Pass)
+    snapshot_repository.update_round(updated_round)
+
+    # Then
+    repository.put_round_vote.assert_called_once_with(
+        GAME_ID, QUEST_NUMBER, ROUND_NUMBER, PLAYER_ID, VoteResult.Pass
+    )
+    repository.update_round.assert_called_once_with(updated_round)
+    assert snapshot_repository.get_round_votes(GAME_ID, QUEST_NUMBER, ROUND_NUMBER) == [round_vote]
+    assert snapshot_repository.get_round(GAME_ID, QUEST_NUMBER, ROUND_NUMBER) == updated_round
+    assert snapshot.rounds == [updated_round]
+
+
+def test_votes_are_counted_in_snapshot(snapshot_repository, repository):
+    # Given
+    repository.put_round_vote.return_value = RoundVote(
+        "vote_id", GAME_ID, PLAYER_ID, QUEST_NUMBER, ROUND_NUMBER, VoteResult.Fail
+    )
+    repository.put_quest_vote.return_value = QuestVote("vote_id", GAME_ID, PLAYER_ID, QUEST_NUMBER, VoteResult.Pass)
+
+    # When
+    snapshot_repository.put_round_vote(GAME_ID, QUEST_NUMBER, ROUND_NUMBER, PLAYER_ID, VoteResult.Fail)
+    snapshot_repository.put_quest_vote(GAME_ID, QUEST_NUMBER, PLAYER_ID, True)
+
+    # Then
+    game_round = snapshot_repository.get_round(GAME_ID, QUEST_NUMBER, ROUND_NUMBER)
+    quest = snapshot_repository.get_quest(GAME_ID, QUEST_NUMBER)
+    assert (game_round.votes_cast, game_round.votes_pass, game_round.votes_fail) == (1, 0, 1)
+    assert (quest.votes_cast, quest.votes_pass, quest.votes_fail) == (1, 1, 0)
+    repository.get_round.assert_not_called()
+    repository.get_quest.assert_not_called()
+
+
+def test_put_round_vote_twice(snapshot_repository, repository):
+    # Given
+    repository.put_round_vote.return_value = RoundVote(
+        "vote_id", GAME_ID, PLAYER_ID, QUEST_NUMBER, ROUND_NUMBER, VoteResult.Pass
+    )
+    snapshot_repository.put_round_vote(GAME_ID, QUEST_NUMBER, ROUND_NUMBER, PLAYER_ID, VoteResult.Pass)
+
+    # When
+    with pytest.raises(DuplicateVoteError):
+        snapshot_repository.put_round_vote(GAME_ID, QUEST_NUMBER, ROUND_NUMBER, PLAYER_ID, VoteResult.Fail)
+
+    # Then
+    repository.put_round_vote.assert_called_once()
+    assert snapshot_repository.get_round(GAME_ID, QUEST_NUMBER, ROUND_NUMBER).votes_cast == 1
+
+
+def test_unit_of_work_drops_snapshot_on_error(snapshot_repository, repository):
+    # Given
+    # When
+    with pytest.raises(RuntimeError):
+        with snapshot_repository.unit_of_work():
+            raise RuntimeError("action failed")
+    snapshot_repository.get_players(GAME_ID)
+
+    # Then
+    repository.unit_of_work.assert_called_once_with()
+    repository.get_players.assert_called_once_with(GAME_ID)
+
+
+def test_update_players_are_applied_to_snapshot(snapshot_repository, repository, snapshot):
+    # Given
+    updated_player = Player(PLAYER_ID, GAME_ID, "name", "secret", Role.Merlin)
+    repository.update_players.return_value = [updated_player]
+
+    # When
+    snapshot_repository.update_players([updated_player])
+
+    # Then
+    repository.update_players.assert_called_once_with([updated_player])
+    repository.update_player.assert_not_called()
+    assert snapshot.players == [updated_player]
@@ -1,12 +1,16 @@
 import pytest
 
 from game_core.constants.action_type import ActionType
+from game_core.constants.event_type import EventType
 from game_core.constants.state_name import StateName
 from game_core.entities.action import Action
+from game_core.entities.event import Event
 from game_core.entities.game import Game
+from game_core.entities.game_snapshot import GameSnapshot
+from game_core.exceptions import ConcurrentModificationError
 from game_core.repository import Repository
 from game_core.comm_service import CommService
-from game_core.state_machine import StateMachine
+from game_core.state_machine import MAX_ACTION_ATTEMPTS, StateMachine
 from game_core.states.end_game_state import EndGameState
 from game_core.states.game_setup_state import GameSetupState
 from game_core.states.quest_voting_state import QuestVotingState
@@ -31,8 +35,9 @@ def repository(mocker):
 @pytest.fixture
 def state_machine(mocker, comm_service, repository):
     game = mocker.MagicMock(spec=Game)
+    game.id = GAME_ID
     game.state = StateName.GameSetup
-    repository.get_game.return_value = game
+    repository.get_game_snapshot.return_value = GameSnapshot(game)
     return StateMachine(comm_service, repository, GAME_ID)
 
 
@@ -54,16 +59,32 @@ def action():
 def test_setup_states(mocker, comm_service, repository, state_name, expected_state):
     # Given
     game = mocker.MagicMock(spec=Game)
+    game.id = GAME_ID
     game.state = state_name
-    repository.get_game.return_value = game
+    repository.get_game_snapshot.return_value = GameSnapshot(game)
 
     # When
     state_machine = StateMachine(comm_service, repository, GAME_ID)
 
     # Then
+    repository.get_game_snapshot.assert_called_once_with(GAME_ID)
+    repository.get_game.assert_not_called()
     assert isinstance(state_machine._current_state, expected_state)
 
 
+def test_build_states(state_machine):
+    # Given
+    states = state_machine.state_name_map
+
+    # When
+    team_selection_state = states[StateName.TeamSelection]
+
+    # Then
+    # entering team selection moves on to the end of the game once a team has won a majority of the quests
+    assert team_selection_state._round_voting_state is states[StateName.RoundVoting]
+    assert team_selection_state._end_game_state is states[StateName.EndGame]
+
+
 def test_handle_action_with_invalid_payload(mocker, action, state_machine):
     # Given
     action.payload = None
@@ -77,7 +98,7 @@ def test_handle_action_with_invalid_payload(mocker, action, state_machine):
     state_machine._current_state.handle.assert_not_called()
 
 
-def test_handle_action(mocker, action, state_machine):
+def test_handle_action(mocker, action, repository, state_machine):
     # Given
     mock_current_state = mocker.MagicMock()
     mock_next_state = mocker.MagicMock()
@@ -89,10 +110,11 @@ def test_handle_action(mocker, action, state_machine):
     state_machine.handle_action(action)
 
     # Then
+    repository.unit_of_work.assert_called_once_with()
     mock_current_state.handle.assert_called_once_with(action)
     mock_current_state.on_exit.assert_called_once_with(GAME_ID)
     mock_next_state.on_enter.assert_called_once_with(GAME_ID)
-    state_machine._current_state = mock_next_state
+    assert state_machine._current_state == mock_next_state
 
 
 def test_handle_action_with_transient_state(mocker, action, state_machine):
@@ -102,6 +124,7 @@ def test_handle_action_with_transient_state(mocker, action, state_machine):
     mock_current_state.handle.return_value = mock_next_state
     mock_third_state = mocker.MagicMock()
     mock_next_state.on_enter.return_value = mock_third_state
+    mock_third_state.on_enter.return_value = None
     state_machine._current_state = mock_current_state
 
     # When
@@ -111,4 +134,121 @@ def test_handle_action_with_transient_state(mocker, action, state_machine):
     mock_current_state.handle.assert_called_once_with(action)
     mock_current_state.on_exit.assert_called_once_with(GAME_ID)
     mock_next_state.on_enter.assert_called_once_with(GAME_ID)
-    state_machine._current_state = mock_third_state
+    mock_next_state.on_exit.assert_called_once_with(GAME_ID)
+    mock_third_state.on_enter.assert_called_once_with(GAME_ID)
+    assert state_machine._current_state == mock_third_state
+
+
+def test_handle_action_when_game_ended(mocker, action, state_machine):
+    # Given
+    mock_current_state = mocker.MagicMock()
+    mock_current_state.handle.return_value = None
+    state_machine._current_state = mock_current_state
+
+    # When
+    state_machine.handle_action(action)
+
+    # Then
+    mock_current_state.on_exit.assert_not_called()
+    assert state_machine._current_state == mock_current_state
+
+
+def test_handle_action_with_state_staying_on_enter(mocker, action, state_machine):
+    # Given
+    mock_current_state = mocker.MagicMock()
+    mock_next_state = mocker.MagicMock()
+    mock_current_state.handle.return_value = mock_next_state
+    mock_next_state.on_enter.return_value = mock_next_state
+    state_machine._current_state = mock_current_state
+
+    # When
+    state_machine.handle_action(action)
+
+    # Then
+    mock_next_state.on_enter.assert_called_once_with(GAME_ID)
+    mock_next_state.on_exit.assert_not_called()
+    assert state_machine._current_state == mock_next_state
+
+
+def test_handle_action_retries_on_concurrent_modification(mocker, action, repository, state_machine):
+    # Given
+    mock_current_state = mocker.MagicMock()
+    mock_current_state.handle.return_value = mock_current_state
+    state_machine._current_state = mock_current_state
+    setup_states = mocker.patch.object(state_machine, "_setup_states")
+    repository.update_game.side_effect = [ConcurrentModificationError("game_id was modified"), None]
+
+    # When
+    state_machine.handle_action(action)
+
+    # Then
+    setup_states.assert_called_once_with()
+    assert mock_current_state.handle.call_count == 2
+    assert repository.update_game.call_count == 2
+
+
+def test_handle_action_gives_up_after_max_attempts(mocker, action, repository, state_machine):
+    # Given
+    mock_current_state = mocker.MagicMock()
+    mock_current_state.handle.return_value = mock_current_state
+    state_machine._current_state = mock_current_state
+    mocker.patch.object(state_machine, "_setup_states")
+    repository.update_game.side_effect = ConcurrentModificationError("game_id was modified")
+
+    # When
+    with pytest.raises(ConcurrentModificationError):
+        state_machine.handle_action(action)
+
+    # Then
+    assert mock_current_state.handle.call_count == MAX_ACTION_ATTEMPTS
+
+
+def test_handle_action_sends_events_once_saved(mocker, action, comm_service, repository, state_machine):
+    # Given
+    events = [Event(f"event_id{i}", GAME_ID, EventType.RoundVoteCast, [], {}, "timestamp") for i in range(2)]
+    mock_current_state = mocker.MagicMock()
+    mock_current_state.handle.side_effect = lambda _: state_machine._comm_service.broadcast(
+        events[mock_current_state.handle.call_count - 1]
+    )
+    state_machine._current_state = mock_current_state
+    mocker.patch.object(state_machine, "_setup_states")
+    repository.update_game.side_effect = [ConcurrentModificationError("game_id was modified"), None]
+
+    # When
+    state_machine.handle_action(action)
+
+    # Then
+    comm_service.broadcast.assert_not_called()
+    comm_service.send_batch.assert_called_once_with([(None, events[1])])
+
+
+def test_handle_action_sends_no_events_on_error(mocker, action, comm_service, repository, state_machine):
+    # Given
+    mock_current_state = mocker.MagicMock()
+    mock_current_state.handle.side_effect = lambda _: state_machine._comm_service.broadcast(
+        Event("event_id", GAME_ID, EventType.RoundVoteCast, [], {}, "timestamp")
+    )
+    state_machine._current_state = mock_current_state
+    repository.update_game.side_effect = ValueError("invalid game")
+
+    # When
+    with pytest.raises(ValueError):
+        state_machine.handle_action(action)
+
+    # Then
+    comm_service.send_batch.assert_not_called()
+
+
+def test_handle_action_reloads_unloaded_game(mocker, action, repository, state_machine):
+    # Given
+    state_machine.unload()
+    setup_states = mocker.patch.object(state_machine, "_setup_states")
+    mock_current_state = mocker.MagicMock()
+    mock_current_state.handle.return_value = mock_current_state
+    state_machine._current_state = mock_current_state
+
+    # When
+    state_machine.handle_action(action)
+
+    # Then
+    setup_states.assert_called_once_with()
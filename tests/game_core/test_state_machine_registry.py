@@ -0,0 +1,174 @@
+import pytest
+
+from game_core.comm_service import CommService
+from game_core.constants.action_type import ActionType
+from game_core.constants.state_name import StateName
+from game_core.entities.action import Action
+from game_core.in_memory_repository import InMemoryRepository
+from game_core.state_machine_registry import StateMachineRegistry
+
+IDLE_TIMEOUT = 60.0
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def comm_service(mocker):
+    return mocker.MagicMock(spec=CommService)
+
+
+@pytest.fixture
+def repository(mocker):
+    repository = InMemoryRepository()
+    mocker.spy(repository, "get_game_snapshot")
+    return repository
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def registry(repository, clock):
+    return StateMachineRegistry(repository, max_games=2, idle_timeout=IDLE_TIMEOUT, clock=clock)
+
+
+def join_game(game_id: str, player_id: str) -> Action:
+    return Action(f"action_{player_id}", game_id, player_id, ActionType.JoinGame, {"name": f"name_{player_id}"})
+
+
+def test_get(registry, repository, comm_service):
+    # Given
+    game_id = repository.put_game().id
+    state_machine = registry.get(game_id, comm_service)
+
+    # When
+    res = registry.get(game_id, comm_service)
+
+    # Then
+    assert res is state_machine
+    repository.get_game_snapshot.assert_called_once_with(game_id)
+    assert registry.metrics == {"games": 1, "hits": 1, "misses": 1, "hit_rate": 0.5, "evictions": 0}
+
+
+def test_state_machines_do_not_share_buffers(registry, repository, comm_service):
+    # Given
+    game_ids = [repository.put_game().id for _ in range(2)]
+
+    # When
+    state_machines = [registry.get(game_id, comm_service) for game_id in game_ids]
+
+    # Then
+    assert state_machines[0] is not state_machines[1]
+    assert state_machines[0]._repository is not state_machines[1]._repository
+    assert state_machines[0]._comm_service is not state_machines[1]._comm_service
+
+
+def test_handle_action(registry, repository, comm_service):
+    # Given
+    game_ids = [repository.put_game().id for _ in range(2)]
+
+    # When
+    for player_id in ["player_id1", "player_id2"]:
+        for game_id in game_ids:
+            registry.handle_action(join_game(game_id, player_id), comm_service)
+
+    # Then
+    for game_id in game_ids:
+        assert [player.name for player in repository.get_players(game_id)] == ["name_player_id1", "name_player_id2"]
+        assert repository.get_game(game_id).state == StateName.GameSetup
+    assert repository.get_game_snapshot.call_count == 2
+    assert comm_service.send_batch.call_count == 4
+
+
+def test_least_recently_used_game_is_evicted(registry, repository, comm_service):
+    # Given
+    game_ids = [repository.put_game().id for _ in range(3)]
+    registry.get(game_ids[0], comm_service)
+    registry.get(game_ids[1], comm_service)
+    registry.get(game_ids[0], comm_service)
+
+    # When
+    registry.get(game_ids[2], comm_service)
+    registry.get(game_ids[0], comm_service)
+    registry.get(game_ids[1], comm_service)
+
+    # Then
+    assert registry.metrics == {"games": 2, "hits": 2, "misses": 4, "hit_rate": 2 / 6, "evictions": 2}
+    assert repository.get_game_snapshot.call_count == 4
+
+
+def test_evicted_game_is_evicted_from_repository(mocker, registry, repository, comm_service):
+    # Given
+    evict = mocker.spy(repository, "evict")
+    game_ids = [repository.put_game().id for _ in range(3)]
+
+    # When
+    for game_id in game_ids:
+        registry.get(game_id, comm_service)
+
+    # Then
+    evict.assert_called_once_with(game_ids[0])
+
+
+def test_idle_game_is_evicted(registry, repository, comm_service, clock):
+    # Given
+    game_ids = [repository.put_game().id for _ in range(2)]
+    registry.get(game_ids[0], comm_service)
+    clock.now = IDLE_TIMEOUT / 2
+    registry.get(game_ids[1], comm_service)
+
+    # When
+    clock.now = IDLE_TIMEOUT
+    registry.evict_idle()
+
+    # Then
+    assert registry.metrics["games"] == 1
+    assert registry.evictions == 1
+    registry.get(game_ids[1], comm_service)
+    assert registry.hits == 1
+
+
+def test_failed_action_reloads_game(registry, repository, comm_service):
+    # Given
+    game_id = repository.put_game().id
+    registry.handle_action(join_game(game_id, "player_id1"), comm_service)
+
+    # When
+    with pytest.raises(ValueError):
+        registry.handle_action(Action("action_id", game_id, "player_id1", ActionType.CastRoundVote, {}), comm_service)
+    registry.handle_action(join_game(game_id, "player_id2"), comm_service)
+
+    # Then
+    assert repository.get_game_snapshot.call_count == 2
+    assert len(repository.get_players(game_id)) == 2
+
+
+def test_game_is_reloaded_when_not_exclusive(repository, comm_service):
+    # Given
+    registry = StateMachineRegistry(repository, exclusive=False)
+    game_id = repository.put_game().id
+
+    # When
+    registry.handle_action(join_game(game_id, "player_id1"), comm_service)
+    registry.handle_action(join_game(game_id, "player_id2"), comm_service)
+
+    # Then
+    assert (registry.hits, registry.misses) == (0, 2)
+    assert repository.get_game_snapshot.call_count == 2
+
+
+def test_max_games_must_be_positive(repository):
+    # Given
+    # When
+    with pytest.raises(ValueError):
+        StateMachineRegistry(repository, max_games=0)
+
+    # Then
@@ -0,0 +1,180 @@
+import random
+
+import pytest
+
+from game_core.constants.event_type import EventType
+from game_core.constants.state_name import StateName
+from game_core.in_memory_repository import InMemoryRepository
+from game_core.write_behind_repository import WriteBehindRepository
+from tests.game_core.test_game_simulation import RecordingCommService, play_game
+
+TIMESTAMP = "2024-01-01T00:00:00"
+
+
+@pytest.fixture
+def backing_repository():
+    return InMemoryRepository()
+
+
+@pytest.fixture
+def repository(backing_repository):
+    return WriteBehindRepository(backing_repository)
+
+
+def test_writes_are_flushed(repository, backing_repository):
+    # Given
+    game = repository.put_game()
+    with repository.unit_of_work():
+        repository.put_player("player_id", game.id, "name", "secret")
+        game.state = StateName.TeamSelection
+        repository.update_game(game)
+    repository.put_event(game.id, EventType.PlayerJoined, [], {}, TIMESTAMP)
+
+    # When
+    flushed = repository.flush()
+
+    # Then
+    assert flushed == 2
+    assert repository.pending_writes == 0
+    assert backing_repository.get_game_snapshot(game.id) == repository.get_game_snapshot(game.id)
+    assert backing_repository.get_game(game.id).version == 1
+    assert len(backing_repository.get_events(game.id, "player_id")) == 1
+
+
+def test_writes_are_flushed_in_batches(mocker, backing_repository):
+    # Given
+    repository = WriteBehindRepository(backing_repository, flush_batch_size=2)
+    game = repository.put_game()
+    for quest_number in range(1, 4):
+        repository.put_quest(game.id, quest_number)
+    unit_of_work = mocker.spy(backing_repository, "unit_of_work")
+
+    # When
+    flushed = repository.flush()
+
+    # Then
+    assert flushed == 3
+    assert unit_of_work.call_count == 2
+    assert [quest.quest_number for quest in backing_repository.get_quests(game.id)] == [1, 2, 3]
+
+
+def test_writes_wait_for_flush(repository, backing_repository):
+    # Given
+    game = repository.put_game()
+
+    # When
+    repository.put_quest(game.id, 1)
+
+    # Then
+    assert [quest.quest_number for quest in repository.get_quests(game.id)] == [1]
+    assert backing_repository.get_quests(game.id) == []
+    assert repository.pending_writes == 1
+
+
+def test_failed_unit_of_work_is_not_flushed(repository, backing_repository):
+    # Given
+    game = repository.put_game()
+
+    # When
+    with pytest.raises(RuntimeError):
+        with repository.unit_of_work():
+            repository.put_quest(game.id, 1)
+            raise RuntimeError("action failed")
+    repository.flush()
+
+    # Then
+    assert repository.get_quests(game.id) == []
+    assert backing_repository.get_quests(game.id) == []
+
+
+def test_games_are_loaded_from_repository(backing_repository):
+    # Given
+    game = backing_repository.put_game()
+    backing_repository.put_player("player_id", game.id, "name", "secret")
+    backing_repository.put_quest(game.id, 1)
+    backing_repository.put_quest_vote(game.id, 1, "player_id", True)
+    repository = WriteBehindRepository(backing_repository)
+
+    # When
+    snapshot = repository.get_game_snapshot(game.id)
+    repository.put_quest(game.id, 2)
+    repository.flush()
+
+    # Then
+    assert [player.name for player in snapshot.players] == ["name"]
+    assert [quest.votes_cast for quest in snapshot.quests] == [1]
+    assert [quest.quest_number for quest in backing_repository.get_quests(game.id)] == [1, 2]
+    assert backing_repository.get_quest(game.id, 1).votes_cast == 1
+
+
+def test_failed_flush_is_retried(mocker, repository, backing_repository):
+    # Given
+    game = repository.put_game()
+    repository.put_quest(game.id, 1)
+    mocker.patch.object(backing_repository, "put_quest", side_effect=[RuntimeError("database is locked")])
+
+    # When
+    with pytest.raises(RuntimeError):
+        repository.flush()
+    mocker.stopall()
+    flushed = repository.flush()
+
+    # Then
+    assert flushed == 1
+    assert [quest.quest_number for quest in backing_repository.get_quests(game.id)] == [1]
+
+
+def test_flushed_events_are_dropped_from_memory(repository, backing_repository):
+    # Given
+    game = repository.put_game()
+    event = repository.put_event(game.id, EventType.PlayerJoined, [], {}, TIMESTAMP)
+
+    # When
+    repository.flush()
+
+    # Then
+    assert repository._memory.get_events(game.id, "player_id") == []
+    assert [e.type for e in repository.get_events(game.id, "player_id")] == [event.type]
+
+
+def test_evict(mocker, repository, backing_repository):
+    # Given
+    game = repository.put_game()
+    repository.put_quest(game.id, 1)
+    get_game_snapshot = mocker.spy(backing_repository, "get_game_snapshot")
+
+    # When
+    repository.evict(game.id)
+
+    # Then
+    assert repository.pending_writes == 0
+    assert game.id not in repository._memory._partitions
+    assert [quest.quest_number for quest in repository.get_quests(game.id)] == [1]
+    get_game_snapshot.assert_called_once_with(game.id)
+
+
+def test_failed_evict_keeps_game(mocker, repository, backing_repository):
+    # Given
+    game = repository.put_game()
+    repository.put_quest(game.id, 1)
+    mocker.patch.object(backing_repository, "put_quest", side_effect=[RuntimeError("database is locked")])
+
+    # When
+    with pytest.raises(RuntimeError):
+        repository.evict(game.id)
+
+    # Then
+    assert repository.pending_writes == 1
+    assert [quest.quest_number for quest in repository.get_quests(game.id)] == [1]
+
+
+def test_play_game(repository, backing_repository):
+    # Given
+    random.seed(1)
+
+    # When
+    game_id = play_game(repository, RecordingCommService(), number_of_players=7)
+    repository.flush()
+
+    # Then
+    assert backing_repository.get_game_snapshot(game_id) == repository.get_game_snapshot(game_id)
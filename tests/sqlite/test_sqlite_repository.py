@@ -0,0 +1,262 @@
+import random
+import threading
+
+import pytest
+
+from game_core.constants.event_type import EventType
+from game_core.constants.game_status import GameStatus
+from game_core.constants.role import Role
+from game_core.constants.state_name import StateName
+from game_core.constants.vote_result import VoteResult
+from game_core.entities.game import GameConfig
+from game_core.exceptions import ConcurrentModificationError, DuplicateVoteError
+from sqlite.sqlite_repository import SQLiteRepository
+from tests.game_core.test_game_simulation import RecordingCommService, play_game
+
+TIMESTAMP = "2024-01-01T00:00:00"
+
+
+@pytest.fixture
+def repository(tmp_path):
+    repository = SQLiteRepository(str(tmp_path / "avalon.db"))
+    yield repository
+    repository.close()
+
+
+@pytest.fixture
+def game(repository):
+    return repository.put_game()
+
+
+def test_put_game(repository):
+    # Given
+    # When
+    game = repository.put_game()
+
+    # Then
+    assert repository.get_game(game.id) == game
+    assert game.status == GameStatus.NotStarted
+    assert game.state == StateName.GameSetup
+    assert game.version == 0
+
+
+def test_get_game_not_found(repository):
+    # Given
+    # When
+    with pytest.raises(ValueError):
+        repository.get_game("game_id")
+
+    # Then
+
+
+def test_update_game(repository, game):
+    # Given
+    game.status = GameStatus.InProgress
+    game.state = StateName.TeamSelection
+    game.player_ids = ["player_id1", "player_id2"]
+    game.assassination_attempts = 1
+    game.config = GameConfig({1: 2, 2: 3}, [Role.Merlin.value], {Role.Merlin.value: []}, 1)
+    game.current_quest_number = 2
+    game.current_round_number = 3
+    game.leader_index = 0
+
+    # When
+    repository.update_game(game)
+
+    # Then
+    assert repository.get_game(game.id) == game
+    assert game.version == 1
+
+
+def test_update_game_checks_version(repository, game):
+    # Given
+    stale_game = repository.get_game(game.id)
+    game.state = StateName.TeamSelection
+    repository.update_game(game)
+
+    # When
+    with pytest.raises(ConcurrentModificationError):
+        repository.update_game(stale_game)
+
+    # Then
+    assert repository.get_game(game.id).state == StateName.TeamSelection
+    assert repository.get_game(game.id).version == 1
+
+
+def test_update_player(repository, game):
+    # Given
+    player = repository.put_player("player_id", game.id, "name", "secret")
+    player.role = Role.Merlin
+    player.known_player_ids = ["other_player_id"]
+
+    # When
+    repository.update_player(player)
+
+    # Then
+    assert repository.get_player(player.id) == player
+    assert repository.get_players(game.id) == [player]
+
+
+def test_update_players(repository, game):
+    # Given
+    players = [repository.put_player(player_id, game.id, f"name_{player_id}", "secret") for player_id in ["a", "b"]]
+    players[0].role = Role.Merlin
+    players[1].known_player_ids = [players[0].id]
+
+    # When
+    repository.update_players(players)
+
+    # Then
+    assert repository.get_players(game.id) == players
+
+
+def test_get_rounds_and_votes(repository, game):
+    # Given
+    repository.put_quest(game.id, 1)
+    game_round = repository.put_round(game.id, 1, 2, "leader_id")
+    repository.put_round(game.id, 1, 1, "leader_id")
+    game_round.team_member_ids = ["player_id1"]
+    repository.update_round(game_round)
+
+    # When
+    repository.put_round_vote(game.id, 1, 1, "player_id1", VoteResult.Pass)
+    repository.put_round_vote(game.id, 1, 1, "player_id2", VoteResult.Fail)
+    repository.put_round_vote(game.id, 1, 2, "player_id1", VoteResult.Pass)
+    repository.put_quest_vote(game.id, 1, "player_id1", False)
+
+    # Then
+    assert [(r.quest_number, r.round_number) for r in repository.get_rounds(game.id)] == [(1, 1), (1, 2)]
+    assert [v.player_id for v in repository.get_round_votes(game.id, 1, 1)] == ["player_id1", "player_id2"]
+    res_round = repository.get_round(game.id, 1, 1)
+    assert (res_round.votes_cast, res_round.votes_pass, res_round.votes_fail) == (2, 1, 1)
+    assert repository.get_round(game.id, 1, 2).team_member_ids == ["player_id1"]
+    res_quest = repository.get_quest(game.id, 1)
+    assert (res_quest.votes_cast, res_quest.votes_pass, res_quest.votes_fail) == (1, 0, 1)
+    assert [v.result for v in repository.get_quest_votes(game.id, 1)] == [VoteResult.Fail]
+
+
+def test_put_vote_twice(repository, game):
+    # Given
+    repository.put_round(game.id, 1, 1, "leader_id")
+    repository.put_round_vote(game.id, 1, 1, "player_id1", VoteResult.Pass)
+
+    # When
+    with pytest.raises(DuplicateVoteError):
+        repository.put_round_vote(game.id, 1, 1, "player_id1", VoteResult.Fail)
+
+    # Then
+    assert repository.get_round(game.id, 1, 1).votes_cast == 1
+
+
+def test_get_events(repository, game):
+    # Given
+    first_event = repository.put_event(game.id, EventType.QuestStarted, [], {"quest_number": 1}, TIMESTAMP)
+    repository.put_event(game.id, EventType.GameStarted, ["player_id2"], {}, TIMESTAMP)
+    last_event = repository.put_event(game.id, EventType.GameStarted, ["player_id1"], {}, TIMESTAMP)
+
+    # When
+    events = repository.get_events(game.id, "player_id1")
+    new_events = repository.get_events(game.id, "player_id1", since=first_event.id)
+
+    # Then
+    assert events == [first_event, last_event]
+    assert new_events == [last_event]
+
+
+def test_get_events_of_database_without_event_recipients(tmp_path):
+    # Given
+    path = str(tmp_path / "old.db")
+    repository = SQLiteRepository(path)
+    game = repository.put_game()
+    public_event = repository.put_event(game.id, EventType.QuestStarted, [], {}, TIMESTAMP)
+    private_event = repository.put_event(game.id, EventType.GameStarted, ["player_id1", "player_id2"], {}, TIMESTAMP)
+    repository._execute("DROP TABLE event_recipients")
+    repository.close()
+
+    # When
+    repository = SQLiteRepository(path)
+    events = repository.get_events(game.id, "player_id2")
+    repository.close()
+
+    # Then
+    assert events == [public_event, private_event]
+
+
+def test_get_game_snapshot(repository, game):
+    # Given
+    player = repository.put_player("player_id", game.id, "name", "secret")
+    quest = repository.put_quest(game.id, 1)
+    game_round = repository.put_round(game.id, 1, 1, "leader_id")
+    round_vote = repository.put_round_vote(game.id, 1, 1, player.id, VoteResult.Pass)
+
+    # When
+    snapshot = repository.get_game_snapshot(game.id)
+
+    # Then
+    assert snapshot.game == game
+    assert snapshot.players == [player]
+    assert snapshot.quests == [quest]
+    assert [r.id for r in snapshot.rounds] == [game_round.id]
+    assert snapshot.rounds[0].votes_cast == 1
+    assert snapshot.round_votes == [round_vote]
+    assert snapshot.quest_votes == []
+
+
+def test_unit_of_work_rolls_back_on_error(repository, game):
+    # Given
+    repository.put_quest(game.id, 1)
+
+    # When
+    with pytest.raises(RuntimeError):
+        with repository.unit_of_work():
+            quest = repository.get_quest(game.id, 1)
+            quest.result = VoteResult.Fail
+            repository.update_quest(quest)
+            repository.put_quest(game.id, 2)
+            repository.update_game(game)
+            raise RuntimeError("action failed")
+
+    # Then
+    assert [q.result for q in repository.get_quests(game.id)] == [None]
+    assert repository.get_game(game.id).version == 0
+
+
+def test_unit_of_work_is_isolated(repository, game):
+    # Given
+    repository.put_quest(game.id, 1)
+    in_unit_of_work = threading.Event()
+    results = []
+
+    def read_quests():
+        in_unit_of_work.wait()
+        results.append(len(repository.get_quests(game.id)))
+
+    reader = threading.Thread(target=read_quests)
+    reader.start()
+
+    # When
+    with repository.unit_of_work():
+        repository.put_quest(game.id, 2)
+        in_unit_of_work.set()
+        reader.join()
+
+    # Then
+    assert results == [1]
+    assert len(repository.get_quests(game.id)) == 2
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_play_game(repository, seed):
+    # Given
+    random.seed(seed)
+    comm_service = RecordingCommService()
+
+    # When
+    game_id = play_game(repository, comm_service, number_of_players=5 + seed)
+
+    # Then
+    results = [quest.result for quest in repository.get_quests(game_id)]
+    assert results.count(VoteResult.Pass) == 3 or results.count(VoteResult.Fail) == 3
+    for game_round in repository.get_rounds(game_id):
+        round_votes = repository.get_round_votes(game_id, game_round.quest_number, game_round.round_number)
+        assert game_round.votes_cast == len(round_votes)
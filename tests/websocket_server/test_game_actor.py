@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+from game_core.constants.action_type import ActionType
+from game_core.entities.action import Action
+from websocket_server.game_actor import GameActor, GameBusyError
+
+GAME_ID = "game_id"
+
+
+def make_action(game_id: str, action_id: str) -> Action:
+    return Action(action_id, game_id, "player_id", ActionType.JoinGame, {"name": action_id})
+
+
+def recorder(handled: list[str]):
+    async def handle(action: Action) -> None:
+        await asyncio.sleep(0)
+        handled.append(action.id)
+
+    return handle
+
+
+def test_actions_are_handled_in_order():
+    # Given
+    handled = []
+    drained = []
+    actor = GameActor(GAME_ID, recorder(handled), on_drained=drained.append)
+
+    async def submit() -> None:
+        await asyncio.gather(*[actor.submit(make_action(GAME_ID, f"action_id{i}")) for i in range(3)])
+
+    # When
+    asyncio.run(submit())
+
+    # Then
+    assert handled == ["action_id0", "action_id1", "action_id2"]
+    assert drained == [actor]
+    assert actor.queued_actions == 0
+
+
+def test_games_are_handled_concurrently():
+    # Given
+    handled = []
+    actors = [GameActor(game_id, recorder(handled)) for game_id in ["game_id1", "game_id2"]]
+
+    async def submit() -> None:
+        await asyncio.gather(
+            *[actor.submit(make_action(actor.game_id, f"{actor.game_id}_{i}")) for actor in actors for i in range(2)]
+        )
+
+    # When
+    asyncio.run(submit())
+
+    # Then
+    assert handled == ["game_id1_0", "game_id2_0", "game_id1_1", "game_id2_1"]
+
+
+def test_failed_action_raises():
+    # Given
+    async def handle(action: Action) -> None:
+        if action.id == "action_id0":
+            raise ValueError("invalid action")
+
+    actor = GameActor(GAME_ID, handle)
+
+    async def submit() -> list:
+        futures = [actor.submit(make_action(GAME_ID, f"action_id{i}")) for i in range(2)]
+        return await asyncio.gather(*futures, return_exceptions=True)
+
+    # When
+    res = asyncio.run(submit())
+
+    # Then
+    assert isinstance(res[0], ValueError)
+    assert res[1] is None
+
+
+def test_submit_when_queue_is_full():
+    # Given
+    handled = []
+    actor = GameActor(GAME_ID, recorder(handled), max_queued_actions=2)
+
+    async def submit() -> None:
+        futures = [actor.submit(make_action(GAME_ID, f"action_id{i}")) for i in range(2)]
+        with pytest.raises(GameBusyError):
+            actor.submit(make_action(GAME_ID, "action_id2"))
+        await asyncio.gather(*futures)
+        await actor.submit(make_action(GAME_ID, "action_id3"))
+
+    # When
+    asyncio.run(submit())
+
+    # Then
+    assert handled == ["action_id0", "action_id1", "action_id3"]
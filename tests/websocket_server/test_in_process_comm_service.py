@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from game_core.constants.event_type import EventType
+from game_core.entities.event import Event
+from websocket_server.in_process_comm_service import InProcessCommService
+
+GAME_ID = "game_id"
+TIMESTAMP = "2024-01-01T00:00:00"
+
+
+@pytest.fixture
+def comm_service():
+    return InProcessCommService()
+
+
+@pytest.fixture
+def frames(comm_service):
+    frames = {"player_id1": [], "player_id2": []}
+    for player_id, player_frames in frames.items():
+        comm_service.connect(GAME_ID, player_id, player_frames.append)
+    return frames
+
+
+def make_event(event_id: str, event_type: EventType, recipients: list[str]) -> Event:
+    return Event(event_id, GAME_ID, event_type, recipients, {}, TIMESTAMP)
+
+
+def test_broadcast(comm_service, frames):
+    # Given
+    event = make_event("event_id", EventType.RoundStarted, [])
+
+    # When
+    comm_service.broadcast(event)
+
+    # Then
+    assert [json.loads(frame) for frame in frames["player_id1"]] == [event.to_dict()]
+    assert [json.loads(frame) for frame in frames["player_id2"]] == [event.to_dict()]
+
+
+def test_send_batch(comm_service, frames):
+    # Given
+    round_completed = make_event("event_id1", EventType.RoundCompleted, [])
+    quest_vote_requested = make_event("event_id2", EventType.QuestVoteRequested, ["player_id1"])
+
+    # When
+    comm_service.send_batch([(None, round_completed), ("player_id1", quest_vote_requested)])
+
+    # Then
+    assert [json.loads(frame) for frame in frames["player_id1"]] == [
+        [round_completed.to_dict(), quest_vote_requested.to_dict()]
+    ]
+    assert [json.loads(frame) for frame in frames["player_id2"]] == [[round_completed.to_dict()]]
+
+
+def test_disconnect_after_reconnect(comm_service, frames):
+    # Given
+    new_frames = []
+    comm_service.connect(GAME_ID, "player_id1", new_frames.append)
+
+    # When
+    comm_service.disconnect(GAME_ID, "player_id1", frames["player_id1"].append)
+    comm_service.notify("player_id1", make_event("event_id", EventType.AssassinationTargetRequested, ["player_id1"]))
+
+    # Then
+    assert frames["player_id1"] == []
+    assert len(new_frames) == 1
+    assert comm_service.get_player_ids(GAME_ID) == ["player_id1", "player_id2"]
@@ -0,0 +1,163 @@
+import asyncio
+import json
+import socket
+import threading
+
+import pytest
+from websockets.asyncio.client import connect
+
+from game_core.constants.action_type import ActionType
+from game_core.constants.event_type import EventType
+from game_core.constants.game_status import GameStatus
+from game_core.in_memory_repository import InMemoryRepository
+from websocket_server.server import GameServer
+
+HOST = "localhost"
+
+
+class FakeClient:
+    def __init__(self):
+        self.frames: list[str] = []
+        self.player = None
+
+    def send(self, data: str) -> None:
+        self.frames.append(data)
+
+
+@pytest.fixture
+def repository():
+    return InMemoryRepository()
+
+
+@pytest.fixture
+def game_server(repository):
+    return GameServer(repository, flush_interval=0.01)
+
+
+def get_free_port() -> int:
+    with socket.socket() as s:
+        s.bind((HOST, 0))
+        return s.getsockname()[1]
+
+
+def test_handle_message_errors(game_server):
+    # Given
+    client = FakeClient()
+
+    # When
+    unknown = asyncio.run(game_server.handle_message(client, json.dumps({"type": "unknown"})))
+    missing_game = asyncio.run(
+        game_server.handle_message(client, json.dumps({"type": "join_game", "game_id": "x", "name": "a"}))
+    )
+
+    # Then
+    assert unknown == {"type": "error", "error": "Unknown message type unknown"}
+    assert missing_game["type"] == "error"
+    assert client.player is None
+
+
+def test_handle_message_join_game(game_server, repository):
+    # Given
+    client = FakeClient()
+    game_id = asyncio.run(game_server.handle_message(client, json.dumps({"type": "create_game"})))["game_id"]
+
+    # When
+    res = asyncio.run(
+        game_server.handle_message(client, json.dumps({"type": "join_game", "game_id": game_id, "name": "name"}))
+    )
+
+    # Then
+    assert res == {"type": "game_joined", "game_id": game_id, "player_id": res["player_id"]}
+    (event,), = [json.loads(frame) for frame in client.frames]
+    assert event["type"] == EventType.PlayerJoined.value
+    assert client.player == (game_id, f"{game_id}_player_{res['player_id']}")
+
+
+def test_handle_message_when_game_is_busy(repository):
+    # Given
+    game_server = GameServer(repository, max_queued_actions=1)
+    game_id = repository.put_game().id
+
+    async def join_game(names: list[str]) -> list[dict]:
+        messages = [json.dumps({"type": "join_game", "game_id": game_id, "name": name}) for name in names]
+        return await asyncio.gather(*[game_server.handle_message(FakeClient(), message) for message in messages])
+
+    # When
+    res = asyncio.run(join_game(["name1", "name2"]))
+
+    # Then
+    assert res[0]["type"] == "game_joined"
+    assert res[1] == {"type": "busy", "error": f"Game {game_id} has too many queued actions, retry later"}
+
+
+def test_actions_are_handled_off_the_event_loop(mocker, game_server):
+    # Given
+    threads = []
+    mocker.patch.object(
+        game_server.state_machines, "handle_action", side_effect=lambda *_: threads.append(threading.get_ident())
+    )
+    message = json.dumps({"type": "action", "game_id": "game_id", "player_id": "admin", "action_type": "StartGame"})
+
+    # When
+    res = asyncio.run(game_server.handle_message(FakeClient(), message))
+
+    # Then
+    assert res == {"type": "handled"}
+    assert threads and threads[0] != threading.get_ident()
+
+
+def test_serve(game_server, repository):
+    # Given
+    port = get_free_port()
+
+    async def request(websocket, message: dict) -> dict:
+        await websocket.send(json.dumps(message))
+        while True:
+            reply = json.loads(await websocket.recv())
+            if isinstance(reply, dict):
+                return reply
+
+    async def play() -> tuple[str, list[list[dict]]]:
+        stop = asyncio.get_running_loop().create_future()
+        server = asyncio.create_task(game_server.serve(HOST, port, stop))
+        await asyncio.sleep(0.1)
+        websockets = [await connect(f"ws://{HOST}:{port}") for _ in range(5)]
+        game_id = (await request(websockets[0], {"type": "create_game"}))["game_id"]
+        player_ids = [
+            (await request(websocket, {"type": "join_game", "game_id": game_id, "name": f"name{i}"}))["player_id"]
+            for i, websocket in enumerate(websockets)
+        ]
+        admin = await connect(f"ws://{HOST}:{port}")
+        await request(
+            admin,
+            {
+                "type": "action",
+                "game_id": game_id,
+                "player_id": "admin",
+                "action_type": ActionType.StartGame.value,
+                "payload": {"player_ids": player_ids},
+            },
+        )
+        # each player is answered after the events sent to them, so a last request collects them all
+        frames = []
+        for websocket in websockets:
+            await websocket.send(json.dumps({"type": "unknown"}))
+            player_frames = []
+            while isinstance(frame := json.loads(await websocket.recv()), list):
+                player_frames.append(frame)
+            frames.append(player_frames)
+        for websocket in [*websockets, admin]:
+            await websocket.close()
+        stop.set_result(None)
+        await server
+        return game_id, frames
+
+    # When
+    game_id, frames = asyncio.run(play())
+
+    # Then
+    assert repository.get_game(game_id).status == GameStatus.InProgress
+    for player_frames in frames:
+        event_types = [event["type"] for frame in player_frames for event in frame]
+        assert event_types.count(EventType.GameStarted.value) == 1
+        assert EventType.TeamSelectionRequested.value in event_types